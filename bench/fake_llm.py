@@ -0,0 +1,133 @@
+import asyncio
+import json
+import re
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import RunnableLambda
+from pydantic import Field
+
+_WORDS = (
+    "soil moisture is adequate keep irrigation light and check leaves for spots after rain "
+    "apply nitrogen in split doses and monitor prices at the nearest mandi before selling"
+).split()
+
+# Keyword -> intent, used to answer extraction prompts deterministically.
+_INTENT_KEYWORDS = {
+    "market": ("price", "mandi", "market", "sell"),
+    "weather": ("weather", "rain", "forecast", "temperature"),
+    "disease": ("disease", "pest", "fungus", "blight"),
+    "plan": ("plan", "schedule", "sow", "harvest"),
+    "health": ("health", "healthy"),
+    "status": ("status", "how is my crop"),
+}
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+class FakeChatModel(BaseChatModel):
+    """
+    Deterministic stand-in for the Gemini chat model.
+    Each call sleeps `latency_s + per_token_s * completion_tokens` and answers with fixed text;
+    structured-output calls get a JSON object filled from simple keyword matching.
+    `usage` counts calls and tokens for every call, including ones made outside any traced run.
+    """
+
+    latency_s: float = 0.3
+    per_token_s: float = 0.0
+    completion_tokens: int = 80
+    structured_schema: Optional[Any] = None
+    # Shared with the structured-output copies (model_copy is shallow).
+    usage: Dict[str, int] = Field(default_factory=dict)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-bench"
+
+    def _text(self) -> str:
+        return " ".join(_WORDS[i % len(_WORDS)] for i in range(self.completion_tokens))
+
+    def _structured(self, messages: List[BaseMessage]) -> str:
+        human = " ".join(str(m.content) for m in messages if m.type == "human").lower()
+        message = human.split("user message:", 1)[-1]
+        intents = [i for i, words in _INTENT_KEYWORDS.items() if any(w in message for w in words)]
+        known = {
+            "intents": intents or ["status"],
+            "crop": "wheat",
+            "city": "Chennai",
+            "market": "Chennai",
+            "state": "Tamil Nadu",
+        }
+        data: Dict[str, Any] = {}
+        for name, field in self.structured_schema.model_fields.items():
+            if name in known:
+                data[name] = known[name]
+            elif field.annotation is str:
+                data[name] = self._text()
+        return json.dumps(data)
+
+    def _respond(self, messages: List[BaseMessage]) -> AIMessage:
+        content = self._structured(messages) if self.structured_schema is not None else self._text()
+        prompt_tokens = sum(_estimate_tokens(str(m.content)) for m in messages)
+        output_tokens = _estimate_tokens(content) if self.structured_schema is not None else self.completion_tokens
+        for name, value in (("calls", 1), ("input_tokens", prompt_tokens), ("output_tokens", output_tokens)):
+            self.usage[name] = self.usage.get(name, 0) + value
+        return AIMessage(
+            content=content,
+            usage_metadata={
+                "input_tokens": prompt_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": prompt_tokens + output_tokens,
+            },
+        )
+
+    def _delay(self) -> float:
+        return self.latency_s + self.per_token_s * self.completion_tokens
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        time.sleep(self._delay())
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        await asyncio.sleep(self._delay())
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        message = self._respond(messages)
+        await asyncio.sleep(self.latency_s)
+        tokens = re.findall(r"\S+\s*", message.content)
+        for index, token in enumerate(tokens):
+            if self.per_token_s:
+                await asyncio.sleep(self.per_token_s)
+            last = index == len(tokens) - 1
+            chunk = ChatGenerationChunk(
+                message=AIMessageChunk(content=token, usage_metadata=message.usage_metadata if last else None)
+            )
+            if run_manager is not None:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+    def with_structured_output(self, schema: Any, **kwargs: Any):
+        model = self.model_copy(update={"structured_schema": schema})
+        return model | RunnableLambda(lambda message: schema.model_validate_json(message.content))
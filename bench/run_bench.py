@@ -0,0 +1,244 @@
+"""
+Offline end-to-end benchmark for POST /api/v1/chat.
+
+    python -m bench.run_bench --requests 200 --concurrency 20 --mix mixed
+    python -m bench.run_bench --mix market --compare bench/results/<earlier>.json
+
+The shared llm is swapped for FakeChatModel and the weather/market tools are pointed at local
+stand-in servers, so no API quota is spent. Requests go through the ASGI app in-process.
+Each run writes a JSON report to bench/results/ for diffing against earlier runs.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+os.environ.setdefault("GOOGLE_API_KEY", "offline-bench")
+os.environ.setdefault("OPENWEATHER_API_KEY", "offline-bench")
+
+import httpx
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.tracers.context import register_configure_hook
+
+from .fake_llm import FakeChatModel
+from .stand_ins import StandInServer, build_stand_in_app
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+_MESSAGES = {
+    "market": "What is the wheat price in Chennai mandi today?",
+    "weather": "Will it rain in Chennai tomorrow?",
+    "health": "How is my crop health today?",
+    "disease": "Any disease risk for my wheat this week?",
+    "plan": "Give me a plan for the next three weeks.",
+    "multi": "Wheat price today, rain forecast and any disease risk?",
+    "analysis": "Check my wheat health status, any disease risk, and give me a plan for the next weeks.",
+}
+
+# Intent mix name -> (message kind, weight)
+MIXES = {
+    "market": [("market", 1)],
+    "weather": [("weather", 1)],
+    "health": [("health", 1)],
+    "multi": [("multi", 1)],
+    "analysis": [("analysis", 1)],
+    "mixed": [("market", 4), ("weather", 3), ("health", 1), ("disease", 1), ("plan", 1), ("multi", 1)],
+}
+
+class NodeTimer(BaseCallbackHandler):
+    """
+    Collects per-node wall time and LLM calls per node from LangChain callbacks.
+    Only calls made inside a request's run are seen; totals come from FakeChatModel.usage.
+    """
+
+    run_inline = True
+
+    def __init__(self):
+        self.node_ms: Dict[str, List[float]] = defaultdict(list)
+        self.llm_calls: Counter = Counter()
+        self._starts: Dict[Any, tuple] = {}
+
+    def on_chain_start(self, serialized, inputs, *, run_id, metadata=None, **kwargs):
+        node = (metadata or {}).get("langgraph_node")
+        if node and kwargs.get("name") == node:
+            self._starts[run_id] = (node, time.perf_counter())
+
+    def _end(self, run_id) -> None:
+        started = self._starts.pop(run_id, None)
+        if started is not None:
+            node, t0 = started
+            self.node_ms[node].append((time.perf_counter() - t0) * 1000)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        self.llm_calls[(metadata or {}).get("langgraph_node", "other")] += 1
+
+_timer_var: ContextVar[Optional[NodeTimer]] = ContextVar("bench_node_timer", default=None)
+register_configure_hook(_timer_var, inheritable=True)
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return round(ordered[index], 1)
+
+def _pick_messages(mix: str, count: int, seed: int) -> List[str]:
+    kinds, weights = zip(*MIXES[mix])
+    rng = random.Random(seed)
+    return [_MESSAGES[k] for k in rng.choices(kinds, weights=weights, k=count)]
+
+def _reset_caches() -> None:
+    from server.agents import llm_cache
+    from server.agents.tools import market_tool, weather_tool
+    weather_tool._weather_cache.clear()
+    market_tool._price_cache.clear()
+    llm_cache._cache.clear()
+
+async def _settle_background_work() -> None:
+    """
+    Waits for queued history writes and the summary updates they start, so their LLM calls are counted.
+    """
+    from server.agents.tools import history_tool
+    await history_tool.flush_chat_history()
+    while history_tool._summary_tasks:
+        await asyncio.gather(*list(history_tool._summary_tasks.values()), return_exceptions=True)
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    from server.agents.agent_roles import set_llm
+    from server.agents.tools import market_tool, weather_tool
+    from server.main import app
+
+    model = FakeChatModel(
+        latency_s=args.llm_latency,
+        per_token_s=args.llm_per_token,
+        completion_tokens=args.completion_tokens,
+    )
+    set_llm(model)
+    if not args.warm:
+        _reset_caches()
+
+    stand_ins = StandInServer(build_stand_in_app(args.weather_latency, args.market_latency))
+    async with stand_ins as base_url:
+        weather_tool.OPENWEATHER_API = f"{base_url}/data/2.5/weather"
+        weather_tool.OPENWEATHER_FORECAST_API = f"{base_url}/data/2.5/forecast"
+        market_tool.AGMARKET_API = f"{base_url}/request"
+
+        timer = NodeTimer()
+        _timer_var.set(timer)
+        messages = _pick_messages(args.mix, args.requests, args.seed)
+        latencies: List[float] = []
+        errors = 0
+        gate = asyncio.Semaphore(args.concurrency)
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=120) as client:
+            async def one(index: int, message: str) -> None:
+                nonlocal errors
+                payload = {"user_id": f"farmer{index % args.users}", "session_id": f"s{index % args.users}", "message": message}
+                async with gate:
+                    t0 = time.perf_counter()
+                    try:
+                        resp = await client.post("/api/v1/chat", json=payload)
+                        failed = resp.status_code != 200 or str(resp.json().get("response", "")).startswith("Error:")
+                    except Exception:
+                        failed = True
+                    latencies.append((time.perf_counter() - t0) * 1000)
+                    errors += failed
+
+            started = time.perf_counter()
+            await asyncio.gather(*(one(i, m) for i, m in enumerate(messages)))
+            duration = time.perf_counter() - started
+            await _settle_background_work()
+        upstream_calls = stand_ins.calls
+
+    requests = len(messages)
+    # Calls outside any request's graph run: mainly the background history summaries.
+    per_node = Counter(timer.llm_calls)
+    per_node["background"] = model.usage.get("calls", 0) - sum(timer.llm_calls.values())
+    return {
+        "name": args.name or args.mix,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {k: v for k, v in vars(args).items() if k not in ("compare", "name")},
+        "requests": requests,
+        "errors": errors,
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(requests / duration, 2) if duration else 0.0,
+        "latency_ms": {
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "mean": round(sum(latencies) / len(latencies), 1) if latencies else 0.0,
+            "max": round(max(latencies), 1) if latencies else 0.0,
+        },
+        "llm_calls_per_request": round(model.usage.get("calls", 0) / requests, 2),
+        "llm_calls_per_node": {n: round(c / requests, 2) for n, c in sorted(per_node.items())},
+        "tokens_per_request": {
+            "input": round(model.usage.get("input_tokens", 0) / requests, 1),
+            "output": round(model.usage.get("output_tokens", 0) / requests, 1),
+        },
+        "node_ms": {
+            n: {"count": len(v), "mean": round(sum(v) / len(v), 1), "p95": percentile(v, 95)}
+            for n, v in sorted(timer.node_ms.items())
+        },
+        "upstream_calls": upstream_calls,
+    }
+
+def _flatten(report: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in report.items():
+        if key == "config":
+            continue
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+def compare(old: Dict[str, Any], new: Dict[str, Any]) -> str:
+    before, after = _flatten(old), _flatten(new)
+    lines = [f"{'metric':40} {'before':>12} {'after':>12} {'change':>9}"]
+    for key in sorted(set(before) | set(after)):
+        a, b = before.get(key), after.get(key)
+        change = f"{(b - a) / a * 100:+.1f}%" if a and b is not None else ""
+        lines.append(f"{key:40} {'' if a is None else a:>12} {'' if b is None else b:>12} {change:>9}")
+    return "\n".join(lines)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--users", type=int, default=50, help="distinct user/session ids")
+    parser.add_argument("--mix", choices=sorted(MIXES), default="mixed")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="seconds per fake LLM call")
+    parser.add_argument("--llm-per-token", type=float, default=0.0, help="extra seconds per completion token")
+    parser.add_argument("--completion-tokens", type=int, default=80)
+    parser.add_argument("--weather-latency", type=float, default=0.08)
+    parser.add_argument("--market-latency", type=float, default=0.15)
+    parser.add_argument("--warm", action="store_true", help="keep tool/LLM caches from previous runs in this process")
+    parser.add_argument("--name", default="", help="report name (default: the mix)")
+    parser.add_argument("--compare", type=Path, help="earlier report to diff against")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    RESULTS_DIR.mkdir(exist_ok=True)
+    path = RESULTS_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}-{report['name']}.json"
+    path.write_text(json.dumps(report, indent=2))
+    print(json.dumps({k: report[k] for k in ("requests", "errors", "throughput_rps", "latency_ms", "llm_calls_per_request")}, indent=2))
+    print(f"Report written to {path}")
+    if args.compare:
+        print(compare(json.loads(args.compare.read_text()), report))
+
+if __name__ == "__main__":
+    main()
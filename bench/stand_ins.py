@@ -0,0 +1,69 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+import uvicorn
+from fastapi import FastAPI
+
+def build_stand_in_app(weather_latency_s: float = 0.08, market_latency_s: float = 0.15) -> FastAPI:
+    """
+    Local stand-ins for OpenWeather (current + 5-day forecast) and the AgMarket API.
+    """
+    app = FastAPI()
+    app.state.calls = {"weather": 0, "forecast": 0, "market": 0}
+
+    @app.get("/data/2.5/weather")
+    async def weather(q: str = ""):
+        app.state.calls["weather"] += 1
+        await asyncio.sleep(weather_latency_s)
+        return {"main": {"temp": 29.5, "humidity": 71}, "rain": {"1h": 0.2}, "weather": [{"description": "haze"}]}
+
+    @app.get("/data/2.5/forecast")
+    async def forecast(q: str = ""):
+        app.state.calls["forecast"] += 1
+        await asyncio.sleep(weather_latency_s)
+        start = datetime(2026, 1, 1)
+        rows = []
+        for i in range(40):
+            rows.append({
+                "dt_txt": (start + timedelta(hours=3 * i)).strftime("%Y-%m-%d %H:%M:%S"),
+                "main": {"temp": 24 + (i % 8), "humidity": 60 + (i % 5) * 7},
+                "rain": {"3h": 1.5 if i % 6 == 0 else 0},
+                "weather": [{"description": "light rain" if i % 6 == 0 else "scattered clouds"}],
+            })
+        return {"list": rows}
+
+    @app.get("/request")
+    async def market(commodity: str = "", state: str = "", market: str = ""):
+        app.state.calls["market"] += 1
+        await asyncio.sleep(market_latency_s)
+        return [{
+            "Commodity": commodity.title(), "Market": market.title(), "Date": "01 Jan 2026",
+            "Min Price": "2100", "Max Price": "2350", "Modal Price": "2250",
+        }]
+
+    return app
+
+class StandInServer:
+    """
+    Runs the stand-in app with uvicorn on an ephemeral local port inside the current event loop.
+    """
+
+    def __init__(self, app: FastAPI):
+        self.app = app
+        self._server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning", lifespan="off"))
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def calls(self) -> Dict[str, int]:
+        return dict(self.app.state.calls)
+
+    async def __aenter__(self) -> str:
+        self._task = asyncio.ensure_future(self._server.serve())
+        while not self._server.started:
+            await asyncio.sleep(0.01)
+        host, port = self._server.servers[0].sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def __aexit__(self, *exc) -> None:
+        self._server.should_exit = True
+        await self._task
@@ -0,0 +1,91 @@
+"""
+Cold-start benchmark: import time, lifespan warm-up time and time to ready, each measured in a
+fresh interpreter so nothing is already imported or compiled.
+
+    python -m bench.startup_bench --runs 5
+    python -m bench.startup_bench --compare bench/results/<earlier>-startup.json
+
+No network is needed: the warm-up only constructs the LLM client and the HTTP pool.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from .run_bench import RESULTS_DIR, compare
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Runs in the child interpreter; prints one JSON line.
+_PROBE = """
+import asyncio, json, time
+t0 = time.perf_counter()
+import server.main as main
+t1 = time.perf_counter()
+
+async def start():
+    import httpx
+    async with main.app.router.lifespan_context(main.app):
+        t2 = time.perf_counter()
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            resp = await client.get("/ready")
+        return t2, resp.status_code, resp.json()
+
+t2, status, ready = asyncio.run(start())
+print(json.dumps({"import_s": t1 - t0, "warm_up_s": t2 - t1, "ready_status": status, "ready": ready}))
+"""
+
+def _median(values: List[float]) -> float:
+    return round(statistics.median(values), 3) if values else 0.0
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    env = dict(os.environ)
+    env.setdefault("GOOGLE_API_KEY", "offline-bench")
+    env.setdefault("OPENWEATHER_API_KEY", "offline-bench")
+    samples: List[Dict[str, Any]] = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        out = subprocess.run(
+            [sys.executable, "-c", _PROBE], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+        )
+        sample = json.loads(out.stdout.strip().splitlines()[-1])
+        sample["process_s"] = time.perf_counter() - started
+        samples.append(sample)
+
+    steps = sorted({k for s in samples for k in s["ready"].get("warm_up_s", {})})
+    return {
+        "name": args.name or "startup",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {"runs": args.runs},
+        "ready": all(s["ready_status"] == 200 for s in samples),
+        "import_s": _median([s["import_s"] for s in samples]),
+        "warm_up_s": _median([s["warm_up_s"] for s in samples]),
+        "time_to_ready_s": _median([s["import_s"] + s["warm_up_s"] for s in samples]),
+        "process_s": _median([s["process_s"] for s in samples]),
+        "warm_up_steps_s": {k: _median([s["ready"]["warm_up_s"][k] for s in samples if "warm_up_s" in s["ready"]]) for k in steps},
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--name", default="", help="report name (default: startup)")
+    parser.add_argument("--compare", type=Path, help="earlier report to diff against")
+    args = parser.parse_args()
+
+    report = run(args)
+    RESULTS_DIR.mkdir(exist_ok=True)
+    path = RESULTS_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}-{report['name']}.json"
+    path.write_text(json.dumps(report, indent=2))
+    print(json.dumps({k: v for k, v in report.items() if k not in ("name", "timestamp", "config")}, indent=2))
+    print(f"Report written to {path}")
+    if args.compare:
+        print(compare(json.loads(args.compare.read_text()), report))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+from dotenv import load_dotenv
+
+# The one place .env is read: runs before any server module reads its settings from os.environ.
+load_dotenv()
@@ -1,21 +1,56 @@
 import os
-from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
-
-load_dotenv()
+from typing import Any, Dict, Optional
+from .llm_scheduler import ScheduledRunnable, llm_scheduler
 
 MODEL_NAME = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
 TEMPERATURE = float(os.getenv("GEMINI_TEMPERATURE", "0.3"))
 MAX_TOKENS = int(os.getenv("GEMINI_MAX_TOKENS", "1024"))
 
-API_KEY = os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY")
-if not API_KEY:
-    raise RuntimeError("Set GOOGLE_API_KEY (or GEMINI_API_KEY) in your environment or .env.")
+# Built on first use: importing the Gemini client is slow, and a missing key should only fail
+# the calls that need the model (and readiness), not every import of the app.
+llm: Optional[Any] = None
+
+def get_chat_model() -> Any:
+    """
+    Returns the underlying chat model, constructing the Gemini client on first call.
+    """
+    global llm
+    if llm is None:
+        api_key = os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            raise RuntimeError("Set GOOGLE_API_KEY (or GEMINI_API_KEY) in your environment or .env.")
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        llm = ChatGoogleGenerativeAI(
+            model=MODEL_NAME,
+            google_api_key=api_key,
+            temperature=TEMPERATURE,
+            max_output_tokens=MAX_TOKENS,
+            verbose=False,
+            # Rate-limit retries are handled by the scheduler, which backs off without holding a slot.
+            max_retries=int(os.getenv("GEMINI_MAX_RETRIES", "1")),
+        )
+    return llm
+
+_structured: Dict[type, Any] = {}
+
+def get_llm() -> Any:
+    """
+    Returns the shared model behind the LLM scheduler (concurrency, token budget, priority).
+    """
+    return ScheduledRunnable(get_chat_model(), llm_scheduler)
+
+def set_llm(model: Any) -> None:
+    """
+    Swaps the shared chat model (e.g. for the offline benchmark's fake model).
+    """
+    global llm
+    llm = model
+    _structured.clear()
 
-llm = ChatGoogleGenerativeAI(
-    model=MODEL_NAME,
-    google_api_key=API_KEY,   
-    temperature=TEMPERATURE,
-    max_output_tokens=MAX_TOKENS,
-    verbose=False,
-)
\ No newline at end of file
+def get_structured_llm(schema: type) -> Any:
+    """
+    Returns the shared model bound to emit `schema` instances.
+    """
+    if schema not in _structured:
+        _structured[schema] = ScheduledRunnable(get_chat_model().with_structured_output(schema), llm_scheduler)
+    return _structured[schema]
@@ -0,0 +1,70 @@
+import functools
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Optional
+from uuid import UUID
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.tracers.context import register_configure_hook
+from ..services.memory_profile import memory_profiler
+from ..services.metrics import LLM_ERRORS, LLM_SECONDS, LLM_TOKENS, NODE_ERRORS, NODE_SECONDS, record_timing
+
+def instrument_node(name: str, fn: Callable[[Any], Awaitable[Any]]) -> Callable[[Any], Awaitable[Any]]:
+    """
+    Wraps a graph node so its latency and failures (and, when profiling, its output size) are recorded.
+    """
+    @functools.wraps(fn)
+    async def node(state):
+        start = time.perf_counter()
+        try:
+            delta = await fn(state)
+            memory_profiler.node_output(name, delta)
+            return delta
+        except Exception:
+            NODE_ERRORS.inc(name)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            NODE_SECONDS.observe(elapsed, name)
+            record_timing("node", name, elapsed)
+    return node
+
+class LLMMetricsHandler(BaseCallbackHandler):
+    """
+    Times every chat model call and counts its tokens, labelled with the graph node that made it.
+    Attached to all LangChain runs through a configure hook, so calls need no wrapping.
+    """
+
+    run_inline = True
+
+    def __init__(self):
+        self._starts: Dict[UUID, tuple] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, metadata: Optional[dict] = None, **kwargs):
+        node = (metadata or {}).get("langgraph_node", "background")
+        self._starts[run_id] = (node, time.perf_counter())
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs):
+        started = self._starts.pop(run_id, None)
+        if started is None:
+            return
+        node, start = started
+        elapsed = time.perf_counter() - start
+        prompt_tokens = completion_tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                prompt_tokens += usage.get("input_tokens", 0)
+                completion_tokens += usage.get("output_tokens", 0)
+        LLM_SECONDS.observe(elapsed, node)
+        LLM_TOKENS.inc(node, "prompt", amount=prompt_tokens)
+        LLM_TOKENS.inc(node, "completion", amount=completion_tokens)
+        record_timing("llm", node, elapsed, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+
+    def on_llm_error(self, error, *, run_id: UUID, **kwargs):
+        started = self._starts.pop(run_id, None)
+        if started is not None:
+            LLM_ERRORS.inc(started[0])
+            LLM_SECONDS.observe(time.perf_counter() - started[1], started[0])
+
+_llm_metrics: ContextVar[Optional[LLMMetricsHandler]] = ContextVar("llm_metrics", default=LLMMetricsHandler())
+register_configure_hook(_llm_metrics, inheritable=True)
@@ -0,0 +1,64 @@
+import os
+from collections import defaultdict
+from typing import Any, Dict, Optional, Sequence
+from langchain_core.messages import BaseMessage
+from ..utils.singleflight import SingleFlight
+from ..utils.ttl_cache import TTLCache
+from .agent_roles import get_llm
+
+# Opt-in cache for prompts whose answer is a pure function of their input (extraction, triage).
+# Generative prompts (crop health, plans, the final answer) should keep calling the model directly.
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "4096"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "3600"))
+LLM_CACHE_MAX_INPUT_CHARS = int(os.getenv("LLM_CACHE_MAX_INPUT_CHARS", "4000"))
+
+_cache = TTLCache(maxsize=LLM_CACHE_SIZE, ttl=LLM_CACHE_TTL)
+_flight = SingleFlight()
+_stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"hits": 0, "misses": 0, "coalesced": 0, "uncacheable": 0})
+_MISSING = object()
+
+def _normalize(message: BaseMessage) -> str:
+    content = message.content if isinstance(message.content, str) else repr(message.content)
+    return " ".join(content.lower().split())
+
+async def cached_ainvoke(prompt: str, messages: Sequence[BaseMessage], runnable: Optional[Any] = None) -> Any:
+    """
+    Invokes `runnable` (default: the shared llm) through a cache keyed on the prompt name and the
+    normalized message contents. Concurrent identical calls share one model call.
+    """
+    runnable = runnable if runnable is not None else get_llm()
+    stats = _stats[prompt]
+    parts = tuple(_normalize(m) for m in messages)
+    if sum(len(p) for p in parts) > LLM_CACHE_MAX_INPUT_CHARS:
+        stats["uncacheable"] += 1
+        return await runnable.ainvoke(list(messages))
+
+    key = (prompt, parts)
+    result = _cache.get(key, _MISSING)
+    if result is not _MISSING:
+        stats["hits"] += 1
+        return result
+
+    async def call() -> Any:
+        value = await runnable.ainvoke(list(messages))
+        _cache.set(key, value)
+        return value
+
+    if _flight.inflight(key):
+        stats["coalesced"] += 1
+    else:
+        stats["misses"] += 1
+    return await _flight.do(key, call)
+
+def llm_cache_stats() -> Dict[str, Any]:
+    prompts = {}
+    for name, s in _stats.items():
+        lookups = s["hits"] + s["misses"] + s["coalesced"]
+        prompts[name] = {**s, "hit_rate": round((s["hits"] + s["coalesced"]) / lookups, 3) if lookups else 0.0}
+    return {
+        "size": len(_cache),
+        "maxsize": LLM_CACHE_SIZE,
+        "hits": sum(s["hits"] + s["coalesced"] for s in _stats.values()),
+        "misses": sum(s["misses"] for s in _stats.values()),
+        "prompts": prompts,
+    }
@@ -0,0 +1,220 @@
+import asyncio
+import math
+import os
+import random
+import time
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+from langchain_core.runnables.config import var_child_runnable_config
+from ..services.metrics import LLM_QUEUE_SECONDS, LLM_RETRIES
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "0"))   # 0 = no token budget
+LLM_MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", "200"))                 # admission limit on waiting calls
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))               # retries on 429 / quota errors
+LLM_RETRY_BASE = float(os.getenv("LLM_RETRY_BASE", "0.5"))             # seconds, doubled per retry
+LLM_EXPECTED_OUTPUT_TOKENS = int(os.getenv("LLM_EXPECTED_OUTPUT_TOKENS", "256"))
+
+# Queue priority by calling graph node (lower runs first). The final answer is what the farmer is
+# waiting on; extraction gates the whole graph; analysis nodes come next; background work last.
+NODE_PRIORITY: Dict[str, int] = {
+    "response": 0,
+    "farmer_interaction": 1,
+    "crop_health": 2,
+    "disease_prediction": 2,
+    "lifecycle_planning": 2,
+    "fused_analysis": 1,   # gates the answer (and usually writes it)
+}
+BACKGROUND_PRIORITY = 3
+
+_Waiter = Tuple[asyncio.Future, int]
+
+def _call_context() -> Tuple[str, str]:
+    """
+    (graph node, user_id) of the current LLM call, from the run config LangGraph puts in context.
+    """
+    metadata = (var_child_runnable_config.get() or {}).get("metadata") or {}
+    return metadata.get("langgraph_node", "background"), str(metadata.get("user_id", "background"))
+
+def _estimate_tokens(messages: Any) -> int:
+    if isinstance(messages, (list, tuple)):
+        chars = sum(len(str(getattr(m, "content", m))) for m in messages)
+    else:
+        chars = len(str(messages))
+    return chars // 4 + LLM_EXPECTED_OUTPUT_TOKENS
+
+def _is_rate_limited(error: Exception) -> bool:
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if status == 429 or getattr(error, "code", None) == 429:
+        return True
+    text = str(error).lower()
+    return "429" in text or "resource exhausted" in text or "resource_exhausted" in text or "rate limit" in text
+
+class LLMScheduler:
+    """
+    Gate in front of the shared chat model: at most `max_concurrency` calls in flight and, when
+    `tokens_per_minute` is set, a token bucket refilled continuously. Waiting calls are served by
+    priority, round-robin across user_ids within a priority so one user's fan-out cannot starve
+    others. 429s are retried with jittered exponential backoff after giving up the slot.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        tokens_per_minute: int = LLM_TOKENS_PER_MINUTE,
+        max_queue: int = LLM_MAX_QUEUE,
+        max_retries: int = LLM_MAX_RETRIES,
+        retry_base: float = LLM_RETRY_BASE,
+    ):
+        self.max_concurrency = max_concurrency
+        self.tokens_per_minute = tokens_per_minute
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.retry_base = retry_base
+        self.calls = 0
+        self.retries = 0
+        self.rejected = 0
+        self._active = 0
+        self._waiting = 0
+        # One user -> FIFO map per priority level; OrderedDict order is the round-robin order.
+        self._levels: List["OrderedDict[str, Deque[_Waiter]]"] = [OrderedDict() for _ in range(BACKGROUND_PRIORITY + 1)]
+        self._tokens = float(tokens_per_minute)
+        self._refilled = time.monotonic()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._avg_call_s = 1.0
+
+    async def run(self, call: Callable[[], Awaitable[Any]], tokens: int, node: str, user: str) -> Any:
+        level = NODE_PRIORITY.get(node, BACKGROUND_PRIORITY)
+        if self.tokens_per_minute:
+            tokens = min(tokens, self.tokens_per_minute)
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(level, user, tokens, node)
+            start = time.monotonic()
+            try:
+                result = await call()
+            except Exception as e:
+                if attempt == self.max_retries or not _is_rate_limited(e):
+                    raise
+                self.retries += 1
+                LLM_RETRIES.inc(node)
+            else:
+                self.calls += 1
+                self._settle(tokens, result)
+                return result
+            finally:
+                self._release(time.monotonic() - start)
+            await asyncio.sleep(self.retry_base * 2 ** attempt * random.uniform(0.5, 1.5))
+
+    def retry_after(self) -> int:
+        """
+        Seconds a new request should wait when the queue is at its admission limit, else 0.
+        """
+        if self._waiting < self.max_queue:
+            return 0
+        self.rejected += 1
+        return max(1, math.ceil(self._waiting / self.max_concurrency * self._avg_call_s))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active": self._active,
+            "waiting": self._waiting,
+            "waiting_by_priority": {str(i): sum(len(q) for q in level.values()) for i, level in enumerate(self._levels)},
+            "calls": self.calls,
+            "retries": self.retries,
+            "rejected": self.rejected,
+            "tokens_available": round(self._tokens) if self.tokens_per_minute else None,
+        }
+
+    async def _acquire(self, level: int, user: str, tokens: int, node: str) -> None:
+        if self._active < self.max_concurrency and not self._waiting and self._take_tokens(tokens):
+            self._active += 1
+            return
+        waiter: _Waiter = (asyncio.get_running_loop().create_future(), tokens)
+        self._levels[level].setdefault(user, deque()).append(waiter)
+        self._waiting += 1
+        queued = time.monotonic()
+        self._dispatch()   # may be grantable now, or needs a token refill timer
+        try:
+            await waiter[0]
+        except asyncio.CancelledError:
+            if waiter[0].done() and not waiter[0].cancelled():
+                self._release(0.0)   # granted just before the cancel landed
+            else:
+                self._forget(level, user, waiter)
+            raise
+        LLM_QUEUE_SECONDS.observe(time.monotonic() - queued, node)
+
+    def _forget(self, level: int, user: str, waiter: _Waiter) -> None:
+        waiters = self._levels[level].get(user)
+        if waiters is not None and waiter in waiters:
+            waiters.remove(waiter)
+            self._waiting -= 1
+            if not waiters:
+                del self._levels[level][user]
+        self._dispatch()
+
+    def _release(self, elapsed: float) -> None:
+        self._active -= 1
+        if elapsed:
+            self._avg_call_s = 0.9 * self._avg_call_s + 0.1 * elapsed
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self._active < self.max_concurrency and self._waiting:
+            queue = next(q for q in self._levels if q)
+            user, waiters = next(iter(queue.items()))
+            future, tokens = waiters[0]
+            if not self._take_tokens(tokens):
+                self._wait_for_tokens(tokens)
+                return
+            waiters.popleft()
+            if waiters:
+                queue.move_to_end(user)
+            else:
+                del queue[user]
+            self._waiting -= 1
+            self._active += 1
+            future.set_result(None)
+
+    def _take_tokens(self, tokens: int) -> bool:
+        if not self.tokens_per_minute:
+            return True
+        now = time.monotonic()
+        self._tokens = min(self.tokens_per_minute, self._tokens + (now - self._refilled) * self.tokens_per_minute / 60)
+        self._refilled = now
+        if self._tokens < tokens:
+            return False
+        self._tokens -= tokens
+        return True
+
+    def _wait_for_tokens(self, tokens: int) -> None:
+        if self._timer is None:
+            delay = (tokens - self._tokens) * 60 / self.tokens_per_minute
+            self._timer = asyncio.get_running_loop().call_later(delay, self._on_refill)
+
+    def _on_refill(self) -> None:
+        self._timer = None
+        self._dispatch()
+
+    def _settle(self, reserved: int, result: Any) -> None:
+        # Replace the estimate with the reported usage when the model returns it.
+        usage = getattr(result, "usage_metadata", None) or {}
+        if self.tokens_per_minute and usage.get("total_tokens"):
+            self._tokens -= usage["total_tokens"] - reserved
+
+class ScheduledRunnable:
+    """
+    Wraps a runnable so every ainvoke goes through the scheduler.
+    """
+
+    def __init__(self, runnable: Any, scheduler: LLMScheduler):
+        self.runnable = runnable
+        self.scheduler = scheduler
+
+    async def ainvoke(self, input: Sequence[Any], config: Optional[Dict[str, Any]] = None, **kwargs: Any) -> Any:
+        node, user = _call_context()
+        return await self.scheduler.run(
+            lambda: self.runnable.ainvoke(input, config, **kwargs), _estimate_tokens(input), node, user
+        )
+
+llm_scheduler = LLMScheduler()
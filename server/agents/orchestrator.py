@@ -1,269 +1,739 @@
 from __future__ import annotations
-from typing import TypedDict, Optional, Dict, Any, List, Annotated
+from typing import TypedDict, Dict, Any, List, Annotated, AsyncIterator, Optional
+import asyncio
+import contextvars
+from collections import defaultdict
+import logging
 import operator
+import os
 import re
-from langgraph.graph import StateGraph, END
+import time
 from langchain_core.messages import SystemMessage, HumanMessage
-from ..utils.response_cleaner import clean_response, format_weather, format_market_price
-from .agent_roles import llm
+from ..utils.crop_thresholds import GENERIC_THRESHOLDS, crop_ranges, crop_thresholds, format_deviations, nominal_status_message, score_deviations
+from ..services.memory_profile import memory_profiler
+from ..services.metrics import CHAT_REQUEST_SECONDS, NODE_TIMEOUTS, timed
+from ..utils.batch_memo import BatchMemo, use_batch_memo
+from ..utils.gazetteer import Place, gazetteer
+from ..utils.response_cleaner import clean_response, format_weather, format_market_price, format_profile, format_sensors, StreamingResponseCleaner
+from ..models.fused_analysis import FusedAnalysis
+from ..models.query_extraction import INTENTS, QueryExtraction, UNRESOLVED
+from ..models.tool_records import LocalWeather, MarketPrice
+from .agent_roles import get_llm, get_structured_llm
+from .instrumentation import instrument_node
+from .llm_cache import cached_ainvoke
 from .tools.profile_tool import get_farmer_profile
 from .tools.sensor_tool import get_latest_sensor_data
-from .tools.weather_tool import get_local_weather
-from .tools.history_tool import get_chat_history, save_chat_turn, render_history_for_prompt
-from .tools.market_tool import get_agri_market_price
+from .tools.weather_tool import get_local_weather, watch_weather
+from .tools.history_tool import Turn, get_chat_history, get_history_summary, save_chat_turn
+from .tools.market_tool import get_agri_market_price, watch_price
+
+logger = logging.getLogger(__name__)
+
+# Graphs run at once per /chat/batch request.
+BATCH_CONCURRENCY = int(os.getenv("CHAT_BATCH_CONCURRENCY", "8"))
+
+# Per-request latency budget. Routed nodes must finish RESPONSE_RESERVE_S before the deadline so the
+# synthesizer always has time to answer with whatever is ready.
+REQUEST_BUDGET_S = float(os.getenv("REQUEST_BUDGET_S", "12"))
+RESPONSE_RESERVE_S = float(os.getenv("RESPONSE_RESERVE_S", "4"))
+# History and profile loads get at most this long, so a stalled store leaves time for routed work.
+LOAD_TIMEOUT_S = float(os.getenv("LOAD_TIMEOUT_S", "1.5"))
 
 # ------------ Shared state passed between nodes ------------
 class State(TypedDict, total=False):
     user_id: str
     session_id: str
     message: str
-    intent: List[str]
-    query_crop: Optional[str]
-    history: List[Dict[str, Any]]
+    query: QueryExtraction
+    history: List[Turn]
     history_summary: str
     profile: Dict[str, Any]
     sensors: Dict[str, Any]
-    weather: Dict[str, Any]
+    weather: LocalWeather
     crop_analysis: str
+    crop_deviations: Dict[str, Any]
     disease_risk: str
     plan: str
-    market_price: Dict[str, Any]
+    market_price: MarketPrice
+    route: List[str]
     final_response: str
+    fused_answer: str                                 # final answer drafted by the fused analysis call
+    deadline: float                                   # time.monotonic() by which the answer is due
+    streaming: bool                                   # answer tokens are streamed from the response node
+    unavailable: Annotated[List[str], operator.add]   # nodes that missed their deadline
     trace: Annotated[List[str], operator.add]
 
 def _trace(note: str) -> Dict[str, Any]:
     return {"trace": [note]}
 
+# ------------ Intent routing ------------
+# Intent keyword -> node whose output answers it.
+INTENT_NODES: Dict[str, str] = {
+    "market": "agmarket_price",
+    "price": "agmarket_price",
+    "weather": "weather",
+    "rain": "weather",
+    "health": "crop_health",
+    "status": "crop_health",
+    "disease": "disease_prediction",
+    "plan": "lifecycle_planning",
+}
+
+# Node -> routable nodes whose state it reads. The farmer profile is not routed:
+# it is loaded for every request, before extraction, which falls back to its location.
+NODE_DEPENDENCIES: Dict[str, List[str]] = {
+    "sensor_data": [],
+    "agmarket_price": [],
+    "weather": [],
+    "crop_health": ["sensor_data"],
+    "disease_prediction": ["sensor_data", "weather"],
+    "lifecycle_planning": ["weather"],
+}
+
+# Routable nodes grouped by depth. Selected nodes run tier by tier, so every branch
+# reaches "response" in the same step and it fans in exactly once for any subset.
+NODE_TIERS: List[List[str]] = [
+    ["sensor_data", "agmarket_price", "weather"],
+    ["crop_health", "disease_prediction", "lifecycle_planning", "fused_analysis"],
+]
+
+# Fused analysis: the analysis nodes of a turn replaced by one structured call that sends the
+# shared context once. "auto" fuses when two or more sections are asked for, "on" whenever any
+# is (except a plain status check, which may be answered from the template), "off" never.
+# With FUSED_ANSWER the same call also drafts the final answer, so the synthesizer makes no call
+# (except when streaming: a structured answer arrives in one piece, the synthesizer's token by token).
+FUSED_ANALYSIS = os.getenv("FUSED_ANALYSIS", "auto")
+FUSED_ANSWER = os.getenv("FUSED_ANSWER", "1") == "1"
+
+# Analysis node -> (FusedAnalysis field / State key, section instruction).
+FUSED_SECTIONS: Dict[str, tuple] = {
+    "crop_health": ("crop_analysis", "crop health: the deviations that matter and their likely effect on the crop, "
+                                     "3–5 bullets and a line starting with 'Action:'"),
+    "disease_prediction": ("disease_risk", "near-term disease risks and preventive actions"),
+    "lifecycle_planning": ("plan", "near-term 2-4 week plan (sow/fertilize/irrigate/spray/harvest cues)"),
+}
+
+# Intents that only ask how the crop is doing; both route to crop_health alone.
+STATUS_INTENTS = frozenset({"status", "health"})
+
+def is_status_check(intents: List[str]) -> bool:
+    """
+    True for a plain crop status check ("how is my crop?", "crop health?"), however the model
+    labels it, which may be answered from the nominal-status template.
+    """
+    return bool(intents) and set(intents) <= STATUS_INTENTS
+
+def fuse_route(route: List[str], intents: List[str]) -> List[str]:
+    """
+    Replaces the route's analysis nodes with fused_analysis when FUSED_ANALYSIS says so.
+    """
+    analysis = [n for n in route if n in FUSED_SECTIONS]
+    if FUSED_ANALYSIS == "off" or not analysis or is_status_check(intents):
+        return route
+    if FUSED_ANALYSIS == "auto" and len(analysis) < 2:
+        return route
+    return [n for n in route if n not in FUSED_SECTIONS] + ["fused_analysis"]
+
+def resolve_route(intents: List[str]) -> List[str]:
+    """
+    Returns the routable nodes needed for the given intents, dependencies included.
+    """
+    needed = set()
+    pending = [INTENT_NODES[i] for i in intents if i in INTENT_NODES]
+    while pending:
+        node = pending.pop()
+        if node in needed:
+            continue
+        needed.add(node)
+        pending.extend(NODE_DEPENDENCIES.get(node, []))
+    return [n for tier in NODE_TIERS for n in tier if n in needed]
+
+def _route_from(tier_index: int):
+    """
+    Builds the conditional edge that picks the next non-empty tier of the route.
+    """
+    def route(state: State) -> List[str]:
+        selected = set(state.get("route", []))
+        for tier in NODE_TIERS[tier_index:]:
+            nodes = [n for n in tier if n in selected]
+            if nodes:
+                return nodes
+        return ["response"]
+    return route
+
+# Progress labels for node-completion events on the streaming endpoint.
+NODE_LABELS: Dict[str, str] = {
+    "chat_history": "history loaded",
+    "farmer_profile": "profile ready",
+    "farmer_interaction": "query understood",
+    "sensor_data": "sensor data ready",
+    "agmarket_price": "market price ready",
+    "weather": "weather ready",
+    "crop_health": "crop health ready",
+    "disease_prediction": "disease risk ready",
+    "lifecycle_planning": "plan ready",
+    "fused_analysis": "analysis ready",
+    "response": "answer ready",
+}
+
 # ------------ Nodes (agents) ------------
 async def chat_history_node(state: State) -> State:
+    """
+    Loads recent turns and the session's rolling summary (kept up to date after each saved turn).
+    """
     history = await get_chat_history(state["user_id"], state["session_id"], limit=20)
-    history_text = render_history_for_prompt(history)
-    sys = "Summarize this farmer-assistant chat briefly. Keep goals, crops, and unresolved items. <= 120 words."
-    user = history_text or "No prior messages."
-    summary = (await llm.ainvoke([SystemMessage(content=sys), HumanMessage(content=user)])).content
+    summary = await get_history_summary(state["user_id"], state["session_id"])
     return {
         "history": history,
         "history_summary": summary,
         **_trace("history_loaded")
     }
 
+def _crop(state: State, default: str = "unknown crop") -> str:
+    query = state.get("query") or QueryExtraction()
+    if query.resolved("crop"):
+        return query.crop
+    crops = state.get("profile", {}).get("crops", [])
+    return crops[0] if crops else default
+
+def _localize(query: QueryExtraction, city: Optional[Place], market: Optional[Place]) -> QueryExtraction:
+    """
+    Canonical weather city from `city` and AgMarket market and state from `market`, each kept
+    separate so a mandi named for prices never replaces the city asked about for weather.
+    """
+    update: Dict[str, str] = {}
+    if city is not None:
+        update["city"] = city.name
+    if market is not None and market.market:
+        update["market"] = market.market
+        update["state"] = market.state
+    return query.model_copy(update=update)
+
+def _lookup_places(query: QueryExtraction, profile: Dict[str, Any]) -> tuple:
+    """
+    Gazetteer places for the extracted city and market. An unresolved market falls back to the
+    city's own mandi; a market the gazetteer does not know is left as the model named it.
+    """
+    city = gazetteer.lookup(query.city if query.resolved("city") else profile.get("location", ""))
+    if not query.resolved("market"):
+        return city, city
+    return city, gazetteer.lookup(query.market)
+
+# Whole words only (plural allowed), so "training" is not "rain" and "plant" is not "plan".
+_INTENT_WORDS = {i: re.compile(rf"\b{i}s?\b") for i in INTENTS}
+
+def keyword_intents(message: str) -> List[str]:
+    """
+    Intents named outright in the message; the fallback when extraction misses its deadline.
+    """
+    text = message.lower()
+    return [i for i, pattern in _INTENT_WORDS.items() if pattern.search(text)]
+
 async def farmer_interaction_node(state: State) -> State:
-    # Detect intents
-    prompt = [
-        SystemMessage(content="You triage farmer queries. Output all relevant intents separated by commas: status, weather, disease, plan, advice, market, price."),
-        HumanMessage(content=f"User message: {state['message']}"),
-    ]
-    resp = await llm.ainvoke(prompt)
-    intents = [i.strip() for i in resp.content.lower().split(",") if i.strip()]
-
-    # Try to extract crop from user query
-    crop_prompt = [
-        SystemMessage(content="Extract the crop name from the following user message. If none, reply 'none'."),
-        HumanMessage(content=state["message"])
-    ]
-    crop_resp = await llm.ainvoke(crop_prompt)
-    crop_query = crop_resp.content.strip().lower()
-    crop_query = None if crop_query == "none" else crop_query
-
-    return {"intent": intents, "query_crop": crop_query, **_trace(f"intent={intents}, crop={crop_query}")}
+    """
+    Single extraction pass: intents, crop, weather city and market/state in one call.
+    Places are resolved against the bundled gazetteer first; when the message names exactly one
+    known city or mandi the model only classifies intents and crop. Location fields fall back to
+    the registered profile location.
+    """
+    profile = state.get("profile", {})
+    # States alone do not pick a market; let the model use the profile for those.
+    named = [p for p in gazetteer.find_in_text(state["message"]) if p.kind != "state"]
+    if len(named) == 1:
+        # No location in the prompt, so the cached extraction is shared across farmers.
+        sys = (
+            "You triage farmer queries. "
+            "intents: all relevant intents. crop: crop named in the message. "
+            f"Leave city, market and state as '{UNRESOLVED}'. "
+            f"Use '{UNRESOLVED}' for anything you cannot determine."
+        )
+        user = f"User message: {state['message']}"
+    else:
+        # No place, or several (weather in one, prices at another): the model assigns them.
+        sys = (
+            "You triage farmer queries and extract lookup fields. "
+            "intents: all relevant intents. crop: crop named in the message. "
+            "city: city to fetch weather for; if the user asks about a city other than the registered location, use that city. "
+            "market and state: AgMarket market and Indian state for a price lookup. "
+            "If the message names different places for weather and prices, keep them apart. "
+            "If the message names no location, derive city, market and state from the registered location. "
+            f"Use '{UNRESOLVED}' for anything you cannot determine."
+        )
+        user = (
+            f"Registered location: {profile.get('location') or UNRESOLVED}\n"
+            f"User message: {state['message']}"
+        )
+    try:
+        # At most half of the time left for routed work, so the lookups still get the other half.
+        query: QueryExtraction = await asyncio.wait_for(
+            cached_ainvoke("extraction", [SystemMessage(content=sys), HumanMessage(content=user)], get_structured_llm(QueryExtraction)),
+            timeout=max(_time_left(state) / 2, 0.5),
+        )
+    except asyncio.TimeoutError:
+        NODE_TIMEOUTS.inc("farmer_interaction")
+        query = QueryExtraction(intents=keyword_intents(state["message"]), city=profile.get("location") or UNRESOLVED)
+
+    if len(named) == 1:
+        city = market = named[0]
+        source = "gazetteer"
+    else:
+        city, market = _lookup_places(query, profile)
+        source = "llm"
+    query = _localize(query, city, market)
+    route = fuse_route(resolve_route(query.intents), query.intents)
+    skipped = [n for tier in NODE_TIERS for n in tier if n not in route]
+    return {
+        "query": query,
+        "route": route,
+        **_trace(f"query={query.model_dump()}, location from {source}, route={route}, skipped={skipped}")
+    }
+
+# Weight of a farmer's own location and crops in the prefetch hot set, per request they make.
+PROFILE_PREFETCH_WEIGHT = float(os.getenv("PROFILE_PREFETCH_WEIGHT", "0.5"))
+
+def _watch_profile(profile: Dict[str, Any]) -> None:
+    """
+    Active farmers are likely to ask about their own place and crops: count those lookups
+    towards the prefetch hot set even when this request does not make them.
+    """
+    place = gazetteer.lookup(profile.get("location", ""))
+    if place is None:
+        return
+    watch_weather(place.name, PROFILE_PREFETCH_WEIGHT)
+    if place.market:
+        for crop in profile.get("crops") or ():
+            watch_price(crop, place.state, place.market, PROFILE_PREFETCH_WEIGHT)
 
 async def farmer_profile_node(state: State) -> State:
     profile = await get_farmer_profile(state["user_id"])
+    _watch_profile(profile)
     return {"profile": profile, **_trace("profile")}
 
 async def sensor_data_node(state: State) -> State:
-    sensors = await get_latest_sensor_data(state["user_id"])
+    sensors = await get_latest_sensor_data(state["user_id"], ranges=crop_ranges(_crop(state)))
     return {"sensors": sensors, **_trace("sensors")}
 
 async def weather_node(state: State) -> State:
     """
-    Gets location from user query if present, else uses profile location.
+    Fetches weather for the extracted city, else the profile location.
     """
-    profile = state.get("profile", {})
-    # Try to extract location from user query using LLM
-    location_prompt = [
-       SystemMessage(content="Extract the city name from the following user message. If the user asks about a city other than the registered location, reply with that city name. If none, reply 'none'."),
-        HumanMessage(content=state["message"])
-    ]
-    location_resp = await llm.ainvoke(location_prompt)
-    location_query = location_resp.content.strip()
-    location = location_query if location_query.lower() != "none" else profile.get("location", "")
-
+    query = state.get("query") or QueryExtraction()
+    location = query.city if query.resolved("city") else state.get("profile", {}).get("location", "")
+    if not location:
+        weather = LocalWeather(forecast_error="Location unknown; ask the farmer which town or district the field is in.")
+        return {"weather": weather, **_trace(f"weather skipped: location {UNRESOLVED}")}
     weather = await get_local_weather(location)
     return {"weather": weather, **_trace(f"weather for {location}")}
 
 async def crop_health_node(state: State) -> State:
+    """
+    Scores the sensors against the crop's threshold table. A plain status check with every
+    reading in range is answered from a template; otherwise the LLM gets the computed deviations.
+    """
     profile = state.get("profile", {})
-    crops = profile.get("crops", [])
-    crop = state.get("query_crop") or (crops[0] if crops else "unknown crop")
+    crop = _crop(state)
     sensors = state.get("sensors", {})
+    thresholds = crop_thresholds(crop)
+    scored = score_deviations(sensors, thresholds or GENERIC_THRESHOLDS)
+    intents = (state.get("query") or QueryExtraction()).intents
+    if thresholds and scored["nominal"] and is_status_check(intents):
+        scored["templated"] = True
+        return {
+            "crop_analysis": nominal_status_message(crop, scored),
+            "crop_deviations": scored,
+            **_trace("crop_analysis (template, readings nominal)"),
+        }
+    basis = f"{crop} thresholds" if thresholds else "generic thresholds (crop not in table; adjust from your knowledge)"
     sys = (
-        "You are an expert agronomist. From your knowledge, infer ideal environmental ranges "
-        "for the specified crop (temperature, humidity, soil moisture, rainfall if relevant). "
-        "Compare those inferred ideals with the provided sensor readings. "
-        "Point out any risks or deviations and provide practical, field-ready advice. "
-        "Be concise and avoid hedging."
+        "You are an expert agronomist. Sensor readings have already been scored against acceptable ranges "
+        "for the crop. Explain the deviations that matter, their likely effect on the crop, and give "
+        "practical, field-ready advice. Be concise and avoid hedging."
     )
     user = (
         f"Recent chat summary: {state.get('history_summary','')}\n"
-        f"Crop: {crop}\nFarmer context: {profile}\nSensors: {sensors}\n"
+        f"Crop: {crop}\nFarmer context: {format_profile(profile)}\n"
+        f"Deviations vs {basis}:\n{format_deviations(scored)}\n"
+        f"Sensors:\n{format_sensors(sensors)}\n"
         "Output: 3–5 bullets and a line starting with 'Action:'"
     )
-    resp = await llm.ainvoke([SystemMessage(content=sys), HumanMessage(content=user)])
-    return {"crop_analysis": resp.content, **_trace("crop_analysis")}
+    resp = await get_llm().ainvoke([SystemMessage(content=sys), HumanMessage(content=user)])
+    return {"crop_analysis": resp.content, "crop_deviations": scored, **_trace("crop_analysis")}
 
 async def disease_prediction_node(state: State) -> State:
-    profile = state.get("profile", {})
-    crops = profile.get("crops", [])
-    crop = state.get("query_crop") or (crops[0] if crops else "unknown crop")
+    crop = _crop(state)
     sensors = state.get("sensors", {})
-    weather = state.get("weather", {})
+    weather = state.get("weather")
     sys = "Plant pathologist. Estimate near-term disease risks and preventive actions."
     user = (
         f"Recent chat summary: {state.get('history_summary','')}\n"
-        f"Crop: {crop}\nSensors: {sensors}\nWeather: {weather}"
+        f"Crop: {crop}\nSensors:\n{format_sensors(sensors)}\nWeather: {format_weather(weather)}"
     )
-    resp = await llm.ainvoke([SystemMessage(content=sys), HumanMessage(content=user)])
+    resp = await get_llm().ainvoke([SystemMessage(content=sys), HumanMessage(content=user)])
     return {"disease_risk": resp.content, **_trace("disease_risk")}
 
 async def agmarket_price_node(state: State) -> State:
     """
-    Node to extract state and market for agri market price lookup.
-    Uses location from user query if present, else profile location.
+    Looks up the mandi price for the extracted market and state.
     Uses crop from user query if present, else profile crop.
     """
-    profile = state.get("profile", {})
-    # Try to extract location from user query using LLM
-    location_prompt = [
-        SystemMessage(content="Extract the location (city or market and state) from the following user message. If none, reply 'none'."),
-        HumanMessage(content=state["message"])
-    ]
-    location_resp = await llm.ainvoke(location_prompt)
-    location_query = location_resp.content.strip()
-    location = location_query if location_query.lower() != "none" else profile.get("location", "")
-
-    crop = state.get("query_crop") or profile.get("crops", ["wheat"])[0]
-
-    # Prompt LLM to extract state and market from location string only
-    sys = (
-        "Extract the market and state from the following location string. "
-        "Reply in the format: Market: <market>, State: <state>"
-    )
-    user = f"Location: {location}"
-    resp = await llm.ainvoke([SystemMessage(content=sys), HumanMessage(content=user)])
+    query = state.get("query") or QueryExtraction()
+    crop = _crop(state, default="wheat")
+    if not (query.resolved("market") and query.resolved("state")):
+        price_data = MarketPrice(crop, query.state, query.market, error="Could not resolve market and state for the price lookup.")
+        return {"market_price": price_data, **_trace(f"market_price skipped for {crop}: location {UNRESOLVED}")}
 
-    # Parse response for market and state
-    match = re.search(r"Market:\s*([^\n,]+).*State:\s*([^\n,]+)", resp.content)
-    if match:
-        market_name, state_name = match.groups()
-    else:
-        market_name, state_name = "chennai", "Tamil nadu"  # fallback
-
-    price_data = await get_agri_market_price(crop, state_name.strip(), market_name.strip())
-    return {"market_price": price_data, **_trace(f"market_price for {crop} at {market_name}, {state_name}")}
+    price_data = await get_agri_market_price(crop, query.state, query.market)
+    return {"market_price": price_data, **_trace(f"market_price for {crop} at {query.market}, {query.state}")}
 
 
 async def lifecycle_planning_node(state: State) -> State:
     profile = state.get("profile", {})
-    crops = profile.get("crops", [])
-    crop = state.get("query_crop") or (crops[0] if crops else "unknown crop")
-    weather = state.get("weather", {})
+    crop = _crop(state)
+    weather = state.get("weather")
     sys = "You prepare seasonal crop operation plans."
     user = (
         f"Crop: {crop}\n"
-        f"Location: {profile.get('location')}\n"
-        f"Weather summary: {weather}\n"
+        f"Location: {profile.get('location') or 'unknown'}\n"
+        f"Weather summary: {format_weather(weather)}\n"
         "Output: near-term 2-4 week plan (sow/fertilize/irrigate/spray/harvest cues)."
     )
-    resp = await llm.ainvoke([SystemMessage(content=sys), HumanMessage(content=user)])
+    resp = await get_llm().ainvoke([SystemMessage(content=sys), HumanMessage(content=user)])
     return {"plan": resp.content, **_trace("plan")}
 
-async def response_synthesizer_node(state: State) -> State:
+async def fused_analysis_node(state: State) -> State:
     """
-    Synthesizes the final response for the farmer based on detected intents and context parts.
-    Includes market price, weather, crop health, disease, and plan as relevant.
+    Every requested analysis section (and, with FUSED_ANSWER, the farmer-facing answer) from one
+    structured LLM call, with crop, profile, sensors, weather and history summary sent once.
+    Sections are copied back into the State keys the separate analysis nodes would have set.
     """
-    msg = state["message"]
-    intent = state.get("intent", [])
     profile = state.get("profile", {})
-    market_price_info = format_market_price(state.get("market_price", {}))
-    weather_info = format_weather(state.get("weather", {}))
-    crop_health_info = state.get("crop_analysis", "")
-    disease_info = state.get("disease_risk", "")
-    plan_info = state.get("plan", "")
+    crop = _crop(state)
+    sensors = state.get("sensors", {})
+    intents = (state.get("query") or QueryExtraction()).intents
+    wanted = [n for n in FUSED_SECTIONS if n in {INTENT_NODES.get(i) for i in intents}]
+    draft_answer = FUSED_ANSWER and not state.get("streaming")
+    thresholds = crop_thresholds(crop)
+    scored = score_deviations(sensors, thresholds or GENERIC_THRESHOLDS)
+    basis = f"{crop} thresholds" if thresholds else "generic thresholds (crop not in table; adjust from your knowledge)"
 
-    # Build context parts based on detected intents
+    sections = [f"- {FUSED_SECTIONS[n][0]}: {FUSED_SECTIONS[n][1]}" for n in wanted]
+    sys = (
+        "You are an expert agronomist, plant pathologist and crop planner. Sensor readings have already "
+        "been scored against acceptable ranges for the crop. Write only the requested sections and leave "
+        "the other fields empty. Be concise, practical and field-ready; avoid hedging."
+    )
+    user = (
+        f"Recent chat summary: {state.get('history_summary','')}\n"
+        f"Crop: {crop}\nFarmer context: {format_profile(profile)}\n"
+        f"Deviations vs {basis}:\n{format_deviations(scored)}\n"
+        f"Sensors:\n{format_sensors(sensors)}\n"
+        f"Weather: {format_weather(state.get('weather'))}\n"
+    )
+    if draft_answer:
+        lookups = {k: v for k, v in _answer_parts(state).items() if PART_NODES[k] not in FUSED_SECTIONS}
+        sections.append(
+            "- answer: the farmer-facing reply to the user query, <= 180 words, answering each topic asked "
+            "from the sections above and these lookups; if a lookup is "
+            f"'{UNAVAILABLE}', say in one short sentence that it could not be fetched right now; if it needs "
+            "the farmer's location and none is known, ask for their town or district"
+        )
+        user += f"User query: {state['message']}\nLookups: {lookups}\n"
+    user += "Sections:\n" + "\n".join(sections)
+
+    result: FusedAnalysis = await get_structured_llm(FusedAnalysis).ainvoke(
+        [SystemMessage(content=sys), HumanMessage(content=user)]
+    )
+    delta: Dict[str, Any] = {FUSED_SECTIONS[n][0]: getattr(result, FUSED_SECTIONS[n][0]) for n in wanted}
+    if "crop_health" in wanted:
+        delta["crop_deviations"] = scored
+    # A requested section the model left empty is reported like a node that missed its deadline.
+    missing = [n for n in wanted if not delta[FUSED_SECTIONS[n][0]].strip()]
+    if draft_answer and result.answer and not missing:
+        delta["fused_answer"] = result.answer
+    note = f"fused_analysis ({', '.join(wanted)}{', answer' if draft_answer else ''})"
+    if missing:
+        note += f", missing {', '.join(missing)}"
+    return {**delta, "unavailable": missing, **_trace(note)}
+
+def _answer_parts(state: State) -> Dict[str, str]:
+    """
+    Context parts for the answer, by intent; parts whose node missed its deadline are marked.
+    """
+    intent = (state.get("query") or QueryExtraction()).intents
     parts = {}
     if any(i in intent for i in ["market", "price"]):
-        parts["Market price"] = market_price_info
+        parts["Market price"] = format_market_price(state.get("market_price"))
     if any(i in intent for i in ["weather", "rain"]):
-        parts["Weather"] = weather_info
+        parts["Weather"] = format_weather(state.get("weather"))
     if any(i in intent for i in ["health", "status"]):
-        parts["Crop health"] = crop_health_info
+        parts["Crop health"] = state.get("crop_analysis", "")
     if "disease" in intent:
-        parts["Disease"] = disease_info
+        parts["Disease"] = state.get("disease_risk", "")
     if "plan" in intent:
-        parts["Plan"] = plan_info
+        parts["Plan"] = state.get("plan", "")
+    unavailable = set(state.get("unavailable", []))
+    if "fused_analysis" in unavailable:
+        unavailable.update(FUSED_SECTIONS)
+    for name in parts:
+        if PART_NODES[name] in unavailable:
+            parts[name] = UNAVAILABLE
+    return parts
+
+async def response_synthesizer_node(state: State) -> State:
+    """
+    Synthesizes the final response for the farmer based on detected intents and context parts.
+    Includes market price, weather, crop health, disease, and plan as relevant.
+    """
+    msg = state["message"]
+    intent = (state.get("query") or QueryExtraction()).intents
+    profile = state.get("profile", {})
+    crop_health_info = state.get("crop_analysis", "")
+
+    # Build context parts based on detected intents
+    parts = _answer_parts(state)
 
     # System prompt to guide the LLM
     sys = (
         "Farmer-facing assistant. Reply concisely and only about the user's query. "
         "If the user asks about market price, do not include crop health alerts. "
         "If the user asks about weather or rain, use the provided weather data and forecast. "
-        "If multiple topics are asked, answer each clearly."
+        "If multiple topics are asked, answer each clearly. "
+        "If the answer needs the farmer's location and the profile has none, ask for their town or district. "
+        f"If a part is '{UNAVAILABLE}', say in one short sentence that it could not be fetched right now."
     )
     user = (
         f"User query: {msg}\n"
-        f"Farmer profile: {profile}\n"
+        f"Farmer profile: {format_profile(profile)}\n"
         f"Context parts: {parts}\n"
         "<= 180 words."
     )
 
-    resp = await llm.ainvoke([SystemMessage(content=sys), HumanMessage(content=user)])
-    final = resp.content
-    final_cleaned = clean_response(final)
+    if is_status_check(intent) and state.get("crop_deviations", {}).get("templated"):
+        # Nominal status check: the crop health template already is the answer.
+        final_cleaned = clean_response(crop_health_info)
+    elif state.get("fused_answer"):
+        # The fused analysis call already wrote the answer from the same parts.
+        final_cleaned = clean_response(state["fused_answer"])
+    else:
+        remaining = _time_left(state) + RESPONSE_RESERVE_S
+        try:
+            resp = await asyncio.wait_for(
+                get_llm().ainvoke([SystemMessage(content=sys), HumanMessage(content=user)]),
+                timeout=max(remaining, 1.0),
+            )
+            final_cleaned = clean_response(resp.content)
+        except asyncio.TimeoutError:
+            NODE_TIMEOUTS.inc("response")
+            final_cleaned = _fallback_answer(parts)
     await save_chat_turn(state["user_id"], state["session_id"], msg, final_cleaned)
     return {"final_response": final_cleaned, **_trace("final")}
 
+def _fallback_answer(parts: Dict[str, str]) -> str:
+    # Used when the final LLM call misses the deadline: the ready parts, unsynthesized.
+    ready = [f"{name}: {clean_response(text)}" for name, text in parts.items() if text and text != UNAVAILABLE]
+    if not ready:
+        return "Sorry, I could not get an answer in time. Please try again in a minute."
+    return "Sorry, I could not prepare a full answer in time. Here is what I have. " + " ".join(ready)
+
+# ------------ Deadlines ------------
+UNAVAILABLE = "unavailable (did not respond in time)"
+
+# Synthesizer part -> routed node that produces it.
+PART_NODES: Dict[str, str] = {
+    "Market price": "agmarket_price",
+    "Weather": "weather",
+    "Crop health": "crop_health",
+    "Disease": "disease_prediction",
+    "Plan": "lifecycle_planning",
+}
+
+# Node -> (state key it fills, placeholder used when it misses its deadline). History and profile
+# loads are bounded too, so a stalled store degrades the answer instead of holding every request.
+NODE_FALLBACKS: Dict[str, tuple] = {
+    "chat_history": ("history", []),
+    "farmer_profile": ("profile", {}),   # no location or crops: the answer asks for them
+    "sensor_data": ("sensors", {}),
+    "agmarket_price": ("market_price", MarketPrice("", "", "", error=UNAVAILABLE)),
+    "weather": ("weather", LocalWeather()),
+    "crop_health": ("crop_analysis", ""),
+    "disease_prediction": ("disease_risk", ""),
+    "lifecycle_planning": ("plan", ""),
+    "fused_analysis": ("crop_analysis", ""),
+}
+
+def _time_left(state: State) -> float:
+    """
+    Seconds until routed work must be done (the deadline less the synthesizer's reserve).
+    """
+    deadline = state.get("deadline", time.monotonic() + REQUEST_BUDGET_S)
+    return deadline - RESPONSE_RESERVE_S - time.monotonic()
+
+def with_deadline(name: str, fn, limit: Optional[float] = None):
+    """
+    Bounds a node by the request deadline (less the synthesizer's reserve) and, when given, by
+    `limit` seconds. A node that runs out of time returns its placeholder and is listed in
+    `unavailable` instead of failing.
+    """
+    key, placeholder = NODE_FALLBACKS[name]
+
+    async def node(state: State) -> State:
+        timeout = _time_left(state) if limit is None else min(_time_left(state), limit)
+        try:
+            if timeout <= 0:
+                raise asyncio.TimeoutError
+            return await asyncio.wait_for(fn(state), timeout=timeout)
+        except asyncio.TimeoutError:
+            NODE_TIMEOUTS.inc(name)
+            logger.warning("node %s missed the request deadline", name)
+            return {key: placeholder, "unavailable": [name], **_trace(f"{name} unavailable (deadline)")}
+    node.__name__ = getattr(fn, "__name__", name)
+    return node
+
 # ------------ Build and run the graph ------------
+_NODES: Dict[str, Any] = {
+    "chat_history": chat_history_node,
+    "farmer_interaction": farmer_interaction_node,
+    "farmer_profile": farmer_profile_node,
+    "sensor_data": sensor_data_node,
+    "weather": weather_node,
+    "crop_health": crop_health_node,
+    "disease_prediction": disease_prediction_node,
+    "lifecycle_planning": lifecycle_planning_node,
+    "fused_analysis": fused_analysis_node,
+    "response": response_synthesizer_node,
+    "agmarket_price": agmarket_price_node,
+}
+
 def _build_graph():
+    from langgraph.graph import StateGraph, START, END   # heavy; loaded on first compile
+
     g = StateGraph(State)
-    g.add_node("chat_history", chat_history_node)
-    g.add_node("farmer_interaction", farmer_interaction_node)
-    g.add_node("farmer_profile", farmer_profile_node)
-    g.add_node("sensor_data", sensor_data_node)
-    g.add_node("weather", weather_node)
-    g.add_node("crop_health", crop_health_node)
-    g.add_node("disease_prediction", disease_prediction_node)
-    g.add_node("lifecycle_planning", lifecycle_planning_node)
-    g.add_node("response", response_synthesizer_node)
-    g.add_node("agmarket_price", agmarket_price_node)
-
-    g.set_entry_point("chat_history")
-    g.add_edge("chat_history", "farmer_interaction")
-    g.add_edge("farmer_interaction", "farmer_profile")
-    g.add_edge("farmer_profile", "sensor_data")
-    g.add_edge("farmer_profile", "agmarket_price")
-    g.add_edge("agmarket_price", "sensor_data")
-    g.add_edge("farmer_profile", "weather")
-    g.add_edge("sensor_data", "crop_health")
-    g.add_edge("sensor_data", "disease_prediction")
-    g.add_edge("weather", "disease_prediction")
-    g.add_edge("weather", "lifecycle_planning")
-    g.add_edge("crop_health", "response")
-    g.add_edge("disease_prediction", "response")
-    g.add_edge("lifecycle_planning", "response")
+    for name, fn in _NODES.items():
+        if name in NODE_FALLBACKS:
+            fn = with_deadline(name, fn, LOAD_TIMEOUT_S if name in ("chat_history", "farmer_profile") else None)
+        g.add_node(name, instrument_node(name, fn))
+
+    g.add_edge(START, "chat_history")
+    g.add_edge(START, "farmer_profile")
+    g.add_edge(["chat_history", "farmer_profile"], "farmer_interaction")
+    tier_targets = [n for tier in NODE_TIERS for n in tier] + ["response"]
+    g.add_conditional_edges("farmer_interaction", _route_from(0), tier_targets)
+    for index, tier in enumerate(NODE_TIERS):
+        for node in tier:
+            g.add_conditional_edges(node, _route_from(index + 1), tier_targets)
     g.add_edge("response", END)
     return g.compile()
 
-_compiled_graph = _build_graph()
+_compiled_graph = None
+
+def get_graph():
+    """
+    Returns the compiled graph, compiling it on first use (normally during the lifespan warm-up).
+    """
+    global _compiled_graph
+    if _compiled_graph is None:
+        _compiled_graph = _build_graph()
+    return _compiled_graph
+
+def _run_config(user_id: str) -> Dict[str, Any]:
+    # user_id in run metadata lets the LLM scheduler share capacity fairly between farmers.
+    return {"metadata": {"user_id": user_id}}
+
+def _initial_state(user_id: str, session_id: str, message: str, streaming: bool = False) -> State:
+    return {
+        "user_id": user_id,
+        "session_id": session_id,
+        "message": message,
+        "deadline": time.monotonic() + REQUEST_BUDGET_S,
+        "streaming": streaming,
+        "unavailable": [],
+        "trace": [],
+    }
+
+async def _invoke_graph(user_id: str, session_id: str, message: str) -> str:
+    initial = _initial_state(user_id, session_id, message)
+    with memory_profiler.request():
+        result: State = await get_graph().ainvoke(initial, config=_run_config(user_id))
+    logger.info("trace=%s", result.get("trace"))
+    return result.get("final_response", "Sorry, something went wrong.")
 
 async def run_langgraph_workflow(user_id: str, session_id: str, message: str) -> str:
-    initial: State = {"user_id": user_id, "session_id": session_id, "message": message, "trace": []}
     try:
-        result: State = await _compiled_graph.ainvoke(initial)
-        print("Trace:", result.get("trace"))
-        return result.get("final_response", "Sorry, something went wrong.")
+        return await _invoke_graph(user_id, session_id, message)
+    except Exception as e:
+        logger.exception("Graph execution failed")
+        return f"Error: {e}"
+
+async def run_langgraph_batch(items: List[Dict[str, str]], concurrency: int = BATCH_CONCURRENCY) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Runs many (user_id, session_id, message) items, at most `concurrency` graphs at a time, and
+    yields {"event": "result" | "error", "index": ...} per item in completion order, then
+    {"event": "done", ...}. Weather, market and profile lookups are shared across the batch,
+    so upstream work grows with distinct locations/markets rather than with messages.
+    """
+    memo = BatchMemo()
+    batch_context = contextvars.copy_context()
+    batch_context.run(use_batch_memo, memo)
+    gate = asyncio.Semaphore(concurrency)
+    # Messages of one session run in batch order so each sees the previous turn.
+    session_locks: Dict[tuple, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+    async def one(index: int, item: Dict[str, str]) -> Dict[str, Any]:
+        ids = {"index": index, "user_id": item["user_id"], "session_id": item["session_id"]}
+        async with session_locks[(item["user_id"], item["session_id"])], gate:
+            try:
+                with timed(CHAT_REQUEST_SECONDS, "batch"):
+                    response = await _invoke_graph(item["user_id"], item["session_id"], item["message"])
+                return {"event": "result", **ids, "response": response}
+            except Exception as e:
+                logger.exception("Graph execution failed for batch item %d", index)
+                return {"event": "error", **ids, "detail": str(e)}
+
+    # Each item runs in its own copy of the batch context: the memo is shared, per-request state is not.
+    tasks = [batch_context.copy().run(asyncio.ensure_future, one(i, item)) for i, item in enumerate(items)]
+    errors = 0
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            event = await next_done
+            errors += event["event"] == "error"
+            yield event
+    finally:
+        for task in tasks:
+            task.cancel()
+    yield {"event": "done", "items": len(items), "errors": errors, "shared_lookups": memo.stats()}
+
+async def stream_langgraph_workflow(user_id: str, session_id: str, message: str) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Runs the graph and yields events as they happen:
+    {"event": "node", ...} when a node completes, {"event": "token", "text": ...} for cleaned
+    answer text from the response node, then {"event": "done", "response": ...} (or "error").
+    """
+    initial = _initial_state(user_id, session_id, message, streaming=True)
+    cleaner = StreamingResponseCleaner()
+    trace: List[str] = []
+    final = ""
+    try:
+        with memory_profiler.request():
+            async for mode, chunk in get_graph().astream(initial, config=_run_config(user_id), stream_mode=["updates", "messages"]):
+                if mode == "messages":
+                    msg_chunk, metadata = chunk
+                    if metadata.get("langgraph_node") != "response" or not isinstance(msg_chunk.content, str):
+                        continue
+                    text = cleaner.feed(msg_chunk.content)
+                    if text:
+                        yield {"event": "token", "text": text}
+                    continue
+                for node, delta in chunk.items():
+                    delta = delta or {}
+                    trace.extend(delta.get("trace", []))
+                    if node == "response":
+                        final = delta.get("final_response", "")
+                        rest = cleaner.flush(final)
+                        if rest:
+                            yield {"event": "token", "text": rest}
+                    yield {"event": "node", "node": node, "label": NODE_LABELS.get(node, node)}
+        logger.info("trace=%s", trace)
+        yield {"event": "done", "response": final or "Sorry, something went wrong."}
     except Exception as e:
-        print("Graph execution failed:", e)
-        return f"Error: {e}"
\ No newline at end of file
+        logger.exception("Graph execution failed")
+        yield {"event": "error", "detail": str(e)}
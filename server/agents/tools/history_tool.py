@@ -1,19 +1,122 @@
-from typing import List, Dict, Any
+import asyncio
+import contextvars
+import logging
+import os
+from typing import List, Dict, Any, Iterable, Optional
+from langchain_core.messages import SystemMessage, HumanMessage
+from ..agent_roles import get_llm
+from ...services.storage import Turn, get_store
+from ...services.storage.batcher import WriteBatcher
 
-# Simple in-memory store (global variable)
-_chat_history_store: Dict[str, List[Dict[str, Any]]] = {}
+logger = logging.getLogger(__name__)
 
-async def get_chat_history(user_id: str, session_id: str, limit: int = 20) -> List[Dict[str, Any]]:
+HISTORY_BATCH_SIZE = int(os.getenv("HISTORY_BATCH_SIZE", "100"))
+HISTORY_BATCH_INTERVAL = float(os.getenv("HISTORY_BATCH_INTERVAL", "0.05"))
+HISTORY_QUEUE_MAX = int(os.getenv("HISTORY_QUEUE_MAX", "10000"))         # queued turns while the store is down
+HISTORY_RETRY_MAX_S = float(os.getenv("HISTORY_RETRY_MAX_S", "30"))       # backoff cap for failed writes
+
+_batcher: Optional[WriteBatcher] = None
+_summary_tasks: Dict[str, asyncio.Task] = {}
+
+def _get_batcher() -> WriteBatcher:
+    global _batcher
+    if _batcher is None:
+        _batcher = WriteBatcher(
+            get_store(),
+            max_batch=HISTORY_BATCH_SIZE,
+            interval=HISTORY_BATCH_INTERVAL,
+            max_queue=HISTORY_QUEUE_MAX,
+            max_backoff=HISTORY_RETRY_MAX_S,
+            on_flush=_schedule_summary_updates,
+        )
+    return _batcher
+
+def _merge_pending(stored: List[Turn], pending: List[Turn]) -> List[Turn]:
+    """
+    Appends queued turns to the stored ones, skipping any that were written while the store was read
+    (the longest stored tail that repeats the start of the queue).
+    """
+    for overlap in range(min(len(stored), len(pending)), 0, -1):
+        if stored[-overlap:] == pending[:overlap]:
+            return stored + pending[overlap:]
+    return stored + pending
+
+async def get_chat_history(user_id: str, session_id: str, limit: int = 20) -> List[Turn]:
     key = f"{user_id}:{session_id}"
-    return _chat_history_store.get(key, [])[-limit:]
+    store = get_store()
+    if not store.buffered:
+        return await store.load_turns(key, limit)
+    # Turns still queued for writing, taken before the read so none is missed if a flush lands meanwhile.
+    pending = _get_batcher().pending(key)
+    return _merge_pending(await store.load_turns(key, limit), pending)[-limit:]
 
 async def save_chat_turn(user_id: str, session_id: str, user_msg: str, agent_msg: str):
     key = f"{user_id}:{session_id}"
-    turn = {"user": user_msg, "agent": agent_msg}
-    if key not in _chat_history_store:
-        _chat_history_store[key] = []
-    _chat_history_store[key].append(turn)
+    store = get_store()
+    turn = Turn(user_msg, agent_msg)
+    if store.buffered:
+        _get_batcher().submit(key, turn)  # summary update is scheduled once the turn is written
+    else:
+        await store.append_turns([(key, turn)])
+        _schedule_summary_updates([key])
 
-def render_history_for_prompt(history: List[Dict[str, Any]]) -> str:
+def render_history_for_prompt(history: List[Turn]) -> str:
     # Simple rendering for LLM prompt
-    return "\n".join([f"User: {h['user']}\nAgent: {h['agent']}" for h in history])
\ No newline at end of file
+    return "\n".join([f"User: {h.user}\nAgent: {h.agent}" for h in history])
+
+def history_stats() -> Dict[str, Any]:
+    stats = get_store().stats()
+    if _batcher is not None:
+        stats["batched_writes"] = _batcher.written
+        stats["batch_flushes"] = _batcher.flushes
+        stats["failed_writes"] = _batcher.failed_writes
+        stats["dropped_turns"] = _batcher.dropped
+    return stats
+
+async def flush_chat_history() -> None:
+    if _batcher is not None:
+        await _batcher.close()
+
+async def get_history_summary(user_id: str, session_id: str) -> str:
+    """
+    Returns the stored rolling summary; empty for new sessions.
+    """
+    summary, _ = await get_store().load_summary(f"{user_id}:{session_id}")
+    return summary
+
+async def _update_summary(key: str) -> str:
+    """
+    Folds only the turns added since the last summarization into the rolling summary.
+    """
+    store = get_store()
+    summary, summarized = await store.load_summary(key)
+    total = await store.count_turns(key)
+    while summarized < total:
+        new_turns = render_history_for_prompt((await store.load_turns_since(key, summarized))[-20:])
+        sys = (
+            "Update the running summary of a farmer-assistant chat with the new turns. "
+            "Keep goals, crops, and unresolved items. <= 120 words."
+        )
+        user = f"Current summary: {summary or 'none'}\nNew turns:\n{new_turns}"
+        summary = (await get_llm().ainvoke([SystemMessage(content=sys), HumanMessage(content=user)])).content
+        await store.save_summary(key, summary, total)
+        summarized, total = total, await store.count_turns(key)
+    return summary
+
+def _schedule_summary_updates(keys: Iterable[str]) -> None:
+    # One updater per session; a running one picks up turns added while it works.
+    for key in keys:
+        task = _summary_tasks.get(key)
+        if task is not None and not task.done():
+            continue
+        # Start from a fresh context so the request's graph callbacks (token streaming, node
+        # labels, timings) do not follow the summary call.
+        task = contextvars.Context().run(asyncio.ensure_future, _update_summary(key))
+        _summary_tasks[key] = task
+        task.add_done_callback(lambda t, key=key: _on_summary_done(key, t))
+
+def _on_summary_done(key: str, task: asyncio.Task) -> None:
+    if _summary_tasks.get(key) is task:
+        del _summary_tasks[key]
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("History summary update failed for %s", key, exc_info=task.exception())
@@ -1,30 +1,99 @@
-import httpx
-from typing import Dict, Any
+import asyncio
+import os
+import time
+from typing import Dict, Any, Set
+from ...models.tool_records import MarketPrice
+from ...services.http_client import hedged_get
+from ...services.prefetch import prefetcher
+from ...utils.batch_memo import batch_shared
+from ...utils.singleflight import SingleFlight
+from ...utils.ttl_cache import TTLCache
 
 AGMARKET_API = "https://agmarket-api-main.onrender.com/request"
 
-async def get_agri_market_price(commodity: str, state: str, market: str) -> Dict[str, Any]:
+# Mandi prices update daily: serve a cached price while it is fresh, serve it stale (and
+# revalidate in the background) up to the stale TTL, and remember upstream errors briefly.
+MARKET_FRESH_TTL = float(os.getenv("MARKET_FRESH_TTL", "3600"))
+MARKET_STALE_TTL = float(os.getenv("MARKET_STALE_TTL", "172800"))
+MARKET_ERROR_TTL = float(os.getenv("MARKET_ERROR_TTL", "60"))
+_price_cache = TTLCache(maxsize=int(os.getenv("MARKET_CACHE_SIZE", "2048")), ttl=MARKET_STALE_TTL)
+_price_flight = SingleFlight()
+_revalidations: Set[asyncio.Task] = set()
+
+def _price_key(commodity: str, state: str, market: str) -> tuple:
+    return tuple(" ".join((v or "").lower().split()) for v in (commodity, state, market))
+
+async def _fetch_agri_market_price(commodity: str, state: str, market: str) -> MarketPrice:
     params = {
         "commodity": commodity,
         "state": state,
         "market": market
     }
-    async with httpx.AsyncClient(timeout=10) as client:
-        try:
-            resp = await client.get(AGMARKET_API, params=params)
-            resp.raise_for_status()
-            data = resp.json()
-            # You can adjust this structure as needed
-            return {
-                "commodity": commodity,
-                "state": state,
-                "market": market,
-                "data": data
-            }
-        except Exception as e:
-            return {
-                "error": str(e),
-                "commodity": commodity,
-                "state": state,
-                "market": market
-            }
\ No newline at end of file
+    try:
+        resp = await hedged_get(AGMARKET_API, params=params)
+        resp.raise_for_status()
+        # Only the latest row is kept; the rest of the payload is dropped here.
+        return MarketPrice.from_agmarket(commodity, state, market, resp.json())
+    except Exception as e:
+        return MarketPrice(commodity, state, market, error=str(e))
+
+async def _refresh_price(key: tuple, commodity: str, state: str, market: str) -> MarketPrice:
+    result = await _fetch_agri_market_price(commodity, state, market)
+    now = time.monotonic()
+    if not result.error:
+        _price_cache.set(key, {"result": result, "fresh_until": now + MARKET_FRESH_TTL})
+        return result
+    previous = _price_cache.peek(key)   # a refresh is not a lookup: keep it out of the hit rate
+    if previous is not None and not previous["result"].error:
+        # Keep serving the last good price; retry upstream after the error TTL.
+        previous["result"] = previous["result"]._replace(stale=True)
+        previous["fresh_until"] = now + MARKET_ERROR_TTL
+        return previous["result"]
+    _price_cache.set(key, {"result": result, "fresh_until": now + MARKET_ERROR_TTL}, ttl=MARKET_ERROR_TTL)
+    return result
+
+def _revalidate(key: tuple, commodity: str, state: str, market: str) -> None:
+    if _price_flight.inflight(key):
+        return
+    task = asyncio.ensure_future(_price_flight.do(key, lambda: _refresh_price(key, commodity, state, market)))
+    _revalidations.add(task)
+    task.add_done_callback(_revalidations.discard)
+
+async def get_agri_market_price(commodity: str, state: str, market: str) -> MarketPrice:
+    """
+    Returns the mandi price for (commodity, state, market).
+    Concurrent identical lookups share one upstream call (and one lookup per batch); a stale
+    price is returned immediately (flagged "stale") while a background refresh runs.
+    """
+    key = _price_key(commodity, state, market)
+    watch_price(commodity, state, market)
+    return await batch_shared(("market",) + key, lambda: _get_price(key, commodity, state, market))
+
+async def _get_price(key: tuple, commodity: str, state: str, market: str) -> MarketPrice:
+    entry = _price_cache.get(key)
+    if entry is not None:
+        if entry["fresh_until"] <= time.monotonic():
+            _revalidate(key, commodity, state, market)
+            return entry["result"]._replace(stale=True)
+        return entry["result"]
+    return await _price_flight.do(key, lambda: _refresh_price(key, commodity, state, market))
+
+def watch_price(commodity: str, state: str, market: str, weight: float = 1.0) -> None:
+    """
+    Counts a likely lookup of (commodity, state, market) towards the prefetch hot set.
+    """
+    prefetcher.touch("market", _price_key(commodity, state, market), commodity, state, market, weight=weight)
+
+async def _prefetch_price(commodity: str, state: str, market: str) -> bool:
+    key = _price_key(commodity, state, market)
+    result = await _price_flight.do(key, lambda: _refresh_price(key, commodity, state, market))
+    return not result.error and not result.stale
+
+prefetcher.register("market", _prefetch_price, MARKET_FRESH_TTL)
+
+def market_cache_stats() -> Dict[str, Any]:
+    return {
+        **_price_cache.stats(),
+        "upstream_calls": _price_flight.calls,
+        "coalesced": _price_flight.coalesced,
+    }
@@ -1,8 +1,17 @@
+import os
 from typing import Dict, Any
 from datetime import datetime
+from ...models.farmerProfile import FarmerProfile
+from ...services.storage import get_store
+from ...utils.batch_memo import batch_shared
+from ...utils.ttl_cache import TTLCache
 
-# Replace with real MongoDB call later
-async def get_farmer_profile(user_id: str) -> Dict[str, Any]:
+# Read-through cache in front of the profile store.
+PROFILE_CACHE_TTL = float(os.getenv("PROFILE_CACHE_TTL", "300"))
+_profile_cache = TTLCache(maxsize=int(os.getenv("PROFILE_CACHE_SIZE", "10000")), ttl=PROFILE_CACHE_TTL)
+
+def _default_profile(user_id: str) -> Dict[str, Any]:
+    # Dummy profile for farmers without a stored one
     return {
         "farmer_id": "farmer123",
         "name": "Ravi",
@@ -10,4 +19,19 @@ async def get_farmer_profile(user_id: str) -> Dict[str, Any]:
         "land_size_acres": 3.2,
         "crops": ["wheat"],
         "updated_at": datetime.now().isoformat() + "Z",
-    }
\ No newline at end of file
+    }
+
+async def get_farmer_profile(user_id: str) -> Dict[str, Any]:
+    return await batch_shared(("profile", user_id), lambda: _load_profile(user_id))
+
+async def _load_profile(user_id: str) -> Dict[str, Any]:
+    profile = _profile_cache.get(user_id)
+    if profile is not None:
+        return profile
+    stored = await get_store().get_profile(user_id)
+    if stored is None:
+        profile = _default_profile(user_id)
+    else:
+        profile = {**stored, **FarmerProfile(**{"farmer_id": user_id, **stored}).model_dump()}
+    _profile_cache.set(user_id, profile)
+    return profile
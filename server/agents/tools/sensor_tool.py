@@ -1,9 +1,25 @@
-from typing import Dict, Any
-from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+from datetime import datetime, timezone
 import random
+from ...services.sensor_store import sensor_store
 
-# Replace with AWS IoT fetch later
-async def get_latest_sensor_data(user_id: str) -> Dict[str, Any]:
+async def get_latest_sensor_data(user_id: str, ranges: Optional[Dict[str, Tuple[float, float]]] = None) -> Dict[str, Any]:
+    """
+    Latest reading plus 1h/24h/7d aggregates from the farmer's ingested sensor history.
+    `ranges` (e.g. crop thresholds) sets what counts as out of range; generic ranges otherwise.
+    Falls back to a simulated reading for farmers that have not pushed any data yet.
+    """
+    buffer = sensor_store.get(user_id)
+    latest = buffer.latest() if buffer is not None else None
+    if latest is not None:
+        ts = latest.pop("ts")
+        return {
+            **latest,
+            "timestamp": datetime.fromtimestamp(ts, timezone.utc).isoformat().replace("+00:00", "Z"),
+            "aggregates": buffer.aggregates(ranges=ranges) if ranges else buffer.aggregates(),
+            "source": "sensors",
+        }
+    # Replace with AWS IoT fetch later
     return {
         "temperature": round(24 + random.uniform(-2, 2), 2),       
         "humidity": round(68 + random.uniform(-5, 5), 1),          
@@ -11,4 +27,5 @@ async def get_latest_sensor_data(user_id: str) -> Dict[str, Any]:
         "rainfall_mm": round(max(0, random.uniform(-0.2, 3.0)), 2),
         "gas_level": 140,                                         
         "timestamp": datetime.now().isoformat() + "Z",
+        "source": "simulated",
     }
@@ -1,75 +1,149 @@
-import httpx
-from typing import Dict, Any
+import asyncio
+from typing import Dict, Any, Hashable, Tuple
 import os
+from ...services.http_client import hedged_get
+from ...models.tool_records import LocalWeather, WeatherNow
+from ...services.prefetch import prefetcher
+from ...utils.batch_memo import batch_shared
+from ...utils.forecast_digest import summarize_forecast
+from ...utils.gazetteer import gazetteer
+from ...utils.singleflight import SingleFlight
+from ...utils.ttl_cache import TTLCache
 
 OPENWEATHER_API = "https://api.openweathermap.org/data/2.5/weather"
 OPENWEATHER_FORECAST_API = "https://api.openweathermap.org/data/2.5/forecast"
 OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY")  # Set this in your .env file
 
-async def get_current_weather(location: str) -> Dict[str, Any]:
+# Current conditions go stale quickly; the 3-hour forecast barely changes within minutes.
+WEATHER_NOW_TTL = float(os.getenv("WEATHER_NOW_TTL", "600"))
+WEATHER_FORECAST_TTL = float(os.getenv("WEATHER_FORECAST_TTL", "1800"))
+_weather_cache = TTLCache(maxsize=int(os.getenv("WEATHER_CACHE_SIZE", "1024")))
+_weather_flight = SingleFlight()
+
+def normalize_location(location: str) -> str:
+    return " ".join((location or "").lower().split())
+
+def weather_target(location: str) -> Tuple[Hashable, Dict[str, Any]]:
+    """
+    (cache key, query params) for a location. Places in the gazetteer are fetched by canonical
+    coordinates, so "Chennai", "chennai " and "Madras" share one key; anything else by name.
+    """
+    place = gazetteer.lookup(location)
+    if place is None:
+        return normalize_location(location), {"q": location}
+    return (place.lat, place.lon), {"lat": place.lat, "lon": place.lon}
+
+async def get_current_weather(location: str, refresh: bool = False) -> WeatherNow:
     """
-    Fetches current weather from OpenWeather API for the given city name.
-    Returns a dict with weather info or error.
+    Fetches current weather from OpenWeather API for the given place name.
+    Returns a WeatherNow record (with `error` set on failure). refresh=True skips the cache read (prefetch).
+    Concurrent misses for one place share a single upstream call.
     """
+    target, params = weather_target(location)
+    key = ("now", target)
+    cached = None if refresh else _weather_cache.get(key)
+    if cached is not None:
+        return cached
+    return await _weather_flight.do(key, lambda: _fetch_current(key, params))
+
+async def _fetch_current(key: Hashable, params: Dict[str, Any]) -> WeatherNow:
     params = {
-        "q": location,
+        **params,
         "appid": OPENWEATHER_API_KEY,
         "units": "metric"
     }
-    async with httpx.AsyncClient(timeout=10) as client:
-        try:
-            resp = await client.get(OPENWEATHER_API, params=params)
-            resp.raise_for_status()
-            data = resp.json()
-            return {
-                "temp_c": data["main"]["temp"],
-                "humidity": data["main"]["humidity"],
-                "rain_mm": data.get("rain", {}).get("1h", 0),
-                "weather": data.get("weather", [{}])[0].get("description", "")
-            }
-        except Exception as e:
-            return {"error": str(e)}
-        
-
+    try:
+        resp = await hedged_get(OPENWEATHER_API, params=params)
+        resp.raise_for_status()
+        data = resp.json()
+        now = WeatherNow(
+            temp_c=data["main"]["temp"],
+            humidity=data["main"]["humidity"],
+            rain_mm=data.get("rain", {}).get("1h", 0),
+            description=data.get("weather", [{}])[0].get("description", ""),
+        )
+    except Exception as e:
+        return WeatherNow(error=str(e))
+    _weather_cache.set(key, now, ttl=WEATHER_NOW_TTL)
+    return now
 
-async def get_5day_forecast(location: str) -> Dict[str, Any]:
+async def get_5day_forecast(location: str, refresh: bool = False) -> Dict[str, Any]:
     """
-    Fetches 5-day/3-hour forecast from OpenWeather API for the given city name.
-    Returns a dict with forecast info or error.
+    Fetches 5-day/3-hour forecast from OpenWeather API for the given place name.
+    Returns its daily digest, or {"error": ...}. The 3-hour rows are only used to build the
+    digest and are not cached. refresh=True skips the cache read (prefetch).
+    Concurrent misses for one place share a single upstream call.
     """
+    target, params = weather_target(location)
+    key = ("forecast", target)
+    cached = None if refresh else _weather_cache.get(key)
+    if cached is not None:
+        return cached
+    return await _weather_flight.do(key, lambda: _fetch_forecast(key, params))
+
+async def _fetch_forecast(key: Hashable, params: Dict[str, Any]) -> Dict[str, Any]:
     params = {
-        "q": location,
+        **params,
         "appid": OPENWEATHER_API_KEY,
         "units": "metric"
     }
-    async with httpx.AsyncClient(timeout=10) as client:
-        try:
-            resp = await client.get(OPENWEATHER_FORECAST_API, params=params)
-            resp.raise_for_status()
-            data = resp.json()
-            forecast_list = []
-            for entry in data.get("list", []):
-                forecast_list.append({
-                    "dt_txt": entry.get("dt_txt"),
-                    "temp_c": entry["main"]["temp"],
-                    "humidity": entry["main"]["humidity"],
-                    "rain_mm": entry.get("rain", {}).get("3h", 0),
-                    "weather": entry.get("weather", [{}])[0].get("description", "")
-                })
-            return {"forecast": forecast_list}
-        except Exception as e:
-            return {"error": str(e)}
-        
-async def get_local_weather(location: str) -> Dict[str, Any]:
+    try:
+        resp = await hedged_get(OPENWEATHER_FORECAST_API, params=params)
+        resp.raise_for_status()
+        data = resp.json()
+        forecast_list = []
+        for entry in data.get("list", []):
+            forecast_list.append({
+                "dt_txt": entry.get("dt_txt"),
+                "temp_c": entry["main"]["temp"],
+                "humidity": entry["main"]["humidity"],
+                "rain_mm": entry.get("rain", {}).get("3h", 0),
+                "weather": entry.get("weather", [{}])[0].get("description", "")
+            })
+        forecast = summarize_forecast(forecast_list)
+    except Exception as e:
+        return {"error": str(e)}
+    _weather_cache.set(key, forecast, ttl=WEATHER_FORECAST_TTL)
+    return forecast
+
+async def get_local_weather(location: str) -> LocalWeather:
     """
     Combines current weather and 5-day forecast for the given city name.
+    Both are fetched concurrently, once per place within a batch.
     """
-    now = await get_current_weather(location)
-    forecast = await get_5day_forecast(location)
+    watch_weather(location)
+    return await batch_shared(("weather", weather_target(location)[0]), lambda: _get_local_weather(location))
+
+async def _get_local_weather(location: str) -> LocalWeather:
+    now, forecast = await asyncio.gather(get_current_weather(location), get_5day_forecast(location))
+    place = gazetteer.lookup(location)
+    return LocalWeather(
+        location=place.name if place else location,
+        now=now,
+        digest=None if "error" in forecast else forecast,
+        forecast_error=forecast.get("error", ""),
+    )
+
+def watch_weather(location: str, weight: float = 1.0) -> None:
+    """
+    Counts a use of the location's weather towards the prefetch hot set.
+    """
+    target = weather_target(location)[0]
+    prefetcher.touch("weather_now", target, location, weight=weight)
+    prefetcher.touch("weather_forecast", target, location, weight=weight)
+
+async def _prefetch_now(location: str) -> bool:
+    return not (await get_current_weather(location, refresh=True)).error
+
+async def _prefetch_forecast(location: str) -> bool:
+    return "error" not in await get_5day_forecast(location, refresh=True)
+
+prefetcher.register("weather_now", _prefetch_now, WEATHER_NOW_TTL)
+prefetcher.register("weather_forecast", _prefetch_forecast, WEATHER_FORECAST_TTL)
+
+def weather_cache_stats() -> Dict[str, Any]:
     return {
-        "provider": "openweather",
-        "location": location,
-        "now": now,
-        "forecast_5d": forecast.get("forecast", []),
-        "forecast_error": forecast.get("error", "")
-    }
\ No newline at end of file
+        **_weather_cache.stats(),
+        "upstream_calls": _weather_flight.calls,
+        "coalesced": _weather_flight.coalesced,
+    }
@@ -1,16 +1,73 @@
+import logging
 import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict
 from fastapi import FastAPI
-from dotenv import load_dotenv
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.openapi.utils import get_openapi
 
-load_dotenv()
-
 from .routes.chat import router as chat_router
+from .routes.sensors import router as sensors_router
+from .agents.agent_roles import get_chat_model
+from .agents.llm_cache import llm_cache_stats
+from .agents.llm_scheduler import llm_scheduler
+from .agents.orchestrator import get_graph
+from .agents.tools.history_tool import flush_chat_history, history_stats
+from .agents.tools.market_tool import market_cache_stats
+from .agents.tools.weather_tool import weather_cache_stats
+from .services.http_client import close_http_client, get_http_client
+from .services.memory_profile import memory_profiler
+from .services.metrics import gauge, render_metrics
+from .services.prefetch import PREFETCH_ENABLED, prefetcher
+from .services.sensor_store import sensor_store
+from .services.storage import close_store, get_store
+
+logger = logging.getLogger(__name__)
+
+# Set by the startup warm-up and reported by /ready.
+_readiness: Dict[str, Any] = {"status": "starting"}
+
+async def warm_up() -> Dict[str, float]:
+    """
+    Does the first request's one-off work before the worker takes traffic: compiles the graph,
+    builds the LLM client, creates the HTTP pool and opens the store. Returns seconds per step.
+    """
+    steps: Dict[str, float] = {}
+    for name, step in (("graph", get_graph), ("llm", get_chat_model), ("http_client", get_http_client)):
+        start = time.perf_counter()
+        step()
+        steps[name] = round(time.perf_counter() - start, 3)
+    start = time.perf_counter()
+    await get_store().open()
+    steps["store"] = round(time.perf_counter() - start, 3)
+    return steps
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    memory_profiler.start()   # no-op unless MEMORY_PROFILE=1
+    start = time.perf_counter()
+    try:
+        steps = await warm_up()
+        _readiness.update(status="ready", warm_up_s=steps, startup_s=round(time.perf_counter() - start, 3))
+    except Exception as e:
+        # Keep serving /health and /metrics; /ready reports the failure.
+        logger.exception("Startup warm-up failed")
+        _readiness.update(status="failed", error=str(e))
+    if PREFETCH_ENABLED:
+        prefetcher.start()
+    yield
+    await prefetcher.stop()
+    await flush_chat_history()
+    await close_store()
+    await close_http_client()
+    memory_profiler.stop()
 
 app = FastAPI(
     title="Crop/Farmer Chatbot Backend",
     description="A multi-agent system to assist farmers with crop management.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 def custom_openapi():
     if app.openapi_schema:
@@ -25,6 +82,7 @@ def custom_openapi():
     return app.openapi_schema
 app.openapi = custom_openapi
 app.include_router(chat_router, prefix="/api/v1")
+app.include_router(sensors_router, prefix="/api/v1")
 
 @app.get("/")
 async def root():
@@ -32,4 +90,52 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness (as opposed to liveness): 200 once the warm-up has completed, 503 before or if it failed.
+    """
+    return JSONResponse(_readiness, status_code=200 if _readiness["status"] == "ready" else 503)
+
+@app.get("/prefetch")
+async def prefetch_status(limit: int = 20):
+    """
+    Background refresh state: hottest weather/market keys, when each is next due, refresh counts.
+    """
+    return prefetcher.stats(limit)
+
+@app.get("/debug/memory")
+async def memory_status(limit: int = 20):
+    """
+    Memory profiling (MEMORY_PROFILE=1): graph state size of in-flight requests and the
+    allocation sites holding the most traced memory.
+    """
+    return {**memory_profiler.stats(), "top_allocations": memory_profiler.top(limit)}
+
+def _cache_stat(field: str):
+    return lambda: {
+        "weather": weather_cache_stats()[field],
+        "market": market_cache_stats()[field],
+        "llm": llm_cache_stats()[field],
+    }
+
+gauge("cache_entries", "Entries held by each cache.", _cache_stat("size"), "cache")
+gauge("cache_hits", "Cache hits since start.", _cache_stat("hits"), "cache")
+gauge("cache_misses", "Cache misses since start.", _cache_stat("misses"), "cache")
+gauge("history_sessions", "Chat sessions held in memory.", lambda: history_stats().get("sessions", 0))
+gauge("history_dropped_turns", "Chat turns dropped because the history write queue was full.", lambda: history_stats().get("dropped_turns", 0))
+gauge("sensor_farmers", "Farmers with buffered sensor readings.", lambda: sensor_store.stats()["farmers"])
+gauge("llm_calls_active", "LLM calls in flight.", lambda: llm_scheduler.stats()["active"])
+gauge("llm_calls_waiting", "LLM calls queued by priority (0 = final answer).", lambda: llm_scheduler.stats()["waiting_by_priority"], "priority")
+gauge("admission_rejected", "Chat requests rejected with 503 since start.", lambda: llm_scheduler.stats()["rejected"])
+gauge("prefetch_hot_keys", "Lookups hot enough to be refreshed in the background.", lambda: prefetcher.stats(0)["hot"])
+gauge("prefetch_refreshes", "Background refreshes since start.", lambda: {"ok": prefetcher.refreshes, "failed": prefetcher.failures}, "result")
+gauge("graph_requests_in_flight", "Graph runs in progress (MEMORY_PROFILE=1).", lambda: memory_profiler.stats()["requests_in_flight"])
+gauge("graph_in_flight_state_bytes", "Summed graph state size of in-flight requests (MEMORY_PROFILE=1).", lambda: memory_profiler.stats()["in_flight_state_bytes"])
+gauge("sensor_readings_ingested", "Sensor readings ingested since start.", lambda: sensor_store.stats()["ingested"])
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return render_metrics()
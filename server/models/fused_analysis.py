@@ -0,0 +1,11 @@
+from pydantic import BaseModel, Field
+
+class FusedAnalysis(BaseModel):
+    """
+    All analysis sections of one turn from a single structured call. Field names match the
+    `State` keys they are copied into; sections that were not requested stay empty.
+    """
+    crop_analysis: str = Field("", description="Crop health section")
+    disease_risk: str = Field("", description="Disease risk section")
+    plan: str = Field("", description="Short-term plan section")
+    answer: str = Field("", description="Final farmer-facing answer, when requested")
@@ -0,0 +1,38 @@
+from pydantic import BaseModel, Field, field_validator
+from typing import Any, List
+
+# Explicit marker for a field the extractor could not determine.
+UNRESOLVED = "unresolved"
+
+INTENTS = ("status", "health", "weather", "rain", "disease", "plan", "advice", "market", "price")
+
+class QueryExtraction(BaseModel):
+    intents: List[str] = Field(default_factory=list, description="All relevant intents from: " + ", ".join(INTENTS))
+    crop: str = Field(UNRESOLVED, description="Crop named in the message, lowercase")
+    city: str = Field(UNRESOLVED, description="City to fetch weather for")
+    market: str = Field(UNRESOLVED, description="AgMarket market (mandi) name")
+    state: str = Field(UNRESOLVED, description="Indian state of the market")
+
+    @field_validator("intents", mode="before")
+    @classmethod
+    def _normalize_intents(cls, value: Any) -> List[str]:
+        if isinstance(value, str):
+            value = value.split(",")
+        intents = [str(i).strip().lower() for i in value or []]
+        return [i for i in dict.fromkeys(intents) if i in INTENTS]
+
+    @field_validator("crop", "city", "market", "state", mode="before")
+    @classmethod
+    def _normalize_field(cls, value: Any) -> str:
+        text = str(value or "").strip()
+        if text.lower() in ("", "none", "null", "unknown", "n/a", UNRESOLVED):
+            return UNRESOLVED
+        return text
+
+    @field_validator("crop")
+    @classmethod
+    def _lower_crop(cls, value: str) -> str:
+        return value.lower()
+
+    def resolved(self, field: str) -> bool:
+        return getattr(self, field) != UNRESOLVED
@@ -1,8 +1,13 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import List
 
 class SensorData(BaseModel):
     temperature: float
     humidity: float
     soil_moisture: int
     gas_level: int
-    timestamp: str
\ No newline at end of file
+    timestamp: str
+    rainfall_mm: float = 0.0
+
+class SensorBatch(BaseModel):
+    readings: List[SensorData] = Field(..., min_length=1, max_length=10000)
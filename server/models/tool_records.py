@@ -0,0 +1,48 @@
+from typing import Any, Dict, List, NamedTuple, Optional
+
+# Results handed from tools to graph nodes. Only the fields nodes and prompts read are kept, in
+# tuples (no per-instance __dict__), so hundreds of graphs in flight do not each carry raw
+# upstream payloads.
+
+class MarketPrice(NamedTuple):
+    commodity: str
+    state: str
+    market: str
+    date: str = ""          # of the latest AgMarket row; empty when upstream returned none
+    min_price: str = ""
+    max_price: str = ""
+    modal_price: str = ""
+    stale: bool = False     # last good price served while upstream is refreshed or failing
+    error: str = ""
+
+    @classmethod
+    def from_agmarket(cls, commodity: str, state: str, market: str, rows: Any) -> "MarketPrice":
+        """
+        Keeps the latest row of an AgMarket response (the list is newest first).
+        """
+        if not isinstance(rows, list) or not rows or not isinstance(rows[0], dict):
+            return cls(commodity, state, market)
+        latest = rows[0]
+        return cls(
+            commodity=str(latest.get("Commodity", commodity)),
+            state=state,
+            market=str(latest.get("Market", market)),
+            date=str(latest.get("Date", "")),
+            min_price=str(latest.get("Min Price", "")),
+            max_price=str(latest.get("Max Price", "")),
+            modal_price=str(latest.get("Modal Price", "")),
+        )
+
+class WeatherNow(NamedTuple):
+    temp_c: float = 0.0
+    humidity: float = 0.0
+    rain_mm: float = 0.0    # last hour
+    description: str = ""
+    error: str = ""
+
+class LocalWeather(NamedTuple):
+    location: str = ""
+    now: Optional[WeatherNow] = None
+    # Daily digest of the 5-day forecast (utils/forecast_digest.py); the 3-hour rows are not kept.
+    digest: Optional[Dict[str, List[Any]]] = None
+    forecast_error: str = ""
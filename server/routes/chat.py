@@ -1,23 +1,88 @@
+import json
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import Dict, Any
+from fastapi.responses import StreamingResponse
+import os
+from pydantic import BaseModel, Field
+from typing import Dict, Any, AsyncIterator, List, Optional
 
-from ..agents.orchestrator import run_langgraph_workflow
+from ..agents.llm_scheduler import llm_scheduler
+from ..agents.orchestrator import BATCH_CONCURRENCY, run_langgraph_batch, run_langgraph_workflow, stream_langgraph_workflow
+from ..services.metrics import CHAT_REQUEST_SECONDS, request_timings, timed
 
 class ChatRequest(BaseModel):
     user_id: str
     message: str
     session_id:str
+    debug: bool = False  # include a per-request timing breakdown in the response
+
+CHAT_BATCH_MAX_ITEMS = int(os.getenv("CHAT_BATCH_MAX_ITEMS", "500"))
+
+class ChatBatchItem(BaseModel):
+    user_id: str
+    session_id: str
+    message: str
+
+class ChatBatchRequest(BaseModel):
+    items: List[ChatBatchItem] = Field(..., min_length=1, max_length=CHAT_BATCH_MAX_ITEMS)
+    concurrency: Optional[int] = Field(None, ge=1, le=BATCH_CONCURRENCY)  # lower the server default
 
 router = APIRouter()
 
+def _admit() -> None:
+    """
+    Rejects new work with 503 + Retry-After while the LLM queue is at its limit, so a spike is
+    shed at the door instead of every queued request timing out together.
+    """
+    retry_after = llm_scheduler.retry_after()
+    if retry_after:
+        raise HTTPException(status_code=503, detail="Server busy, please retry.", headers={"Retry-After": str(retry_after)})
+
 @router.post("/chat")
 async def chat_with_agent(request: ChatRequest) -> Dict[str, Any]:
     """
     Endpoint to receive user chat messages and forward them to the multi-agent system.
     """
+    _admit()
     try:
-        response = await run_langgraph_workflow(user_id=request.user_id, message=request.message, session_id=request.session_id)
+        with timed(CHAT_REQUEST_SECONDS, "chat"), request_timings() as timings:
+            response = await run_langgraph_workflow(user_id=request.user_id, message=request.message, session_id=request.session_id)
+        if request.debug:
+            return {"response": response, "timings": timings}
         return {"response": response}
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def _sse(events: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    async for event in events:
+        name = event.pop("event")
+        yield f"event: {name}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+@router.post("/chat/stream")
+async def chat_with_agent_stream(request: ChatRequest) -> StreamingResponse:
+    """
+    Streaming variant of /chat (server-sent events): "node" events as graph nodes complete,
+    "token" events with the cleaned answer text, then a final "done" (or "error") event.
+    """
+    _admit()
+    events = stream_langgraph_workflow(user_id=request.user_id, message=request.message, session_id=request.session_id)
+    return StreamingResponse(
+        _sse(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.post("/chat/batch")
+async def chat_with_agent_batch(request: ChatBatchRequest) -> StreamingResponse:
+    """
+    Runs many chat messages (e.g. a burst of forwarded SMS/IVR queries) under a bounded concurrency
+    limit, sharing weather/market/profile lookups across the batch. Server-sent events: one "result"
+    (or "error") event per item as it completes, carrying the item's index, then "done".
+    """
+    _admit()
+    items = [item.model_dump() for item in request.items]
+    events = run_langgraph_batch(items, concurrency=request.concurrency or BATCH_CONCURRENCY)
+    return StreamingResponse(
+        _sse(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,26 @@
+from datetime import datetime, timezone
+from fastapi import APIRouter, HTTPException
+from typing import Dict, Any
+
+from ..models.sensor_data import SensorBatch
+from ..services.sensor_store import SENSOR_FIELDS, sensor_store
+
+router = APIRouter()
+
+def _epoch(timestamp: str) -> float:
+    parsed = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+@router.post("/sensors/{user_id}/readings")
+async def ingest_sensor_readings(user_id: str, batch: SensorBatch) -> Dict[str, Any]:
+    """
+    Bulk ingestion of field sensor readings into the farmer's fixed-size ring buffer.
+    """
+    try:
+        rows = [(_epoch(r.timestamp), [getattr(r, f) for f in SENSOR_FIELDS]) for r in batch.readings]
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid timestamp: {e}")
+    stored = sensor_store.ingest(user_id, rows)
+    return {"stored": stored}
@@ -0,0 +1,78 @@
+import asyncio
+import os
+import time
+import httpx
+from typing import Any, Optional
+from .metrics import HTTP_HEDGES, HTTP_SECONDS, record_timing
+
+# Seconds without a response before an idempotent GET is raced by a duplicate; 0 disables hedging.
+UPSTREAM_HEDGE_AFTER = float(os.getenv("UPSTREAM_HEDGE_AFTER", "0"))
+
+class _InstrumentedTransport(httpx.AsyncBaseTransport):
+    """
+    Records latency (time to response headers, or to failure) of every outbound request.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        start = time.perf_counter()
+        status = "error"
+        try:
+            response = await self._transport.handle_async_request(request)
+            status = str(response.status_code)
+            return response
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_SECONDS.observe(elapsed, request.url.host, status)
+            record_timing("http", f"{request.method} {request.url.host}{request.url.path}", elapsed, status=status)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+# One pooled client per process: keeps TLS connections to upstream APIs alive across requests.
+_client: Optional[httpx.AsyncClient] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        limits = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        _client = httpx.AsyncClient(
+            timeout=10,
+            transport=_InstrumentedTransport(httpx.AsyncHTTPTransport(limits=limits)),
+        )
+    return _client
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+
+async def hedged_get(url: str, **kwargs: Any) -> httpx.Response:
+    """
+    GET through the shared client. If no response arrives within UPSTREAM_HEDGE_AFTER seconds, a
+    second identical request is started and whichever succeeds first wins; the loser is cancelled.
+    Only for idempotent reads.
+    """
+    client = get_http_client()
+    if UPSTREAM_HEDGE_AFTER <= 0:
+        return await client.get(url, **kwargs)
+    first = asyncio.ensure_future(client.get(url, **kwargs))
+    pending = {first}
+    try:
+        done, pending = await asyncio.wait(pending, timeout=UPSTREAM_HEDGE_AFTER)
+        if done:
+            return first.result()
+        HTTP_HEDGES.inc(httpx.URL(url).host)
+        pending.add(asyncio.ensure_future(client.get(url, **kwargs)))
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+        return first.result()   # both failed: surface the original request's error
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,138 @@
+import os
+import sys
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+from .metrics import NODE_OUTPUT_BYTES, REQUEST_STATE_BYTES
+
+MEMORY_PROFILE = os.getenv("MEMORY_PROFILE", "0") == "1"
+MEMORY_PROFILE_FRAMES = int(os.getenv("MEMORY_PROFILE_FRAMES", "1"))   # traceback depth kept by tracemalloc
+
+def deep_sizeof(obj: Any) -> int:
+    """
+    Approximate retained size of an object graph: containers, model fields and slots are
+    followed, every object is counted once, classes and functions are not followed.
+    """
+    seen = set()
+    size = 0
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        if id(o) in seen or isinstance(o, type) or callable(o):
+            continue
+        seen.add(id(o))
+        size += sys.getsizeof(o)
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset, deque)):
+            stack.extend(o)
+        elif isinstance(o, (str, bytes, int, float, bool)) or o is None:
+            continue
+        else:
+            if hasattr(o, "__dict__"):
+                stack.append(vars(o))
+            for slot in getattr(type(o), "__slots__", ()):
+                if hasattr(o, slot):
+                    stack.append(getattr(o, slot))
+    return size
+
+class RequestMemory:
+    __slots__ = ("state_bytes", "by_node")
+
+    def __init__(self):
+        self.state_bytes = 0
+        self.by_node: Dict[str, int] = {}
+
+_current: ContextVar[Optional[RequestMemory]] = ContextVar("request_memory", default=None)
+
+class MemoryProfiler:
+    """
+    Opt-in (MEMORY_PROFILE=1) accounting of graph state size. Every node's state update is sized
+    when it returns and added to its request; requests in flight and their summed state size are
+    tracked, and completed requests land in a histogram. tracemalloc runs alongside, so /debug/memory
+    can show the allocation sites holding the most memory process-wide (it cannot attribute
+    allocations to a single request when requests overlap).
+    """
+
+    def __init__(self, enabled: bool = MEMORY_PROFILE, frames: int = MEMORY_PROFILE_FRAMES):
+        self.enabled = enabled
+        self.frames = frames
+        self.in_flight = 0
+        self.in_flight_bytes = 0
+        self.requests = 0
+        self.max_state_bytes = 0
+
+    def start(self) -> None:
+        if self.enabled and not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+
+    def stop(self) -> None:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    @contextmanager
+    def request(self) -> Iterator[Optional[RequestMemory]]:
+        """
+        Accounts the graph run inside the block (and the node tasks it spawns) as one request.
+        """
+        if not self.enabled:
+            yield None
+            return
+        usage = RequestMemory()
+        # Not reset on exit: the block may be inside an async generator resumed from another
+        # context, and nothing reads the value once the request is done.
+        _current.set(usage)
+        self.in_flight += 1
+        try:
+            yield usage
+        finally:
+            self.in_flight -= 1
+            self.in_flight_bytes -= usage.state_bytes
+            self.requests += 1
+            self.max_state_bytes = max(self.max_state_bytes, usage.state_bytes)
+            REQUEST_STATE_BYTES.observe(usage.state_bytes)
+
+    def node_output(self, node: str, delta: Any) -> None:
+        if not self.enabled:
+            return
+        size = deep_sizeof(delta)
+        NODE_OUTPUT_BYTES.observe(size, node)
+        usage = _current.get()
+        if usage is not None:
+            usage.state_bytes += size
+            usage.by_node[node] = usage.by_node.get(node, 0) + size
+            self.in_flight_bytes += size
+
+    def stats(self) -> Dict[str, Any]:
+        current, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        return {
+            "enabled": self.enabled,
+            "tracing": tracemalloc.is_tracing(),
+            "requests_in_flight": self.in_flight,
+            "in_flight_state_bytes": self.in_flight_bytes,
+            "max_request_state_bytes": self.max_state_bytes,
+            "requests": self.requests,
+            "traced_bytes": current,
+            "traced_peak_bytes": peak,
+        }
+
+    def top(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Allocation sites holding the most traced memory right now.
+        """
+        if not tracemalloc.is_tracing():
+            return []
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ))
+        return [
+            {"where": str(stat.traceback), "bytes": stat.size, "blocks": stat.count}
+            for stat in snapshot.statistics("lineno")[:limit]
+        ]
+
+memory_profiler = MemoryProfiler()
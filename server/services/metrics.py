@@ -0,0 +1,147 @@
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Seconds; covers cache hits up to slow LLM calls and upstream timeouts.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name, self.help, self.labelnames = name, help, labelnames
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {value:g}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name, self.help, self.labelnames, self.buckets = name, help, labelnames, buckets
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        entry = self._values.get(labels)
+        if entry is None:
+            entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames + ('le',), labels + (le,))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {total:g}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+class Gauge:
+    """
+    Gauge read at scrape time; `fn` returns a number or {label value: number}.
+    """
+
+    def __init__(self, name: str, help: str, fn: Callable[[], Any], labelname: str = ""):
+        self.name, self.help, self.fn, self.labelname = name, help, fn, labelname
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        try:
+            value = self.fn()
+        except Exception:
+            return lines
+        if isinstance(value, dict):
+            for label, v in sorted(value.items()):
+                lines.append(f"{self.name}{_labels((self.labelname,), (label,))} {v:g}")
+        else:
+            lines.append(f"{self.name} {value:g}")
+        return lines
+
+_registry: List[Any] = []
+
+def _register(metric):
+    _registry.append(metric)
+    return metric
+
+def counter(name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+    return _register(Counter(name, help, labelnames))
+
+def histogram(name: str, help: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+    return _register(Histogram(name, help, labelnames, buckets))
+
+def gauge(name: str, help: str, fn: Callable[[], Any], labelname: str = "") -> Gauge:
+    return _register(Gauge(name, help, fn, labelname))
+
+def render_metrics() -> str:
+    """
+    Prometheus text exposition of every registered metric.
+    """
+    lines: List[str] = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+# ------------ Metrics shared across the app ------------
+CHAT_REQUEST_SECONDS = histogram("chat_request_duration_seconds", "End-to-end chat request latency.", ("endpoint",))
+NODE_SECONDS = histogram("graph_node_duration_seconds", "Graph node latency.", ("node",))
+NODE_ERRORS = counter("graph_node_errors_total", "Graph node failures.", ("node",))
+LLM_SECONDS = histogram("llm_call_duration_seconds", "LLM call latency by calling node.", ("node",))
+LLM_TOKENS = counter("llm_tokens_total", "LLM tokens by calling node and kind (prompt/completion).", ("node", "kind"))
+LLM_ERRORS = counter("llm_call_errors_total", "Failed LLM calls by calling node.", ("node",))
+LLM_QUEUE_SECONDS = histogram("llm_queue_wait_seconds", "Time LLM calls waited in the scheduler queue.", ("node",))
+LLM_RETRIES = counter("llm_rate_limit_retries_total", "LLM calls retried after a rate-limit error.", ("node",))
+HTTP_HEDGES = counter("http_client_hedged_requests_total", "Upstream GETs raced by a hedge request.", ("host",))
+NODE_TIMEOUTS = counter("graph_node_timeouts_total", "Graph nodes that missed the request deadline.", ("node",))
+HTTP_SECONDS = histogram("http_client_duration_seconds", "Outbound HTTP latency by host and status.", ("host", "status"))
+
+# Bytes, 1 KiB to 8 MiB; used by the memory profiling hook (services/memory_profile.py).
+SIZE_BUCKETS = tuple(float(2 ** i) for i in range(10, 24))
+REQUEST_STATE_BYTES = histogram("graph_request_state_bytes", "Approximate size of a request's graph state at completion.", (), SIZE_BUCKETS)
+NODE_OUTPUT_BYTES = histogram("graph_node_output_bytes", "Approximate size of each node's state update.", ("node",), SIZE_BUCKETS)
+
+# ------------ Per-request timing breakdown ------------
+_request_timings: ContextVar[Optional[List[Dict[str, Any]]]] = ContextVar("request_timings", default=None)
+
+@contextmanager
+def request_timings() -> Iterator[List[Dict[str, Any]]]:
+    """
+    Collects timing entries recorded anywhere inside the block (including tasks it spawns).
+    """
+    timings: List[Dict[str, Any]] = []
+    token = _request_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _request_timings.reset(token)
+
+def record_timing(kind: str, name: str, seconds: float, **extra: Any) -> None:
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append({"kind": kind, "name": name, "ms": round(seconds * 1000, 1), **extra})
+
+@contextmanager
+def timed(metric: Histogram, *labels: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metric.observe(time.perf_counter() - start, *labels)
@@ -1,13 +1,20 @@
-# from functools import lru_cache
-# from motor.motor_asyncio import AsyncIOMotorClient
-# import os
+from functools import lru_cache
+from motor.motor_asyncio import AsyncIOMotorClient
+import os
 
-# MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
-# DB_NAME = os.getenv("MONGO_DB", "crop_chat")
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+DB_NAME = os.getenv("MONGO_DB", "crop_chat")
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
 
-# @lru_cache
-# def _client() -> AsyncIOMotorClient:
-#     return AsyncIOMotorClient(MONGO_URI)
+@lru_cache
+def _client() -> AsyncIOMotorClient:
+    # One pooled client per process.
+    return AsyncIOMotorClient(MONGO_URI, maxPoolSize=MONGO_MAX_POOL_SIZE)
 
-# def get_db():
-#     return _client()[DB_NAME]
\ No newline at end of file
+def get_db():
+    return _client()[DB_NAME]
+
+def close_client() -> None:
+    if _client.cache_info().currsize:
+        _client().close()
+        _client.cache_clear()
@@ -0,0 +1,186 @@
+import asyncio
+import contextvars
+import logging
+import os
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "1") == "1"
+PREFETCH_TICK_S = float(os.getenv("PREFETCH_TICK_S", "5"))
+PREFETCH_HOT_KEYS = int(os.getenv("PREFETCH_HOT_KEYS", "200"))        # refreshed keys, hottest first
+PREFETCH_MIN_SCORE = float(os.getenv("PREFETCH_MIN_SCORE", "2"))      # decayed hits before a key is kept warm
+PREFETCH_HALF_LIFE_S = float(os.getenv("PREFETCH_HALF_LIFE_S", "1800"))
+PREFETCH_AHEAD = float(os.getenv("PREFETCH_AHEAD", "0.8"))            # refresh at this fraction of the TTL
+PREFETCH_JITTER = float(os.getenv("PREFETCH_JITTER", "0.1"))          # ± fraction applied to every interval
+PREFETCH_CONCURRENCY = int(os.getenv("PREFETCH_CONCURRENCY", "4"))
+PREFETCH_RETRY_S = float(os.getenv("PREFETCH_RETRY_S", "60"))
+PREFETCH_MAX_TRACKED = int(os.getenv("PREFETCH_MAX_TRACKED", "5000"))
+
+class _Tracked:
+    __slots__ = ("kind", "key", "args", "score", "seen", "due", "refreshes", "failures")
+
+    def __init__(self, kind: str, key: Hashable, args: Tuple[Any, ...], due: float):
+        self.kind = kind
+        self.key = key
+        self.args = args
+        self.score = 0.0
+        self.seen = time.monotonic()
+        self.due = due
+        self.refreshes = 0
+        self.failures = 0
+
+class Prefetcher:
+    """
+    Keeps the hottest upstream lookups warm. Tools report each use with touch(); hotness is a hit
+    count decaying with `half_life`. Every tick the `hot_keys` hottest keys scoring at least
+    `min_score` are refreshed once `ahead` of their TTL has passed (intervals jittered so keys
+    fetched together do not stay in lockstep), at most `concurrency` refreshes at a time.
+    A refresher returns False (or raises) on failure; failed keys are retried after `retry_s`.
+    """
+
+    def __init__(
+        self,
+        tick: float = PREFETCH_TICK_S,
+        hot_keys: int = PREFETCH_HOT_KEYS,
+        min_score: float = PREFETCH_MIN_SCORE,
+        half_life: float = PREFETCH_HALF_LIFE_S,
+        ahead: float = PREFETCH_AHEAD,
+        jitter: float = PREFETCH_JITTER,
+        concurrency: int = PREFETCH_CONCURRENCY,
+        retry_s: float = PREFETCH_RETRY_S,
+        max_tracked: int = PREFETCH_MAX_TRACKED,
+    ):
+        self.tick = tick
+        self.hot_keys = hot_keys
+        self.min_score = min_score
+        self.half_life = half_life
+        self.ahead = ahead
+        self.jitter = jitter
+        self.concurrency = concurrency
+        self.retry_s = retry_s
+        self.max_tracked = max_tracked
+        self.refreshes = 0
+        self.failures = 0
+        self._refreshers: Dict[str, Tuple[Callable[..., Awaitable[Any]], float]] = {}
+        self._tracked: Dict[Tuple[str, Hashable], _Tracked] = {}
+        self._inflight: Dict[Tuple[str, Hashable], asyncio.Task] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, kind: str, refresh: Callable[..., Awaitable[Any]], ttl: float) -> None:
+        self._refreshers[kind] = (refresh, ttl)
+
+    def touch(self, kind: str, key: Hashable, *args: Any, weight: float = 1.0) -> None:
+        """
+        Records one use of (kind, key); `args` are what the refresher is called with.
+        """
+        now = time.monotonic()
+        entry = self._tracked.get((kind, key))
+        if entry is None:
+            if len(self._tracked) >= self.max_tracked:
+                self._evict(now)   # before adding, so the new key (no hits yet) is not the one dropped
+            # The caller is about to fetch it, so the first refresh is due one interval from now.
+            entry = self._tracked[(kind, key)] = _Tracked(kind, key, args, now + self._interval(kind))
+        entry.score = self._decayed(entry, now) + weight
+        entry.seen = now
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            # Own context: refreshes must not inherit the request or batch state of whoever started us.
+            self._task = contextvars.Context().run(asyncio.ensure_future, self._run())
+
+    async def stop(self) -> None:
+        tasks = [t for t in (self._task, *self._inflight.values()) if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+
+    def hot(self) -> List[_Tracked]:
+        """
+        Keys kept warm, hottest first.
+        """
+        now = time.monotonic()
+        scored = sorted(((self._decayed(e, now), e) for e in self._tracked.values()), key=lambda p: p[0], reverse=True)
+        return [e for score, e in scored[:self.hot_keys] if score >= self.min_score]
+
+    def stats(self, limit: int = 20) -> Dict[str, Any]:
+        now = time.monotonic()
+        hot = self.hot()
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "tracked": len(self._tracked),
+            "hot": len(hot),
+            "inflight": len(self._inflight),
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "hottest": [
+                {
+                    "kind": e.kind,
+                    "key": list(e.key) if isinstance(e.key, tuple) else e.key,
+                    "score": round(self._decayed(e, now), 2),
+                    "due_in_s": round(e.due - now, 1),
+                    "refreshes": e.refreshes,
+                    "failures": e.failures,
+                }
+                for e in hot[:limit]
+            ],
+        }
+
+    async def refresh_due(self) -> int:
+        """
+        One scheduling pass: starts refreshes for hot keys that are due. Returns how many started.
+        """
+        now = time.monotonic()
+        started = 0
+        for entry in self.hot():
+            if len(self._inflight) >= self.concurrency:
+                break
+            name = (entry.kind, entry.key)
+            if entry.due > now or name in self._inflight or entry.kind not in self._refreshers:
+                continue
+            self._inflight[name] = asyncio.ensure_future(self._refresh(entry))
+            self._inflight[name].add_done_callback(lambda _, name=name: self._inflight.pop(name, None))
+            started += 1
+        return started
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh_due()
+            except Exception:
+                logger.exception("Prefetch pass failed")
+            await asyncio.sleep(self.tick * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+    async def _refresh(self, entry: _Tracked) -> None:
+        refresh, _ = self._refreshers[entry.kind]
+        try:
+            ok = await refresh(*entry.args) is not False
+        except Exception:
+            logger.exception("Prefetch of %s %s failed", entry.kind, entry.key)
+            ok = False
+        if ok:
+            self.refreshes += 1
+            entry.refreshes += 1
+            entry.due = time.monotonic() + self._interval(entry.kind)
+        else:
+            self.failures += 1
+            entry.failures += 1
+            entry.due = time.monotonic() + self.retry_s * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _interval(self, kind: str) -> float:
+        ttl = self._refreshers.get(kind, (None, self.retry_s))[1]
+        return ttl * self.ahead * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _decayed(self, entry: _Tracked, now: float) -> float:
+        return entry.score * 0.5 ** ((now - entry.seen) / self.half_life)
+
+    def _evict(self, now: float) -> None:
+        # Drop the coldest tenth in one go so eviction is not paid on every new key.
+        ranked = sorted(self._tracked.items(), key=lambda item: self._decayed(item[1], now))
+        for key, _ in ranked[:max(1, len(ranked) // 10)]:
+            del self._tracked[key]
+
+prefetcher = Prefetcher()
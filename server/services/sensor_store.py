@@ -0,0 +1,172 @@
+import os
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Numeric channels kept per reading (column order of the ring buffer).
+SENSOR_FIELDS = ("temperature", "humidity", "soil_moisture", "rainfall_mm", "gas_level")
+
+# Generic acceptable ranges used for "time out of range" when no crop-specific ones are given.
+DEFAULT_SENSOR_RANGES: Dict[str, Tuple[float, float]] = {
+    "temperature": (10.0, 35.0),
+    "humidity": (40.0, 85.0),
+    "soil_moisture": (300.0, 700.0),
+    "gas_level": (0.0, 300.0),
+}
+
+WINDOWS: Dict[str, int] = {"1h": 3600, "24h": 86400, "7d": 7 * 86400}
+
+# 7 days at one reading per minute.
+SENSOR_BUFFER_SIZE = int(os.getenv("SENSOR_BUFFER_SIZE", str(7 * 24 * 60)))
+SENSOR_MAX_FARMERS = int(os.getenv("SENSOR_MAX_FARMERS", "2000"))
+
+class SensorRingBuffer:
+    """
+    Fixed-capacity time series for one farmer: a float64 timestamp column plus one float32
+    column per sensor field, preallocated so ingestion never grows memory.
+    Readings are kept in time order (late batches go through merge()); windows are located by
+    bisecting timestamps.
+    """
+    __slots__ = ("capacity", "ts", "cols", "head", "size")
+
+    def __init__(self, capacity: int = SENSOR_BUFFER_SIZE):
+        self.capacity = capacity
+        self.ts = array("d", bytes(8 * capacity))
+        self.cols = {f: array("f", bytes(4 * capacity)) for f in SENSOR_FIELDS}
+        self.head = 0   # next write position
+        self.size = 0
+
+    def extend(self, timestamps: Sequence[float], columns: Dict[str, Sequence[float]]) -> None:
+        """
+        Appends a batch given as parallel columns (already in time order).
+        """
+        n = len(timestamps)
+        if n > self.capacity:
+            timestamps = timestamps[-self.capacity:]
+            columns = {f: v[-self.capacity:] for f, v in columns.items()}
+            n = self.capacity
+        first = min(n, self.capacity - self.head)
+        for dst, src in [(self.ts, timestamps)] + [(self.cols[f], columns[f]) for f in SENSOR_FIELDS]:
+            dst[self.head:self.head + first] = array(dst.typecode, src[:first])
+            if first < n:
+                dst[0:n - first] = array(dst.typecode, src[first:])
+        self.head = (self.head + n) % self.capacity
+        self.size = min(self.capacity, self.size + n)
+
+    def merge(self, timestamps: Sequence[float], columns: Dict[str, Sequence[float]]) -> None:
+        """
+        Adds a time-ordered batch that starts before the newest stored reading: merges it with the
+        stored readings by timestamp and rewrites the buffer, keeping the newest `capacity`.
+        O(capacity), so only used for late uploads (e.g. a gateway sending its backlog).
+        """
+        ts = list(self._ordered(self.ts)) + list(timestamps)
+        cols = {f: list(self._ordered(self.cols[f])) + list(columns[f]) for f in SENSOR_FIELDS}
+        order = sorted(range(len(ts)), key=ts.__getitem__)[-self.capacity:]
+        self.head = self.size = 0
+        self.extend([ts[i] for i in order], {f: [cols[f][i] for i in order] for f in SENSOR_FIELDS})
+
+    def newest_ts(self) -> Optional[float]:
+        return self.ts[(self.head - 1) % self.capacity] if self.size else None
+
+    def _ordered(self, column: array) -> array:
+        if self.size < self.capacity:
+            return column[:self.size]
+        return column[self.head:] + column[:self.head]
+
+    def latest(self) -> Optional[Dict[str, float]]:
+        if not self.size:
+            return None
+        i = (self.head - 1) % self.capacity
+        return {"ts": self.ts[i], **{f: round(self.cols[f][i], 2) for f in SENSOR_FIELDS}}
+
+    def aggregates(
+        self,
+        now: Optional[float] = None,
+        windows: Dict[str, int] = WINDOWS,
+        ranges: Dict[str, Tuple[float, float]] = DEFAULT_SENSOR_RANGES,
+    ) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """
+        Per window and field: mean/min/max, trend (mean of the last quarter minus the first
+        quarter) and the share of readings outside the acceptable range.
+        """
+        if not self.size:
+            return {}
+        now = time.time() if now is None else now
+        ts = self._ordered(self.ts)
+        cols = {f: self._ordered(self.cols[f]) for f in SENSOR_FIELDS}
+        result: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for name, seconds in windows.items():
+            start = bisect_left(ts, now - seconds)
+            n = len(ts) - start
+            if n <= 0:
+                continue
+            quarter = max(1, n // 4)
+            window: Dict[str, Dict[str, float]] = {"_": {"readings": n}}
+            for field, column in cols.items():
+                values = column[start:]
+                ordered = sorted(values)
+                stats = {
+                    "mean": round(sum(values) / n, 2),
+                    "min": round(ordered[0], 2),
+                    "max": round(ordered[-1], 2),
+                    "trend": round(sum(values[-quarter:]) / quarter - sum(values[:quarter]) / quarter, 2),
+                }
+                if field in ranges:
+                    low, high = ranges[field]
+                    outside = bisect_left(ordered, low) + (n - bisect_right(ordered, high))
+                    stats["out_of_range_pct"] = round(100.0 * outside / n, 1)
+                window[field] = stats
+            result[name] = window
+        return result
+
+class SensorStore:
+    """
+    Ring buffers per farmer, least recently written evicted beyond SENSOR_MAX_FARMERS.
+    """
+
+    def __init__(self, capacity: int = SENSOR_BUFFER_SIZE, max_farmers: int = SENSOR_MAX_FARMERS):
+        self.capacity = capacity
+        self.max_farmers = max_farmers
+        self.ingested = 0
+        self.late_batches = 0   # batches older than already stored readings, merged in
+        self._buffers: "OrderedDict[str, SensorRingBuffer]" = OrderedDict()
+
+    def get(self, user_id: str) -> Optional[SensorRingBuffer]:
+        return self._buffers.get(user_id)
+
+    def ingest(self, user_id: str, readings: Iterable[Tuple[float, Sequence[float]]]) -> int:
+        """
+        Stores (timestamp, values in SENSOR_FIELDS order) readings; returns how many were stored.
+        """
+        rows: List[Tuple[float, Sequence[float]]] = sorted(readings, key=lambda r: r[0])
+        if not rows:
+            return 0
+        buffer = self._buffers.get(user_id)
+        if buffer is None:
+            buffer = self._buffers[user_id] = SensorRingBuffer(self.capacity)
+            while len(self._buffers) > self.max_farmers:
+                self._buffers.popitem(last=False)
+        self._buffers.move_to_end(user_id)
+        timestamps = [r[0] for r in rows]
+        columns = {f: [r[1][i] for r in rows] for i, f in enumerate(SENSOR_FIELDS)}
+        newest = buffer.newest_ts()
+        if newest is not None and timestamps[0] < newest:
+            self.late_batches += 1
+            buffer.merge(timestamps, columns)
+        else:
+            buffer.extend(timestamps, columns)
+        self.ingested += len(rows)
+        return len(rows)
+
+    def stats(self) -> Dict[str, float]:
+        per_farmer = 8 * self.capacity + 4 * self.capacity * len(SENSOR_FIELDS)
+        return {
+            "farmers": len(self._buffers),
+            "ingested": self.ingested,
+            "late_batches": self.late_batches,
+            "approx_bytes": per_farmer * len(self._buffers),
+        }
+
+sensor_store = SensorStore()
@@ -0,0 +1,35 @@
+import os
+from typing import Optional
+from .base import ChatStore, Turn
+from .memory import MemoryStore
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "memory").lower()
+SQLITE_PATH = os.getenv("SQLITE_PATH", "crop_chat.db")
+
+_store: Optional[ChatStore] = None
+
+def get_store() -> ChatStore:
+    """
+    Returns the process-wide store selected by STORAGE_BACKEND (memory | sqlite | mongo).
+    """
+    global _store
+    if _store is None:
+        if STORAGE_BACKEND == "sqlite":
+            from .sqlite_store import SQLiteStore
+            _store = SQLiteStore(SQLITE_PATH)
+        elif STORAGE_BACKEND == "mongo":
+            from .mongo_store import MongoStore
+            _store = MongoStore()
+        elif STORAGE_BACKEND == "memory":
+            _store = MemoryStore()
+        else:
+            raise RuntimeError(f"Unknown STORAGE_BACKEND: {STORAGE_BACKEND!r} (use memory, sqlite or mongo).")
+    return _store
+
+async def close_store() -> None:
+    global _store
+    if _store is not None:
+        await _store.close()
+    _store = None
+
+__all__ = ["ChatStore", "Turn", "MemoryStore", "get_store", "close_store"]
@@ -0,0 +1,66 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+class Turn(NamedTuple):
+    user: str
+    agent: str
+
+class ChatStore(ABC):
+    """
+    Storage behind chat history, rolling summaries and farmer profiles.
+    Sessions are keyed by f"{user_id}:{session_id}".
+    """
+
+    # True when writes should be batched off the request path (see WriteBatcher).
+    buffered = False
+
+    @abstractmethod
+    async def load_turns(self, key: str, limit: int) -> List[Turn]:
+        """
+        Returns the last `limit` turns, oldest first.
+        """
+
+    @abstractmethod
+    async def load_turns_since(self, key: str, offset: int) -> List[Turn]:
+        """
+        Returns the turns after the first `offset` ever saved (as far as still retained).
+        """
+
+    @abstractmethod
+    async def count_turns(self, key: str) -> int:
+        """
+        Returns the number of turns ever saved for the session.
+        """
+
+    @abstractmethod
+    async def append_turns(self, batch: Sequence[Tuple[str, Turn]]) -> None:
+        ...
+
+    @abstractmethod
+    async def load_summary(self, key: str) -> Tuple[str, int]:
+        """
+        Returns (summary, number of turns it covers).
+        """
+
+    @abstractmethod
+    async def save_summary(self, key: str, summary: str, upto: int) -> None:
+        ...
+
+    @abstractmethod
+    async def get_profile(self, user_id: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    async def save_profile(self, user_id: str, profile: Dict[str, Any]) -> None:
+        ...
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": type(self).__name__}
+
+    async def open(self) -> None:
+        """
+        Opens connections ahead of the first request (called from the startup warm-up).
+        """
+
+    async def close(self) -> None:
+        pass
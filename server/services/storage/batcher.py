@@ -0,0 +1,105 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from .base import ChatStore, Turn
+
+logger = logging.getLogger(__name__)
+
+class WriteBatcher:
+    """
+    Queues chat turns and writes them to the store in batches from a background task,
+    so saving a turn never waits on the database. Queued turns stay readable via pending() until
+    their write is acknowledged, so readers may also find them in the store meanwhile.
+    Failed writes are retried with exponential backoff (up to `max_backoff` seconds); while the
+    store is down at most `max_queue` turns are held and further turns are dropped and counted.
+    """
+
+    def __init__(
+        self,
+        store: ChatStore,
+        max_batch: int = 100,
+        interval: float = 0.05,
+        max_queue: int = 10000,
+        max_backoff: float = 30.0,
+        on_flush: Optional[Callable[[Iterable[str]], None]] = None,
+    ):
+        self.store = store
+        self.max_batch = max_batch
+        self.interval = interval
+        self.max_queue = max_queue
+        self.max_backoff = max_backoff
+        self.on_flush = on_flush
+        self.flushes = 0
+        self.written = 0
+        self.failed_writes = 0
+        self.dropped = 0
+        self._failures = 0   # consecutive failed writes; drives the backoff
+        self._queue: List[Tuple[str, Turn]] = []
+        self._pending: Dict[str, List[Turn]] = defaultdict(list)
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def submit(self, key: str, turn: Turn) -> bool:
+        """
+        Queues a turn; returns False (and counts it) when the queue is full.
+        """
+        if len(self._queue) >= self.max_queue:
+            if not self.dropped % 1000:   # one warning per thousand drops
+                logger.warning("History write queue full (%d turns); dropping turns", len(self._queue))
+            self.dropped += 1
+            return False
+        self._queue.append((key, turn))
+        self._pending[key].append(turn)
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+        if len(self._queue) >= self.max_batch:
+            self._wakeup.set()
+        return True
+
+    def pending(self, key: str) -> List[Turn]:
+        return list(self._pending.get(key, ()))
+
+    async def _run(self) -> None:
+        while self._queue:
+            if self._failures:
+                await asyncio.sleep(self._backoff())
+            else:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+                except asyncio.TimeoutError:
+                    pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        while self._queue:
+            batch, self._queue = self._queue[:self.max_batch], self._queue[self.max_batch:]
+            try:
+                await self.store.append_turns(batch)
+            except Exception:
+                self._failures += 1
+                self.failed_writes += 1
+                logger.exception("History write of %d turns failed; retrying in %.2fs", len(batch), self._backoff())
+                self._queue = batch + self._queue
+                return
+            self._failures = 0
+            self.flushes += 1
+            self.written += len(batch)
+            keys = []
+            for key, _ in batch:
+                pending = self._pending[key]
+                pending.pop(0)
+                if not pending:
+                    del self._pending[key]
+                keys.append(key)
+            if self.on_flush is not None:
+                self.on_flush(dict.fromkeys(keys))
+
+    def _backoff(self) -> float:
+        return min(self.interval * 2 ** self._failures, self.max_backoff)
+
+    async def close(self) -> None:
+        await self.flush()
+        if self._task is not None:
+            self._task.cancel()
@@ -0,0 +1,136 @@
+import os
+import sys
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from .base import ChatStore, Turn
+
+HISTORY_MAX_TURNS = int(os.getenv("HISTORY_MAX_TURNS", "20"))
+HISTORY_MAX_SESSIONS = int(os.getenv("HISTORY_MAX_SESSIONS", "10000"))
+HISTORY_IDLE_TTL = float(os.getenv("HISTORY_IDLE_TTL", "86400"))
+HISTORY_MAX_BYTES = int(os.getenv("HISTORY_MAX_BYTES", str(256 * 1024 * 1024)))
+HISTORY_MAX_PROFILES = int(os.getenv("HISTORY_MAX_PROFILES", "10000"))
+
+def _turn_size(turn: Turn) -> int:
+    return sys.getsizeof(turn) + sys.getsizeof(turn.user) + sys.getsizeof(turn.agent)
+
+class _Session:
+    """
+    Last HISTORY_MAX_TURNS turns of one chat session plus its rolling summary.
+    """
+    __slots__ = ("turns", "total", "summary", "summarized", "last_access", "nbytes")
+
+    def __init__(self):
+        self.turns: deque = deque(maxlen=HISTORY_MAX_TURNS)
+        self.total = 0        # turns ever added, including ones rotated out of the buffer
+        self.summary = ""
+        self.summarized = 0   # value of `total` the summary covers
+        self.last_access = time.monotonic()
+        self.nbytes = 0
+
+    def append(self, turn: Turn) -> int:
+        """
+        Adds a turn and returns the change in approximate size.
+        """
+        before = self.nbytes
+        if len(self.turns) == self.turns.maxlen:
+            self.nbytes -= _turn_size(self.turns[0])
+        self.turns.append(turn)
+        self.nbytes += _turn_size(turn)
+        self.total += 1
+        return self.nbytes - before
+
+class MemoryStore(ChatStore):
+    """
+    Process-local store (the default; no database required). Bounded: a ring buffer per
+    session, LRU + idle-TTL session eviction and a cap on approximate total size; saved
+    profiles are kept LRU up to HISTORY_MAX_PROFILES.
+    """
+
+    def __init__(self):
+        # Least recently used first.
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self._total_bytes = 0
+        # Saved profiles only, least recently used first; farmers without one get the default profile.
+        self._profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def _touch(self, key: str, create: bool = False) -> Optional[_Session]:
+        session = self._sessions.get(key)
+        if session is None:
+            if not create:
+                return None
+            session = self._sessions[key] = _Session()
+        session.last_access = time.monotonic()
+        self._sessions.move_to_end(key)
+        return session
+
+    def _evict(self) -> None:
+        """
+        Drops idle sessions, then least recently used ones until within the session and memory caps.
+        """
+        cutoff = time.monotonic() - HISTORY_IDLE_TTL
+        while self._sessions:
+            key, session = next(iter(self._sessions.items()))
+            over_cap = len(self._sessions) > HISTORY_MAX_SESSIONS or self._total_bytes > HISTORY_MAX_BYTES
+            if not over_cap and session.last_access > cutoff:
+                break
+            del self._sessions[key]
+            self._total_bytes -= session.nbytes
+
+    async def load_turns(self, key: str, limit: int) -> List[Turn]:
+        session = self._touch(key)
+        return list(session.turns)[-limit:] if session is not None else []
+
+    async def load_turns_since(self, key: str, offset: int) -> List[Turn]:
+        session = self._sessions.get(key)
+        if session is None:
+            return []
+        pending = min(session.total - offset, len(session.turns))
+        return list(session.turns)[len(session.turns) - pending:] if pending > 0 else []
+
+    async def count_turns(self, key: str) -> int:
+        session = self._sessions.get(key)
+        return session.total if session is not None else 0
+
+    async def append_turns(self, batch: Sequence[Tuple[str, Turn]]) -> None:
+        for key, turn in batch:
+            self._total_bytes += self._touch(key, create=True).append(turn)
+        self._evict()
+
+    async def load_summary(self, key: str) -> Tuple[str, int]:
+        session = self._sessions.get(key)
+        return (session.summary, session.summarized) if session is not None else ("", 0)
+
+    async def save_summary(self, key: str, summary: str, upto: int) -> None:
+        session = self._sessions.get(key)
+        if session is None or upto < session.summarized:
+            return  # evicted meanwhile, or a newer summary was already saved
+        delta = sys.getsizeof(summary) - (sys.getsizeof(session.summary) if session.summary else 0)
+        session.nbytes += delta
+        self._total_bytes += delta
+        session.summary, session.summarized = summary, upto
+
+    async def get_profile(self, user_id: str) -> Optional[Dict[str, Any]]:
+        profile = self._profiles.get(user_id)
+        if profile is None:
+            return None
+        self._profiles.move_to_end(user_id)
+        return dict(profile)
+
+    async def save_profile(self, user_id: str, profile: Dict[str, Any]) -> None:
+        self._profiles[user_id] = dict(profile)
+        self._profiles.move_to_end(user_id)
+        while len(self._profiles) > HISTORY_MAX_PROFILES:
+            self._profiles.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "memory",
+            "sessions": len(self._sessions),
+            "turns": sum(len(s.turns) for s in self._sessions.values()),
+            "approx_bytes": self._total_bytes,
+            "profiles": len(self._profiles),
+            "max_profiles": HISTORY_MAX_PROFILES,
+            "max_sessions": HISTORY_MAX_SESSIONS,
+            "max_bytes": HISTORY_MAX_BYTES,
+        }
@@ -0,0 +1,95 @@
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from ..mongo_client import get_db, close_client
+from .base import ChatStore, Turn
+
+class MongoStore(ChatStore):
+    """
+    MongoDB store (motor) shared by all workers.
+    Collections: chat_turns, chat_summaries, farmer_profiles, chat_counters.
+    Turns carry a per-session `seq` reserved from chat_counters, so their order does not
+    depend on ObjectId timestamps (which are only second-precise across workers).
+    """
+
+    buffered = True
+
+    def __init__(self):
+        db = get_db()
+        self._turns = db["chat_turns"]
+        self._summaries = db["chat_summaries"]
+        self._profiles = db["farmer_profiles"]
+        self._counters = db["chat_counters"]
+        self._indexed = False
+
+    async def _ensure_indexes(self) -> None:
+        if not self._indexed:
+            await self._turns.create_index([("session_key", ASCENDING), ("seq", ASCENDING)])
+            self._indexed = True
+
+    async def open(self) -> None:
+        # Round trip so the pool holds a live connection, then the indexes.
+        await self._turns.database.command("ping")
+        await self._ensure_indexes()
+
+    async def load_turns(self, key: str, limit: int) -> List[Turn]:
+        cursor = self._turns.find({"session_key": key}, {"user": 1, "agent": 1}).sort("seq", DESCENDING).limit(limit)
+        docs = await cursor.to_list(length=limit)
+        return [Turn(d["user"], d["agent"]) for d in reversed(docs)]
+
+    async def load_turns_since(self, key: str, offset: int) -> List[Turn]:
+        cursor = self._turns.find({"session_key": key}, {"user": 1, "agent": 1}).sort("seq", ASCENDING).skip(offset)
+        return [Turn(d["user"], d["agent"]) async for d in cursor]
+
+    async def count_turns(self, key: str) -> int:
+        return await self._turns.count_documents({"session_key": key})
+
+    async def _reserve(self, key: str, count: int) -> int:
+        """
+        Reserves `count` sequence numbers for a session and returns the first.
+        """
+        doc = await self._counters.find_one_and_update(
+            {"_id": key}, {"$inc": {"seq": count}}, upsert=True, return_document=ReturnDocument.AFTER
+        )
+        return doc["seq"] - count
+
+    async def append_turns(self, batch: Sequence[Tuple[str, Turn]]) -> None:
+        await self._ensure_indexes()
+        if not batch:
+            return
+        now = time.time()
+        next_seq = {key: await self._reserve(key, count) for key, count in Counter(key for key, _ in batch).items()}
+        docs = []
+        for key, t in batch:
+            docs.append({"session_key": key, "seq": next_seq[key], "user": t.user, "agent": t.agent, "created_at": now})
+            next_seq[key] += 1
+        await self._turns.insert_many(docs, ordered=True)
+
+    async def load_summary(self, key: str) -> Tuple[str, int]:
+        doc = await self._summaries.find_one({"_id": key})
+        return (doc["summary"], doc["summarized"]) if doc else ("", 0)
+
+    async def save_summary(self, key: str, summary: str, upto: int) -> None:
+        try:
+            await self._summaries.update_one(
+                {"_id": key, "summarized": {"$lte": upto}},
+                {"$set": {"summary": summary, "summarized": upto}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            pass  # a newer summary was saved by another worker
+
+    async def get_profile(self, user_id: str) -> Optional[Dict[str, Any]]:
+        doc = await self._profiles.find_one({"farmer_id": user_id}, {"_id": 0})
+        return doc
+
+    async def save_profile(self, user_id: str, profile: Dict[str, Any]) -> None:
+        await self._profiles.replace_one({"farmer_id": user_id}, {**profile, "farmer_id": user_id}, upsert=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "mongo", "database": self._turns.database.name}
+
+    async def close(self) -> None:
+        close_client()
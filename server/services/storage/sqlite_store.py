@@ -0,0 +1,117 @@
+import asyncio
+import json
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from .base import ChatStore, Turn
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS turns (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_key TEXT NOT NULL,
+    user_msg TEXT NOT NULL,
+    agent_msg TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS turns_session ON turns (session_key, id);
+CREATE TABLE IF NOT EXISTS summaries (
+    session_key TEXT PRIMARY KEY,
+    summary TEXT NOT NULL,
+    summarized INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS profiles (
+    user_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+"""
+
+class SQLiteStore(ChatStore):
+    """
+    Local file store in WAL mode, so several uvicorn workers can share one database.
+    sqlite3 is blocking: every statement runs on one dedicated thread per process.
+    """
+
+    buffered = True
+
+    def __init__(self, path: str):
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-store")
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def _query(self, sql: str, params: tuple = ()) -> list:
+        return self._conn.execute(sql, params).fetchall()
+
+    def _write(self, sql: str, rows: list) -> None:
+        with self._conn:
+            self._conn.executemany(sql, rows)
+
+    async def open(self) -> None:
+        # Starts the store thread and pages the schema in.
+        await self._run(self._query, "SELECT count(*) FROM sqlite_master")
+
+    async def load_turns(self, key: str, limit: int) -> List[Turn]:
+        rows = await self._run(
+            self._query,
+            "SELECT user_msg, agent_msg FROM turns WHERE session_key = ? ORDER BY id DESC LIMIT ?",
+            (key, limit),
+        )
+        return [Turn(*row) for row in reversed(rows)]
+
+    async def load_turns_since(self, key: str, offset: int) -> List[Turn]:
+        rows = await self._run(
+            self._query,
+            "SELECT user_msg, agent_msg FROM turns WHERE session_key = ? ORDER BY id LIMIT -1 OFFSET ?",
+            (key, offset),
+        )
+        return [Turn(*row) for row in rows]
+
+    async def count_turns(self, key: str) -> int:
+        rows = await self._run(self._query, "SELECT COUNT(*) FROM turns WHERE session_key = ?", (key,))
+        return rows[0][0]
+
+    async def append_turns(self, batch: Sequence[Tuple[str, Turn]]) -> None:
+        now = time.time()
+        rows = [(key, turn.user, turn.agent, now) for key, turn in batch]
+        await self._run(
+            self._write,
+            "INSERT INTO turns (session_key, user_msg, agent_msg, created_at) VALUES (?, ?, ?, ?)",
+            rows,
+        )
+
+    async def load_summary(self, key: str) -> Tuple[str, int]:
+        rows = await self._run(self._query, "SELECT summary, summarized FROM summaries WHERE session_key = ?", (key,))
+        return (rows[0][0], rows[0][1]) if rows else ("", 0)
+
+    async def save_summary(self, key: str, summary: str, upto: int) -> None:
+        await self._run(
+            self._write,
+            "INSERT INTO summaries (session_key, summary, summarized) VALUES (?, ?, ?) "
+            "ON CONFLICT(session_key) DO UPDATE SET summary = excluded.summary, summarized = excluded.summarized "
+            "WHERE excluded.summarized >= summaries.summarized",
+            [(key, summary, upto)],
+        )
+
+    async def get_profile(self, user_id: str) -> Optional[Dict[str, Any]]:
+        rows = await self._run(self._query, "SELECT data FROM profiles WHERE user_id = ?", (user_id,))
+        return json.loads(rows[0][0]) if rows else None
+
+    async def save_profile(self, user_id: str, profile: Dict[str, Any]) -> None:
+        await self._run(
+            self._write,
+            "INSERT OR REPLACE INTO profiles (user_id, data) VALUES (?, ?)",
+            [(user_id, json.dumps(profile))],
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "sqlite", "path": self.path}
+
+    async def close(self) -> None:
+        await self._run(self._conn.close)
+        self._executor.shutdown(wait=False)
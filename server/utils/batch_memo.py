@@ -0,0 +1,45 @@
+import asyncio
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+class BatchMemo:
+    """
+    Memo of lookups shared by the items of one batch: the first item to ask for a key starts the
+    call, every other item (concurrent or later) awaits the same task. Errors are shared too, so a
+    failing upstream is hit once per batch rather than once per item.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.reused = 0
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._tasks.get(key)
+        if task is None:
+            self.calls += 1
+            task = self._tasks[key] = asyncio.ensure_future(fn())
+        else:
+            self.reused += 1
+        # Shield so one cancelled item does not cancel the lookup the others are waiting on.
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int]:
+        return {"keys": len(self._tasks), "calls": self.calls, "reused": self.reused}
+
+_current: ContextVar[Optional[BatchMemo]] = ContextVar("batch_memo", default=None)
+
+def use_batch_memo(memo: BatchMemo) -> None:
+    """
+    Makes `memo` visible to batch_shared() in the current context (and tasks started from it).
+    """
+    _current.set(memo)
+
+async def batch_shared(key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Runs fn() once per key within a batch; outside a batch it just runs fn().
+    """
+    memo = _current.get()
+    if memo is None:
+        return await fn()
+    return await memo.do(key, fn)
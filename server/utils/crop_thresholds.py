@@ -0,0 +1,127 @@
+from typing import Any, Dict, Optional, Tuple
+
+from ..services.sensor_store import DEFAULT_SENSOR_RANGES
+
+# Column order of every threshold row.
+THRESHOLD_FIELDS = ("temperature", "humidity", "soil_moisture", "rainfall_mm")
+
+# Acceptable ranges per crop: temperature °C, relative humidity %, soil moisture in raw probe
+# units (same scale as the sensors), rainfall mm per reading.
+CROP_THRESHOLDS: Dict[str, Tuple[Tuple[float, float], ...]] = {
+    "wheat":     ((12, 25), (40, 70), (350, 600), (0, 10)),
+    "rice":      ((20, 35), (60, 90), (550, 850), (0, 50)),
+    "maize":     ((18, 32), (50, 80), (400, 650), (0, 25)),
+    "cotton":    ((21, 35), (40, 70), (350, 600), (0, 15)),
+    "sugarcane": ((20, 35), (60, 85), (500, 750), (0, 30)),
+    "soybean":   ((20, 30), (50, 75), (400, 650), (0, 20)),
+    "groundnut": ((22, 32), (50, 75), (350, 600), (0, 15)),
+    "chickpea":  ((15, 28), (40, 65), (300, 550), (0, 5)),
+    "mustard":   ((10, 25), (40, 70), (300, 550), (0, 8)),
+    "millet":    ((25, 35), (40, 70), (250, 500), (0, 15)),
+    "tomato":    ((18, 30), (50, 75), (400, 650), (0, 10)),
+    "potato":    ((15, 24), (60, 80), (450, 700), (0, 10)),
+    "onion":     ((13, 28), (50, 70), (350, 600), (0, 10)),
+    "banana":    ((20, 32), (60, 90), (500, 800), (0, 30)),
+}
+
+CROP_ALIASES = {
+    "paddy": "rice", "corn": "maize", "bajra": "millet", "jowar": "millet", "ragi": "millet",
+    "sarson": "mustard", "gram": "chickpea", "chana": "chickpea", "peanut": "groundnut",
+    "soya": "soybean", "soyabean": "soybean", "gehun": "wheat", "kapas": "cotton", "ganna": "sugarcane",
+}
+
+# Used for crops missing from the table; the LLM is told these are generic.
+GENERIC_THRESHOLDS = tuple(DEFAULT_SENSOR_RANGES.get(f, (0.0, 20.0)) for f in THRESHOLD_FIELDS)
+
+# Share of the last 24h a field may spend outside its range and still count as nominal.
+NOMINAL_OUT_OF_RANGE_PCT = 10.0
+
+def crop_thresholds(crop: str) -> Optional[Tuple[Tuple[float, float], ...]]:
+    """
+    Threshold row for a crop name (case-insensitive, common local names and plurals accepted).
+    """
+    name = " ".join((crop or "").lower().split())
+    name = CROP_ALIASES.get(name, name)
+    for candidate in (name, name[:-1], name[:-2]):   # "tomatoes", "onions"
+        row = CROP_THRESHOLDS.get(CROP_ALIASES.get(candidate, candidate))
+        if row is not None:
+            return row
+    return None
+
+def crop_ranges(crop: str) -> Dict[str, Tuple[float, float]]:
+    """
+    {field: (low, high)} for the crop, merged over the generic ranges (for sensor aggregates).
+    """
+    row = crop_thresholds(crop)
+    if row is None:
+        return dict(DEFAULT_SENSOR_RANGES)
+    return {**DEFAULT_SENSOR_RANGES, **dict(zip(THRESHOLD_FIELDS, row))}
+
+def _severity(deviation: float) -> str:
+    size = abs(deviation)
+    return "mild" if size < 0.1 else "moderate" if size < 0.3 else "severe"
+
+def score_deviations(sensors: Dict[str, Any], thresholds: Tuple[Tuple[float, float], ...]) -> Dict[str, Any]:
+    """
+    Scores the latest reading against a threshold row.
+    Deviation is the distance outside the range as a fraction of the range width
+    (negative = below, positive = above, 0 = within). Fields the sensors lack are skipped.
+    24h time-out-of-range from the sensor aggregates is carried along and counts against nominal.
+    """
+    day = (sensors.get("aggregates") or {}).get("24h", {})
+    readings = []
+    nominal = True
+    for field, (lo, hi) in zip(THRESHOLD_FIELDS, thresholds):
+        if field not in sensors:
+            continue
+        value = float(sensors[field])
+        deviation = (value - lo) / (hi - lo) if value < lo else (value - hi) / (hi - lo) if value > hi else 0.0
+        entry = {"field": field, "value": round(value, 2), "low": lo, "high": hi, "deviation": round(deviation, 3)}
+        if deviation:
+            entry["severity"] = _severity(deviation)
+            nominal = False
+        out_of_range = day.get(field, {}).get("out_of_range_pct")
+        if out_of_range is not None:
+            entry["out_of_range_24h_pct"] = out_of_range
+            nominal = nominal and out_of_range <= NOMINAL_OUT_OF_RANGE_PCT
+        readings.append(entry)
+    return {"nominal": nominal and bool(readings), "readings": readings}
+
+def format_deviations(scored: Dict[str, Any]) -> str:
+    """
+    Compact prompt text for a deviation score.
+    """
+    lines = []
+    for r in scored.get("readings", []):
+        line = f"{r['field']}: {r['value']} (range {r['low']:g}–{r['high']:g})"
+        if r["deviation"]:
+            direction = "below" if r["deviation"] < 0 else "above"
+            line += f" {direction} range by {abs(r['deviation']):.0%} of band width, {r['severity']}"
+        else:
+            line += " ok"
+        if "out_of_range_24h_pct" in r:
+            line += f"; {r['out_of_range_24h_pct']}% of last 24h out of range"
+        lines.append(line)
+    return "\n".join(lines)
+
+_FIELD_LABELS = {
+    "temperature": ("Temperature", "°C"),
+    "humidity": ("humidity", "%"),
+    "soil_moisture": ("soil moisture", ""),
+    "rainfall_mm": ("rainfall", " mm"),
+}
+
+def nominal_status_message(crop: str, scored: Dict[str, Any]) -> str:
+    """
+    Template answer for a status check when every reading is within the crop's range.
+    """
+    parts = [
+        f"{_FIELD_LABELS[r['field']][0]} {r['value']:g}{_FIELD_LABELS[r['field']][1]} "
+        f"(ideal {r['low']:g}–{r['high']:g})"
+        for r in scored.get("readings", [])
+    ]
+    return (
+        f"Your {crop} field looks healthy: all sensor readings are within the normal range for {crop}. "
+        + ", ".join(parts) + ". "
+        "No action is needed right now; keep your current irrigation and field routine."
+    )
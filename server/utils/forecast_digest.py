@@ -0,0 +1,78 @@
+from typing import Any, Dict, List
+
+STEP_HOURS = 3              # OpenWeather 5-day forecast resolution
+HIGH_HUMIDITY = 85.0        # % RH; long spells favour fungal disease
+HIGH_HUMIDITY_HOURS = 12
+HEAT_STRESS_C = 35.0
+COLD_STRESS_C = 10.0
+HEAVY_RAIN_DAY_MM = 20.0
+
+def _value(entry: Dict[str, Any], field: str) -> float:
+    return float(entry.get(field, 0) or 0)
+
+def _longest_run(values: List[float], threshold: float) -> int:
+    longest = run = 0
+    for v in values:
+        run = run + 1 if v >= threshold else 0
+        longest = max(longest, run)
+    return longest
+
+def _summarize_day(date: str, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    temp = [_value(e, "temp_c") for e in rows]
+    humidity = [_value(e, "humidity") for e in rows]
+    descriptions = [e.get("weather", "") for e in rows]
+    return {
+        "date": date,
+        "temp_min": round(min(temp), 1),
+        "temp_max": round(max(temp), 1),
+        "temp_mean": round(sum(temp) / len(temp), 1),
+        "humidity_mean": round(sum(humidity) / len(humidity)),
+        "humidity_max": round(max(humidity)),
+        "rain_mm": round(sum(_value(e, "rain_mm") for e in rows), 1),
+        "weather": max(descriptions, key=descriptions.count),   # ties go to the earliest
+    }
+
+def summarize_forecast(forecast: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Reduces the 3-hour forecast rows to per-day aggregates and agronomic flags.
+    Rows are grouped by the date part of `dt_txt`; a missing rain value counts as no rain.
+    """
+    if not forecast:
+        return {"days": [], "flags": []}
+    by_date: Dict[str, List[Dict[str, Any]]] = {}
+    for entry in forecast:
+        by_date.setdefault(str(entry.get("dt_txt") or "")[:10], []).append(entry)
+    days = [_summarize_day(date, rows) for date, rows in by_date.items()]
+
+    temp = [_value(e, "temp_c") for e in forecast]
+    flags = []
+    humid_hours = _longest_run([_value(e, "humidity") for e in forecast], HIGH_HUMIDITY) * STEP_HOURS
+    if humid_hours >= HIGH_HUMIDITY_HOURS:
+        flags.append(f"humidity >= {HIGH_HUMIDITY:g}% for up to {humid_hours} consecutive hours")
+    heat_hours = sum(STEP_HOURS for v in temp if v >= HEAT_STRESS_C)
+    if heat_hours:
+        flags.append(f"heat stress: {heat_hours} h >= {HEAT_STRESS_C:g}°C")
+    cold_hours = sum(STEP_HOURS for v in temp if v <= COLD_STRESS_C)
+    if cold_hours:
+        flags.append(f"cold stress: {cold_hours} h <= {COLD_STRESS_C:g}°C")
+    heavy = [d["date"] for d in days if d["rain_mm"] >= HEAVY_RAIN_DAY_MM]
+    if heavy:
+        flags.append(f"heavy rain (>= {HEAVY_RAIN_DAY_MM:g} mm/day) on {', '.join(heavy)}")
+    total_rain = round(sum(_value(e, "rain_mm") for e in forecast), 1)
+    if total_rain == 0:
+        flags.append("no rain forecast")
+
+    return {"days": days, "rain_total_mm": total_rain, "flags": flags}
+
+def format_forecast_digest(digest: Dict[str, Any]) -> str:
+    """
+    Renders the digest as one line per day plus a flags line.
+    """
+    lines = [
+        f"{d['date']}: {d['temp_min']}-{d['temp_max']}°C (avg {d['temp_mean']}), "
+        f"RH {d['humidity_mean']}% (max {d['humidity_max']}%), rain {d['rain_mm']} mm, {d['weather']}"
+        for d in digest.get("days", [])
+    ]
+    if digest.get("flags"):
+        lines.append("Flags: " + "; ".join(digest["flags"]))
+    return "\n".join(lines)
@@ -0,0 +1,117 @@
+import difflib
+import re
+from bisect import bisect_left
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .gazetteer_data import CITIES, MANDIS, STATES
+
+class Place(NamedTuple):
+    name: str       # canonical name
+    kind: str       # "mandi" | "city" | "state"
+    state: str      # canonical (AgMarket) state name
+    lat: float
+    lon: float
+    market: str     # AgMarket market name; "" for a state
+
+# When one alias names several places, the more specific kind wins.
+_KIND_RANK = {"mandi": 0, "city": 1, "state": 2}
+
+# Words that share a prefix with, or sit close to, a place name but are never meant as one.
+_COMMON_WORDS = frozenset("""
+    about after again crop crops field fields farm farmer market markets mandi mandis price prices
+    rate rates sale sales sell selling today tomorrow weather rain rainfall water season plant plants
+    plan planting sowing harvest status health disease should would could there their where which
+    while with will your from that this what when have
+""".split())
+
+_WORD = re.compile(r"[a-z]+")
+
+def normalize(text: str) -> str:
+    return " ".join(_WORD.findall((text or "").lower()))
+
+class Gazetteer:
+    """
+    In-memory index of place names. Exact aliases (one or more words) are dict lookups; a single
+    word can also match by unique prefix ("coimb") or, for longer words, by a close spelling
+    ("hyderbad"), compared only against aliases with the same first two letters.
+    """
+
+    def __init__(self, places: Iterable[Tuple[Place, Tuple[str, ...]]]):
+        self._exact: Dict[str, Place] = {}
+        for place, aliases in places:
+            for alias in (place.name, *aliases):
+                key = normalize(alias)
+                current = self._exact.get(key)
+                if current is None or _KIND_RANK[place.kind] < _KIND_RANK[current.kind]:
+                    self._exact[key] = place
+        self._keys = sorted(self._exact)
+        self._max_words = max(k.count(" ") + 1 for k in self._keys)
+        self._by_prefix: Dict[str, List[str]] = {}
+        for key in self._keys:
+            self._by_prefix.setdefault(key[:2], []).append(key)
+
+    def __len__(self) -> int:
+        return len(set(self._exact.values()))
+
+    def lookup(self, name: str) -> Optional[Place]:
+        """
+        The place a free-text name refers to ("chennai ", "Madras", "Bengaluru"), or None.
+        """
+        key = normalize(name)
+        if not key:
+            return None
+        return self._exact.get(key) or self._fuzzy(key)
+
+    def find_in_text(self, text: str) -> List[Place]:
+        """
+        Every distinct place named in a message, most specific first (mandi, city, state; in order
+        of mention within a kind). Longer n-grams are tried first so "navi mumbai" beats "mumbai".
+        """
+        words = _WORD.findall((text or "").lower())
+        found: List[Tuple[int, int, Place]] = []
+        used = [False] * len(words)
+        for size in range(min(self._max_words, len(words)), 0, -1):
+            for i in range(len(words) - size + 1):
+                if any(used[i:i + size]):
+                    continue
+                if size == 1 and len(words[i]) < 3:
+                    continue   # "up", "mp", "tn" are state codes only when asked for by name
+                place = self._exact.get(" ".join(words[i:i + size]))
+                if place is not None:
+                    found.append((_KIND_RANK[place.kind], i, place))
+                    used[i:i + size] = [True] * size
+        for i, word in enumerate(words):
+            if not used[i] and word not in _COMMON_WORDS:
+                place = self._fuzzy(word)
+                if place is not None:
+                    found.append((_KIND_RANK[place.kind], i, place))
+        places: List[Place] = []
+        for _, _, place in sorted(found):
+            if place not in places:
+                places.append(place)
+        return places
+
+    def _fuzzy(self, word: str) -> Optional[Place]:
+        if len(word) < 5:
+            return None
+        matches = set()
+        i = bisect_left(self._keys, word)
+        while i < len(self._keys) and self._keys[i].startswith(word):
+            matches.add(self._exact[self._keys[i]])
+            i += 1
+        if len(matches) == 1:
+            return matches.pop()
+        if len(word) < 6:
+            return None
+        close = difflib.get_close_matches(word, self._by_prefix.get(word[:2], ()), n=1, cutoff=0.85)
+        return self._exact[close[0]] if close else None
+
+def _entries() -> Iterable[Tuple[Place, Tuple[str, ...]]]:
+    for name, lat, lon, aliases in STATES:
+        yield Place(name, "state", name, lat, lon, ""), aliases
+    for name, state, lat, lon, aliases in CITIES:
+        yield Place(name, "city", state, lat, lon, name), aliases
+    for name, state, lat, lon, aliases in MANDIS:
+        yield Place(name, "mandi", state, lat, lon, name), aliases
+
+gazetteer = Gazetteer(_entries())
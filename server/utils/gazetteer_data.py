@@ -0,0 +1,238 @@
+# Bundled gazetteer: Indian states/UTs, major cities and agricultural towns, and well-known AgMarket
+# mandis. Coordinates are approximate city centres (2 decimals, ~1 km), which is all the weather
+# lookup needs. Names follow AgMarket spelling where it differs from common usage.
+
+# (state, capital lat, capital lon, aliases)
+STATES = [
+    ("Andhra Pradesh", 16.51, 80.52, ("ap",)),
+    ("Arunachal Pradesh", 27.08, 93.61, ()),
+    ("Assam", 26.14, 91.79, ()),
+    ("Bihar", 25.59, 85.14, ()),
+    ("Chhattisgarh", 21.25, 81.63, ("chattisgarh", "chhatisgarh")),
+    ("Goa", 15.49, 73.83, ()),
+    ("Gujarat", 23.22, 72.65, ("gujrat",)),
+    ("Haryana", 30.73, 76.78, ()),
+    ("Himachal Pradesh", 31.10, 77.17, ("hp",)),
+    ("Jharkhand", 23.34, 85.31, ()),
+    ("Karnataka", 12.97, 77.59, ()),
+    ("Kerala", 8.52, 76.94, ()),
+    ("Madhya Pradesh", 23.26, 77.41, ("mp",)),
+    ("Maharashtra", 19.08, 72.88, ("maharastra",)),
+    ("Manipur", 24.82, 93.94, ()),
+    ("Meghalaya", 25.58, 91.89, ()),
+    ("Mizoram", 23.73, 92.72, ()),
+    ("Nagaland", 25.67, 94.11, ()),
+    ("Odisha", 20.30, 85.82, ("orissa",)),
+    ("Punjab", 30.73, 76.78, ()),
+    ("Rajasthan", 26.91, 75.79, ()),
+    ("Sikkim", 27.33, 88.61, ()),
+    ("Tamil Nadu", 13.08, 80.27, ("tamilnadu", "tn")),
+    ("Telangana", 17.39, 78.49, ()),
+    ("Tripura", 23.83, 91.29, ()),
+    ("Uttar Pradesh", 26.85, 80.95, ("up",)),
+    ("Uttarakhand", 30.32, 78.03, ("uttaranchal",)),
+    ("West Bengal", 22.57, 88.36, ("bengal", "wb")),
+    ("Andaman and Nicobar", 11.62, 92.73, ("andaman",)),
+    ("Chandigarh", 30.73, 76.78, ()),
+    ("Dadra and Nagar Haveli and Daman and Diu", 20.40, 72.83, ("daman", "diu")),
+    ("NCT of Delhi", 28.61, 77.21, ("delhi ncr",)),
+    ("Jammu and Kashmir", 34.08, 74.80, ("kashmir",)),
+    ("Ladakh", 34.15, 77.58, ()),
+    ("Lakshadweep", 10.57, 72.64, ()),
+    ("Pondicherry", 11.94, 79.81, ("puducherry",)),
+]
+
+# (city, state, lat, lon, aliases); the AgMarket market name is the city name.
+CITIES = [
+    # Tamil Nadu
+    ("Chennai", "Tamil Nadu", 13.08, 80.27, ("madras",)),
+    ("Coimbatore", "Tamil Nadu", 11.02, 76.96, ("kovai",)),
+    ("Madurai", "Tamil Nadu", 9.93, 78.12, ()),
+    ("Tiruchirappalli", "Tamil Nadu", 10.79, 78.70, ("trichy", "tiruchi")),
+    ("Salem", "Tamil Nadu", 11.66, 78.15, ()),
+    ("Erode", "Tamil Nadu", 11.34, 77.72, ()),
+    ("Thanjavur", "Tamil Nadu", 10.79, 79.14, ("tanjore",)),
+    ("Tirunelveli", "Tamil Nadu", 8.71, 77.76, ()),
+    ("Vellore", "Tamil Nadu", 12.92, 79.13, ()),
+    ("Dindigul", "Tamil Nadu", 10.36, 77.98, ()),
+    # Karnataka
+    ("Bangalore", "Karnataka", 12.97, 77.59, ("bengaluru",)),
+    ("Mysore", "Karnataka", 12.30, 76.64, ("mysuru",)),
+    ("Hubli", "Karnataka", 15.36, 75.12, ("hubballi",)),
+    ("Belgaum", "Karnataka", 15.85, 74.50, ("belagavi",)),
+    ("Davangere", "Karnataka", 14.46, 75.92, ("davanagere",)),
+    ("Gulbarga", "Karnataka", 17.33, 76.83, ("kalaburagi",)),
+    ("Mangalore", "Karnataka", 12.91, 74.86, ("mangaluru",)),
+    ("Shimoga", "Karnataka", 13.93, 75.57, ("shivamogga",)),
+    # Kerala
+    ("Thiruvananthapuram", "Kerala", 8.52, 76.94, ("trivandrum",)),
+    ("Ernakulam", "Kerala", 9.93, 76.27, ("kochi", "cochin")),
+    ("Kozhikode", "Kerala", 11.26, 75.78, ("calicut",)),
+    ("Thrissur", "Kerala", 10.53, 76.21, ("trichur",)),
+    ("Palakkad", "Kerala", 10.78, 76.65, ("palghat",)),
+    # Andhra Pradesh
+    ("Amaravati", "Andhra Pradesh", 16.51, 80.52, ()),
+    ("Vijayawada", "Andhra Pradesh", 16.51, 80.65, ("bezawada",)),
+    ("Visakhapatnam", "Andhra Pradesh", 17.69, 83.22, ("vizag",)),
+    ("Guntur", "Andhra Pradesh", 16.31, 80.44, ()),
+    ("Kurnool", "Andhra Pradesh", 15.83, 78.04, ()),
+    ("Nellore", "Andhra Pradesh", 14.44, 79.99, ()),
+    ("Tirupati", "Andhra Pradesh", 13.63, 79.42, ()),
+    ("Anantapur", "Andhra Pradesh", 14.68, 77.60, ("anantapuramu",)),
+    # Telangana
+    ("Hyderabad", "Telangana", 17.39, 78.49, ("secunderabad",)),
+    ("Warangal", "Telangana", 17.97, 79.59, ()),
+    ("Nizamabad", "Telangana", 18.67, 78.09, ()),
+    ("Karimnagar", "Telangana", 18.44, 79.13, ()),
+    ("Khammam", "Telangana", 17.25, 80.15, ()),
+    # Maharashtra
+    ("Mumbai", "Maharashtra", 19.08, 72.88, ("bombay",)),
+    ("Pune", "Maharashtra", 18.52, 73.86, ("poona",)),
+    ("Nagpur", "Maharashtra", 21.15, 79.09, ()),
+    ("Nashik", "Maharashtra", 20.00, 73.79, ("nasik",)),
+    ("Aurangabad", "Maharashtra", 19.88, 75.34, ("chhatrapati sambhajinagar", "sambhajinagar")),
+    ("Solapur", "Maharashtra", 17.66, 75.91, ("sholapur",)),
+    ("Kolhapur", "Maharashtra", 16.70, 74.24, ()),
+    ("Amravati", "Maharashtra", 20.93, 77.75, ()),
+    ("Akola", "Maharashtra", 20.70, 77.00, ()),
+    ("Jalgaon", "Maharashtra", 21.00, 75.56, ()),
+    ("Latur", "Maharashtra", 18.40, 76.56, ()),
+    ("Sangli", "Maharashtra", 16.85, 74.58, ()),
+    ("Ahmednagar", "Maharashtra", 19.09, 74.74, ("ahilyanagar",)),
+    # Gujarat
+    ("Ahmedabad", "Gujarat", 23.02, 72.57, ("amdavad",)),
+    ("Surat", "Gujarat", 21.17, 72.83, ()),
+    ("Vadodara", "Gujarat", 22.31, 73.18, ("baroda",)),
+    ("Rajkot", "Gujarat", 22.30, 70.80, ()),
+    ("Bhavnagar", "Gujarat", 21.76, 72.15, ()),
+    ("Jamnagar", "Gujarat", 22.47, 70.06, ()),
+    ("Junagadh", "Gujarat", 21.52, 70.46, ()),
+    ("Gandhinagar", "Gujarat", 23.22, 72.65, ()),
+    ("Mehsana", "Gujarat", 23.60, 72.40, ("mahesana",)),
+    # Rajasthan
+    ("Jaipur", "Rajasthan", 26.91, 75.79, ()),
+    ("Jodhpur", "Rajasthan", 26.24, 73.02, ()),
+    ("Kota", "Rajasthan", 25.21, 75.86, ()),
+    ("Bikaner", "Rajasthan", 28.02, 73.31, ()),
+    ("Udaipur", "Rajasthan", 24.59, 73.71, ()),
+    ("Ajmer", "Rajasthan", 26.45, 74.64, ()),
+    ("Sri Ganganagar", "Rajasthan", 29.90, 73.88, ("ganganagar",)),
+    ("Alwar", "Rajasthan", 27.55, 76.63, ()),
+    # Madhya Pradesh
+    ("Bhopal", "Madhya Pradesh", 23.26, 77.41, ()),
+    ("Indore", "Madhya Pradesh", 22.72, 75.86, ()),
+    ("Gwalior", "Madhya Pradesh", 26.22, 78.18, ()),
+    ("Jabalpur", "Madhya Pradesh", 23.18, 79.99, ()),
+    ("Ujjain", "Madhya Pradesh", 23.18, 75.78, ()),
+    ("Sagar", "Madhya Pradesh", 23.84, 78.74, ("saugor",)),
+    ("Ratlam", "Madhya Pradesh", 23.33, 75.04, ()),
+    ("Dewas", "Madhya Pradesh", 22.97, 76.05, ()),
+    ("Mandsaur", "Madhya Pradesh", 24.07, 75.07, ()),
+    # Uttar Pradesh
+    ("Lucknow", "Uttar Pradesh", 26.85, 80.95, ()),
+    ("Kanpur", "Uttar Pradesh", 26.45, 80.33, ("cawnpore",)),
+    ("Agra", "Uttar Pradesh", 27.18, 78.01, ()),
+    ("Varanasi", "Uttar Pradesh", 25.32, 82.97, ("banaras", "benares", "kashi")),
+    ("Allahabad", "Uttar Pradesh", 25.44, 81.85, ("prayagraj",)),
+    ("Meerut", "Uttar Pradesh", 28.98, 77.71, ()),
+    ("Bareilly", "Uttar Pradesh", 28.37, 79.43, ()),
+    ("Gorakhpur", "Uttar Pradesh", 26.76, 83.37, ()),
+    ("Aligarh", "Uttar Pradesh", 27.88, 78.08, ()),
+    ("Moradabad", "Uttar Pradesh", 28.84, 78.77, ()),
+    ("Saharanpur", "Uttar Pradesh", 29.96, 77.55, ()),
+    ("Muzaffarnagar", "Uttar Pradesh", 29.47, 77.70, ()),
+    ("Jhansi", "Uttar Pradesh", 25.45, 78.57, ()),
+    # Punjab
+    ("Ludhiana", "Punjab", 30.90, 75.86, ()),
+    ("Amritsar", "Punjab", 31.63, 74.87, ()),
+    ("Jalandhar", "Punjab", 31.33, 75.58, ("jullundur",)),
+    ("Patiala", "Punjab", 30.34, 76.39, ()),
+    ("Bathinda", "Punjab", 30.21, 74.95, ("bhatinda",)),
+    ("Khanna", "Punjab", 30.70, 76.22, ()),
+    ("Moga", "Punjab", 30.82, 75.17, ()),
+    # Haryana
+    ("Karnal", "Haryana", 29.69, 76.99, ()),
+    ("Hisar", "Haryana", 29.15, 75.72, ("hissar",)),
+    ("Panipat", "Haryana", 29.39, 76.97, ()),
+    ("Rohtak", "Haryana", 28.90, 76.61, ()),
+    ("Sirsa", "Haryana", 29.53, 75.03, ()),
+    ("Ambala", "Haryana", 30.38, 76.78, ()),
+    ("Gurgaon", "Haryana", 28.46, 77.03, ("gurugram",)),
+    ("Kurukshetra", "Haryana", 29.97, 76.88, ()),
+    # Bihar
+    ("Patna", "Bihar", 25.59, 85.14, ()),
+    ("Gaya", "Bihar", 24.79, 85.00, ()),
+    ("Muzaffarpur", "Bihar", 26.12, 85.39, ()),
+    ("Bhagalpur", "Bihar", 25.24, 86.98, ()),
+    ("Darbhanga", "Bihar", 26.15, 85.90, ()),
+    ("Purnea", "Bihar", 25.78, 87.47, ("purnia",)),
+    # West Bengal
+    ("Kolkata", "West Bengal", 22.57, 88.36, ("calcutta",)),
+    ("Siliguri", "West Bengal", 26.73, 88.40, ()),
+    ("Burdwan", "West Bengal", 23.23, 87.86, ("bardhaman",)),
+    ("Durgapur", "West Bengal", 23.52, 87.31, ()),
+    ("Malda", "West Bengal", 25.01, 88.14, ()),
+    # Odisha
+    ("Bhubaneswar", "Odisha", 20.30, 85.82, ("bhubaneshwar",)),
+    ("Cuttack", "Odisha", 20.46, 85.88, ()),
+    ("Sambalpur", "Odisha", 21.47, 83.97, ()),
+    ("Berhampur", "Odisha", 19.31, 84.79, ("brahmapur",)),
+    ("Balasore", "Odisha", 21.49, 86.93, ("baleshwar",)),
+    # Assam and the north-east
+    ("Guwahati", "Assam", 26.14, 91.74, ("gauhati",)),
+    ("Dibrugarh", "Assam", 27.47, 94.91, ()),
+    ("Jorhat", "Assam", 26.75, 94.20, ()),
+    ("Silchar", "Assam", 24.83, 92.78, ()),
+    ("Agartala", "Tripura", 23.83, 91.29, ()),
+    ("Imphal", "Manipur", 24.82, 93.94, ()),
+    ("Shillong", "Meghalaya", 25.58, 91.89, ()),
+    ("Aizawl", "Mizoram", 23.73, 92.72, ()),
+    ("Kohima", "Nagaland", 25.67, 94.11, ()),
+    ("Itanagar", "Arunachal Pradesh", 27.08, 93.61, ()),
+    ("Gangtok", "Sikkim", 27.33, 88.61, ()),
+    # Jharkhand / Chhattisgarh
+    ("Ranchi", "Jharkhand", 23.34, 85.31, ()),
+    ("Jamshedpur", "Jharkhand", 22.80, 86.20, ("tatanagar",)),
+    ("Dhanbad", "Jharkhand", 23.80, 86.43, ()),
+    ("Raipur", "Chhattisgarh", 21.25, 81.63, ()),
+    ("Bilaspur", "Chhattisgarh", 22.08, 82.15, ()),
+    ("Durg", "Chhattisgarh", 21.19, 81.28, ()),
+    # Hills, north and UTs
+    ("Dehradun", "Uttarakhand", 30.32, 78.03, ()),
+    ("Haldwani", "Uttarakhand", 29.22, 79.51, ()),
+    ("Rudrapur", "Uttarakhand", 28.98, 79.40, ()),
+    ("Haridwar", "Uttarakhand", 29.95, 78.16, ("hardwar",)),
+    ("Shimla", "Himachal Pradesh", 31.10, 77.17, ("simla",)),
+    ("Kullu", "Himachal Pradesh", 31.96, 77.11, ()),
+    ("Solan", "Himachal Pradesh", 30.90, 77.10, ()),
+    ("Srinagar", "Jammu and Kashmir", 34.08, 74.80, ()),
+    ("Jammu", "Jammu and Kashmir", 32.73, 74.86, ()),
+    ("Leh", "Ladakh", 34.15, 77.58, ()),
+    ("Delhi", "NCT of Delhi", 28.61, 77.21, ("new delhi",)),
+    ("Chandigarh", "Chandigarh", 30.73, 76.78, ()),
+    ("Panaji", "Goa", 15.49, 73.83, ("panjim",)),
+    ("Margao", "Goa", 15.27, 73.96, ("madgaon",)),
+    ("Pondicherry", "Pondicherry", 11.94, 79.81, ("puducherry",)),
+    ("Port Blair", "Andaman and Nicobar", 11.62, 92.73, ()),
+]
+
+# (mandi, state, lat, lon, aliases): wholesale markets known by their own name.
+MANDIS = [
+    ("Azadpur", "NCT of Delhi", 28.71, 77.18, ()),
+    ("Narela", "NCT of Delhi", 28.85, 77.09, ()),
+    ("Vashi", "Maharashtra", 19.08, 73.00, ("navi mumbai", "vashi apmc")),
+    ("Lasalgaon", "Maharashtra", 20.15, 74.23, ()),
+    ("Pimpalgaon", "Maharashtra", 20.17, 73.99, ("pimpalgaon baswant",)),
+    ("Koyambedu", "Tamil Nadu", 13.07, 80.19, ()),
+    ("Oddanchatram", "Tamil Nadu", 10.48, 77.75, ()),
+    ("Mettupalayam", "Tamil Nadu", 11.30, 76.94, ()),
+    ("Hosur", "Tamil Nadu", 12.74, 77.83, ()),
+    ("Yeshwanthpur", "Karnataka", 13.02, 77.55, ("yeshwantpur",)),
+    ("Kolar", "Karnataka", 13.14, 78.13, ()),
+    ("Bowenpally", "Telangana", 17.47, 78.48, ()),
+    ("Unjha", "Gujarat", 23.80, 72.39, ()),
+    ("Gondal", "Gujarat", 21.96, 70.80, ()),
+    ("Neemuch", "Madhya Pradesh", 24.47, 74.87, ()),
+    ("Hapur", "Uttar Pradesh", 28.73, 77.78, ()),
+    ("Sirhind", "Punjab", 30.64, 76.38, ()),
+]
@@ -1,41 +1,72 @@
 import re
-from typing import Any, Dict
+from typing import Any, Dict, Optional
+from ..models.tool_records import LocalWeather, MarketPrice
+from .forecast_digest import format_forecast_digest
 
-def format_market_price(market_price: Dict[str, Any]) -> str:
+def format_market_price(market_price: Optional[MarketPrice]) -> str:
     """
     Formats the latest market price info for the LLM prompt.
     """
-    data = market_price.get("data", [])
-    if not data:
+    if market_price is None or market_price.error or not market_price.date:
         return "Market price data not available."
-    latest = data[0]
+    label = "Last known market price" if market_price.stale else "Latest market price"
     return (
-        f"Latest market price for {latest['Commodity']} in {latest['Market']} ({latest['Date']}):\n"
-        f"Min Price: ₹{latest['Min Price']}, Max Price: ₹{latest['Max Price']}, Modal Price: ₹{latest['Modal Price']}"
+        f"{label} for {market_price.commodity} in {market_price.market} ({market_price.date}):\n"
+        f"Min Price: ₹{market_price.min_price}, Max Price: ₹{market_price.max_price}, Modal Price: ₹{market_price.modal_price}"
     )
 
-def format_weather(weather: Dict[str, Any]) -> str:
+def format_weather(weather: Optional[LocalWeather]) -> str:
     """
-    Formats current and 5-day forecast weather data for LLM prompt.
+    Formats current weather and a daily digest of the 5-day forecast for LLM prompts.
     """
-    now = weather.get("now", {})
-    forecast = weather.get("forecast_5d", [])
+    if weather is None:
+        return ""
+    now = weather.now
     lines = []
-    if now:
+    if now is not None and not now.error:
         lines.append(
-            f"Current weather in {weather.get('location','')}: "
-            f"{now.get('temp_c','?')}°C, Humidity: {now.get('humidity','?')}%, "
-            f"Rain (last hour): {now.get('rain_mm',0)} mm, {now.get('weather','')}"
+            f"Current weather in {weather.location}: "
+            f"{now.temp_c}°C, Humidity: {now.humidity}%, "
+            f"Rain (last hour): {now.rain_mm} mm, {now.description}"
         )
-    if forecast:
-        lines.append("5-day forecast (3-hour intervals):")
-        for entry in forecast:  
-            lines.append(
-                f"{entry['dt_txt']}: {entry['temp_c']}°C, Humidity: {entry['humidity']}%, "
-                f"Rain: {entry['rain_mm']} mm, {entry['weather']}"
-            )
-    elif weather.get("forecast_error"):
-        lines.append(f"Forecast error: {weather['forecast_error']}")
+    if weather.digest and weather.digest.get("days"):
+        lines.append("5-day forecast (daily):")
+        lines.append(format_forecast_digest(weather.digest))
+    elif weather.forecast_error:
+        lines.append(f"Forecast error: {weather.forecast_error}")
+    return "\n".join(lines)
+
+def format_profile(profile: Dict[str, Any]) -> str:
+    """
+    The profile fields prompts use, as one line (instead of the repr of the whole dict).
+    """
+    crops = ", ".join(profile.get("crops") or []) or "unknown"
+    return (
+        f"{profile.get('name', 'Farmer')}, {profile.get('location') or 'location unknown'}, "
+        f"{profile.get('land_size_acres', '?')} acres, crops: {crops}"
+    )
+
+def format_sensors(sensors: Dict[str, Any]) -> str:
+    """
+    Formats the latest sensor reading and its windowed aggregates for LLM prompts.
+    """
+    if not sensors:
+        return "Sensor data not available."
+    fields = ("temperature", "humidity", "soil_moisture", "rainfall_mm", "gas_level")
+    lines = [
+        f"Latest reading ({sensors.get('timestamp', '')}): "
+        + ", ".join(f"{f}={sensors[f]}" for f in fields if f in sensors)
+    ]
+    for window, stats in (sensors.get("aggregates") or {}).items():
+        lines.append(f"Last {window} ({stats.get('_', {}).get('readings', 0)} readings):")
+        for field in fields:
+            agg = stats.get(field)
+            if not agg:
+                continue
+            line = f"  {field}: mean {agg['mean']}, min {agg['min']}, max {agg['max']}, trend {agg['trend']:+}"
+            if "out_of_range_pct" in agg:
+                line += f", {agg['out_of_range_pct']}% of time out of range"
+            lines.append(line)
     return "\n".join(lines)
 
 def clean_response(text: str) -> str:
@@ -54,3 +85,39 @@ def clean_response(text: str) -> str:
     cleaned = re.sub(r"Action:.*", "", cleaned, flags=re.I).strip()
 
     return cleaned
+
+
+class StreamingResponseCleaner:
+    """
+    Applies clean_response incrementally to a token stream.
+    Only text that can no longer change once more tokens arrive is emitted.
+    """
+
+    _CUT = "action:"
+
+    def __init__(self):
+        self._raw = ""
+        self._emitted = ""
+
+    def feed(self, chunk: str) -> str:
+        self._raw += chunk
+        cleaned = clean_response(self._raw)
+        if not self._raw.endswith("\n"):
+            # The open line may still turn out to start an "Action:" tail; hold back a matching suffix.
+            lowered = cleaned.lower()
+            for size in range(min(len(self._CUT), len(cleaned)), 0, -1):
+                if self._CUT.startswith(lowered[-size:]):
+                    cleaned = cleaned[:-size]
+                    break
+            cleaned = cleaned.rstrip()
+        return self._advance(cleaned)
+
+    def flush(self, final: str = None) -> str:
+        return self._advance(clean_response(self._raw) if final is None else final)
+
+    def _advance(self, cleaned: str) -> str:
+        if not cleaned.startswith(self._emitted):
+            return ""
+        delta = cleaned[len(self._emitted):]
+        self._emitted = cleaned
+        return delta
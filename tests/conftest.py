@@ -0,0 +1,57 @@
+import json
+from typing import Any, Dict, List
+
+import pytest
+from langchain_core.messages import AIMessage, BaseMessage
+
+from bench.fake_llm import FakeChatModel
+from server.agents import agent_roles
+
+
+class ScriptedModel(FakeChatModel):
+    """
+    FakeChatModel with scripted structured answers (by schema name) whose text answers echo the
+    prompt, so tests can check what context reached the model.
+    """
+
+    latency_s: float = 0.0
+    answers: Dict[str, Any] = {}
+
+    def _structured(self, messages: List[BaseMessage]) -> str:
+        name = self.structured_schema.__name__
+        if name in self.answers:
+            return json.dumps(self.answers[name])
+        return super()._structured(messages)
+
+    def _respond(self, messages: List[BaseMessage]) -> AIMessage:
+        if self.structured_schema is not None:
+            return super()._respond(messages)
+        return AIMessage(content="\n".join(str(m.content) for m in messages if m.type == "human"))
+
+
+@pytest.fixture
+def use_model():
+    """
+    Installs a chat model for the test and restores the previous one afterwards.
+    """
+    previous = agent_roles.llm
+
+    def install(model: Any) -> Any:
+        agent_roles.set_llm(model)
+        return model
+
+    yield install
+    agent_roles.set_llm(previous)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_caches():
+    """
+    Module-level caches would otherwise carry answers from one test into the next.
+    """
+    from server.agents import llm_cache
+    from server.agents.tools import market_tool, profile_tool, weather_tool
+
+    for cache in (llm_cache._cache, profile_tool._profile_cache, weather_tool._weather_cache, market_tool._price_cache):
+        cache.clear()
+    yield
@@ -0,0 +1,101 @@
+import asyncio
+import json
+
+import httpx
+
+from server.utils.batch_memo import BatchMemo, batch_shared
+
+from .conftest import ScriptedModel
+from .test_weather_tool import _fake_upstream
+
+
+def test_one_call_per_key_and_errors_are_shared():
+    calls = []
+
+    async def lookup(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        if key == "down":
+            raise ConnectionError("upstream down")
+        return key.upper()
+
+    async def main():
+        memo = BatchMemo()
+        results = await asyncio.gather(
+            *(memo.do(k, lambda k=k: lookup(k)) for k in ("a", "a", "down", "b", "down", "a")),
+            return_exceptions=True,
+        )
+        return memo, results
+
+    memo, results = asyncio.run(main())
+    assert results[0] == results[1] == results[5] == "A" and results[3] == "B"
+    assert all(isinstance(results[i], ConnectionError) for i in (2, 4))
+    assert sorted(calls) == ["a", "b", "down"]
+    assert memo.stats() == {"keys": 3, "calls": 3, "reused": 3}
+
+
+def test_cancelled_item_does_not_cancel_the_shared_lookup():
+    async def main():
+        memo = BatchMemo()
+        started = asyncio.Event()
+
+        async def lookup():
+            started.set()
+            await asyncio.sleep(0.02)
+            return "ok"
+
+        first = asyncio.ensure_future(memo.do("k", lookup))
+        await started.wait()
+        second = asyncio.ensure_future(memo.do("k", lookup))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == "ok"
+
+
+def test_outside_a_batch_nothing_is_shared():
+    calls = []
+
+    async def lookup():
+        calls.append(1)
+
+    async def main():
+        await batch_shared("k", lookup)
+        await batch_shared("k", lookup)
+
+    asyncio.run(main())
+    assert len(calls) == 2
+
+
+def test_chat_batch_shares_lookups_across_items(monkeypatch, use_model):
+    from server.main import app
+
+    upstream = _fake_upstream(monkeypatch)
+    use_model(ScriptedModel(answers={"QueryExtraction": {
+        "intents": ["weather"], "crop": "wheat", "city": "Chennai", "market": "Chennai", "state": "Tamil Nadu",
+    }}))
+    items = [
+        {"user_id": "u1", "session_id": "s1", "message": "Rain in Chennai?"},
+        {"user_id": "u2", "session_id": "s1", "message": "Rain in Chennai?"},
+        {"user_id": "u1", "session_id": "s2", "message": "Rain in Chennai?"},
+    ]
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            resp = await client.post("/api/v1/chat/batch", json={"items": items})
+        return resp
+
+    resp = asyncio.run(main())
+    events = [
+        (block.split("\n")[0][len("event: "):], json.loads(block.split("\n")[1][len("data: "):]))
+        for block in resp.text.strip().split("\n\n")
+    ]
+
+    assert sorted(e["index"] for name, e in events if name == "result") == [0, 1, 2]
+    name, done = events[-1]
+    assert name == "done" and done["errors"] == 0
+    # One weather key for all three items, one profile key per farmer.
+    assert done["shared_lookups"] == {"keys": 3, "calls": 3, "reused": 3}
+    assert len(upstream) == 2                        # current + forecast, once for the batch
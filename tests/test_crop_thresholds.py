@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from server.agents import orchestrator
+from server.models.query_extraction import QueryExtraction
+from server.utils.crop_thresholds import crop_thresholds, score_deviations
+
+from .conftest import ScriptedModel
+
+WHEAT = crop_thresholds("wheat")      # ((12, 25), (40, 70), (350, 600), (0, 10))
+NOMINAL = {"temperature": 20, "humidity": 55, "soil_moisture": 450, "rainfall_mm": 0}
+
+
+def test_aliases_and_plurals_resolve_to_the_same_row():
+    assert crop_thresholds("Gehun") == crop_thresholds("wheats") == WHEAT
+    assert crop_thresholds("dragon fruit") is None
+
+
+def test_readings_in_range_are_nominal():
+    scored = score_deviations(NOMINAL, WHEAT)
+
+    assert scored["nominal"] is True
+    assert [r["deviation"] for r in scored["readings"]] == [0.0] * 4
+    assert not any("severity" in r for r in scored["readings"])
+
+
+def test_deviation_is_a_fraction_of_the_band_width():
+    scored = score_deviations({**NOMINAL, "temperature": 27.6, "soil_moisture": 300}, WHEAT)
+
+    by_field = {r["field"]: r for r in scored["readings"]}
+    assert scored["nominal"] is False
+    assert (by_field["temperature"]["deviation"], by_field["temperature"]["severity"]) == (0.2, "moderate")
+    assert (by_field["soil_moisture"]["deviation"], by_field["soil_moisture"]["severity"]) == (-0.2, "moderate")
+    assert "severity" not in by_field["humidity"]
+
+
+def test_missing_fields_are_skipped_and_no_readings_is_not_nominal():
+    scored = score_deviations({"temperature": 20}, WHEAT)
+    assert [r["field"] for r in scored["readings"]] == ["temperature"] and scored["nominal"] is True
+    assert score_deviations({}, WHEAT) == {"nominal": False, "readings": []}
+
+
+def test_time_out_of_range_in_the_last_day_counts_against_nominal():
+    sensors = {**NOMINAL, "aggregates": {"24h": {"humidity": {"out_of_range_pct": 25.0}}}}
+
+    scored = score_deviations(sensors, WHEAT)
+
+    assert scored["nominal"] is False
+    assert next(r for r in scored["readings"] if r["field"] == "humidity")["out_of_range_24h_pct"] == 25.0
+
+
+def _health(intents, sensors):
+    state = {
+        "profile": {"crops": ["wheat"]},
+        "sensors": sensors,
+        "query": QueryExtraction(intents=intents),
+        "history_summary": "",
+    }
+    return asyncio.run(orchestrator.crop_health_node(state))
+
+
+@pytest.mark.parametrize("intents", [["status"], ["health"], ["health", "status"]])
+def test_nominal_status_check_is_answered_from_the_template(use_model, intents):
+    use_model(ScriptedModel())
+
+    result = _health(intents, NOMINAL)
+
+    assert result["crop_deviations"]["templated"] is True
+    assert result["crop_analysis"].startswith("Your wheat field looks healthy")
+
+
+@pytest.mark.parametrize("intents, sensors", [
+    (["status"], {**NOMINAL, "temperature": 31}),       # a reading out of range
+    (["status", "disease"], NOMINAL),                   # more than a status check
+])
+def test_other_turns_go_to_the_model_with_the_scored_deviations(use_model, intents, sensors):
+    use_model(ScriptedModel())
+
+    result = _health(intents, sensors)
+
+    assert "templated" not in result["crop_deviations"]
+    assert "Deviations vs wheat thresholds:" in result["crop_analysis"]   # the echoed prompt
@@ -0,0 +1,48 @@
+import asyncio
+import time
+
+from server.agents import orchestrator
+from server.agents.tools import history_tool, profile_tool, weather_tool
+from server.models.query_extraction import UNRESOLVED
+from server.services.storage import MemoryStore
+
+from .conftest import ScriptedModel
+
+
+class StalledStore(MemoryStore):
+    """
+    Store whose reads hang, as a database would while failing over.
+    """
+
+    async def _stall(self, *args):
+        await asyncio.sleep(30)
+
+    load_turns = load_summary = get_profile = _stall
+
+
+def test_stalled_profile_load_asks_for_the_location_instead_of_guessing(monkeypatch, use_model):
+    store = StalledStore()
+    monkeypatch.setattr(history_tool, "get_store", lambda: store)
+    monkeypatch.setattr(profile_tool, "get_store", lambda: store)
+    monkeypatch.setattr(orchestrator, "LOAD_TIMEOUT_S", 0.1)
+
+    async def no_upstream(*args, **kwargs):
+        raise AssertionError("weather fetched without a location")
+
+    monkeypatch.setattr(weather_tool, "hedged_get", no_upstream)
+    use_model(ScriptedModel(answers={"QueryExtraction": {
+        "intents": ["weather"], "crop": UNRESOLVED, "city": UNRESOLVED, "market": UNRESOLVED, "state": UNRESOLVED,
+    }}))
+
+    async def main():
+        state = orchestrator._initial_state("u", "s", "Will it rain this week?")
+        return await orchestrator._build_graph().ainvoke(state)
+
+    started = time.monotonic()
+    result = asyncio.run(main())
+
+    assert time.monotonic() - started < 2
+    assert set(result["unavailable"]) == {"chat_history", "farmer_profile"}
+    answer = result["final_response"]                  # the model echoes the synthesizer prompt
+    assert "Chennai" not in answer
+    assert "location unknown" in answer and "Location unknown; ask the farmer" in answer
@@ -0,0 +1,68 @@
+import asyncio
+import time
+
+from server.agents.orchestrator import RESPONSE_RESERVE_S, farmer_interaction_node, keyword_intents
+from server.models.query_extraction import UNRESOLVED
+
+from .conftest import ScriptedModel
+
+UNRESOLVED_PLACES = {"city": UNRESOLVED, "market": UNRESOLVED, "state": UNRESOLVED}
+
+
+def _extract(message: str, profile: dict, deadline: float = None) -> dict:
+    state = {"user_id": "u", "session_id": "s", "message": message, "profile": profile}
+    if deadline is not None:
+        state["deadline"] = deadline
+    return asyncio.run(farmer_interaction_node(state))
+
+
+def test_single_named_place_comes_from_the_gazetteer(use_model):
+    # The location-free prompt tells the model to leave places unresolved.
+    use_model(ScriptedModel(answers={"QueryExtraction": {"intents": ["rain"], "crop": "rice", **UNRESOLVED_PLACES}}))
+    result = _extract("Will it rain in Madras tomorrow?", {"location": "Pune"})
+
+    query = result["query"]
+    assert (query.city, query.market, query.state) == ("Chennai", "Chennai", "Tamil Nadu")
+    assert result["route"] == ["weather"]
+    assert "location from gazetteer" in result["trace"][0]
+
+
+def test_model_places_are_canonicalized(use_model):
+    use_model(ScriptedModel(answers={"QueryExtraction": {
+        "intents": ["price"], "crop": "Onion", "city": "bombay", "market": "lasalgaon", "state": "maharashtra",
+    }}))
+    result = _extract("onion price near me?", {"location": "Mumbai"})
+
+    query = result["query"]
+    assert (query.crop, query.city, query.market, query.state) == ("onion", "Mumbai", "Lasalgaon", "Maharashtra")
+    assert "location from llm" in result["trace"][0]
+
+
+def test_unknown_location_stays_unresolved(use_model):
+    use_model(ScriptedModel(answers={"QueryExtraction": {"intents": ["weather", "market"], "crop": "none", **UNRESOLVED_PLACES}}))
+    result = _extract("weather and wheat price?", {})
+
+    query = result["query"]
+    assert (query.crop, query.city, query.market, query.state) == (UNRESOLVED,) * 4
+    assert result["route"] == ["agmarket_price", "weather"]
+
+
+def test_timeout_falls_back_to_whole_word_intents(use_model):
+    use_model(ScriptedModel(latency_s=5.0))
+    started = time.monotonic()
+    result = _extract(
+        "Is training on plant care useful, and will it rain?",
+        {"location": "Pune"},
+        deadline=time.monotonic() + RESPONSE_RESERVE_S + 0.2,
+    )
+
+    assert time.monotonic() - started < 2
+    query = result["query"]
+    assert query.intents == ["rain"]
+    assert query.city == "Pune"
+    assert result["route"] == ["weather"]
+
+
+def test_keyword_intents_match_whole_words():
+    assert keyword_intents("Training for planting season") == []
+    assert keyword_intents("Any DISEASES? what are prices and plans") == ["disease", "plan", "price"]
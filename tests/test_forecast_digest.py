@@ -0,0 +1,40 @@
+from server.utils.forecast_digest import format_forecast_digest, summarize_forecast
+
+
+def _row(dt_txt, temp_c, humidity, rain_mm=None, weather="clear sky"):
+    row = {"dt_txt": dt_txt, "temp_c": temp_c, "humidity": humidity, "weather": weather}
+    if rain_mm is not None:
+        row["rain_mm"] = rain_mm
+    return row
+
+
+def test_rows_are_grouped_by_calendar_day():
+    digest = summarize_forecast([
+        _row("2024-07-01 18:00:00", 30.0, 60, rain_mm=2.0, weather="light rain"),
+        _row("2024-07-01 21:00:00", 26.0, 70),
+        _row("2024-07-02 00:00:00", 24.0, 80, rain_mm=None),
+        _row("2024-07-02 03:00:00", 22.0, 90, rain_mm=21.5, weather="heavy rain"),
+        _row("2024-07-02 06:00:00", 25.0, 70, weather="heavy rain"),
+    ])
+
+    first, second = digest["days"]
+    assert first == {
+        "date": "2024-07-01", "temp_min": 26.0, "temp_max": 30.0, "temp_mean": 28.0,
+        "humidity_mean": 65, "humidity_max": 70, "rain_mm": 2.0, "weather": "light rain",
+    }
+    assert second["date"] == "2024-07-02" and second["rain_mm"] == 21.5
+    assert (second["temp_min"], second["temp_max"], second["weather"]) == (22.0, 25.0, "heavy rain")
+    assert digest["rain_total_mm"] == 23.5
+    assert digest["flags"] == ["heavy rain (>= 20 mm/day) on 2024-07-02"]
+
+
+def test_missing_rain_counts_as_dry():
+    digest = summarize_forecast([_row("2024-07-01 00:00:00", 36.0, 90), _row("2024-07-01 03:00:00", 8.0, 90, rain_mm=0)])
+
+    assert digest["days"][0]["rain_mm"] == 0
+    assert digest["flags"] == ["heat stress: 3 h >= 35°C", "cold stress: 3 h <= 10°C", "no rain forecast"]
+    assert "Flags: heat stress" in format_forecast_digest(digest)
+
+
+def test_empty_forecast():
+    assert summarize_forecast([]) == {"days": [], "flags": []}
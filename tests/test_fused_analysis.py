@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from server.agents import orchestrator
+from server.agents.orchestrator import UNAVAILABLE, fuse_route, resolve_route
+from server.agents.tools import weather_tool
+from server.models.query_extraction import QueryExtraction
+
+from .conftest import ScriptedModel
+
+SECTIONS = {"crop_analysis": "Leaves look fine.", "disease_risk": "Low rust risk.", "plan": "Irrigate on day 3."}
+
+
+@pytest.mark.parametrize("mode, intents, fused", [
+    ("auto", ["disease"], False),                    # one section: the separate node is as cheap
+    ("auto", ["disease", "plan"], True),
+    ("auto", ["health", "disease", "market"], True),
+    ("on", ["disease"], True),
+    ("on", ["status"], False),                       # status checks keep the template path
+    ("off", ["health", "disease", "plan"], False),
+    ("auto", ["market", "weather"], False),          # no analysis sections at all
+])
+def test_fuse_route_thresholds(monkeypatch, mode, intents, fused):
+    monkeypatch.setattr(orchestrator, "FUSED_ANALYSIS", mode)
+    route = resolve_route(intents)
+
+    result = fuse_route(route, intents)
+
+    assert ("fused_analysis" in result) == fused
+    if fused:
+        assert not set(result) & set(orchestrator.FUSED_SECTIONS)
+        assert [n for n in route if n not in orchestrator.FUSED_SECTIONS] == result[:-1]
+    else:
+        assert result == route
+
+
+def _fused(intents, streaming=False):
+    state = {
+        "user_id": "u", "session_id": "s", "message": "disease risk and a plan?",
+        "profile": {"location": "Pune", "crops": ["onion"]},
+        "query": QueryExtraction(intents=intents), "streaming": streaming,
+    }
+    return asyncio.run(orchestrator.fused_analysis_node(state))
+
+
+def test_sections_are_copied_into_their_state_keys(use_model):
+    use_model(ScriptedModel(answers={"FusedAnalysis": {**SECTIONS, "answer": "All good."}}))
+
+    result = _fused(["disease", "plan"])
+
+    assert (result["disease_risk"], result["plan"]) == (SECTIONS["disease_risk"], SECTIONS["plan"])
+    assert "crop_analysis" not in result              # not requested, not copied
+    assert result["fused_answer"] == "All good."
+    assert result["unavailable"] == []
+
+
+def test_streaming_turns_leave_the_answer_to_the_synthesizer(use_model):
+    use_model(ScriptedModel(answers={"FusedAnalysis": {**SECTIONS, "answer": "All good."}}))
+
+    result = _fused(["disease", "plan"], streaming=True)
+
+    assert "fused_answer" not in result and result["plan"] == SECTIONS["plan"]
+
+
+def test_missing_section_is_reported_unavailable_and_the_answer_is_not_used(use_model):
+    use_model(ScriptedModel(answers={"FusedAnalysis": {**SECTIONS, "plan": " ", "answer": "All good."}}))
+
+    result = _fused(["disease", "plan"])
+
+    assert result["unavailable"] == ["lifecycle_planning"]
+    assert "fused_answer" not in result
+    parts = orchestrator._answer_parts({**result, "query": QueryExtraction(intents=["disease", "plan"])})
+    assert parts == {"Disease": SECTIONS["disease_risk"], "Plan": UNAVAILABLE}
+
+
+def test_stream_emits_answer_tokens_for_fused_turns(monkeypatch, use_model):
+    async def upstream_down(*args, **kwargs):
+        raise ConnectionError("offline")
+
+    monkeypatch.setattr(weather_tool, "hedged_get", upstream_down)
+    monkeypatch.setattr(orchestrator, "FUSED_ANALYSIS", "auto")
+    monkeypatch.setattr(orchestrator, "FUSED_ANSWER", True)
+    use_model(ScriptedModel(answers={
+        "QueryExtraction": {"intents": ["disease", "plan"], "crop": "wheat", "city": "Pune", "market": "Pune", "state": "Maharashtra"},
+        "FusedAnalysis": {**SECTIONS, "answer": "Drafted in one piece."},
+    }))
+
+    async def main():
+        return [e async for e in orchestrator.stream_langgraph_workflow("u", "s", "Disease risk and a plan for my wheat?")]
+
+    events = asyncio.run(main())
+
+    assert "fused_analysis" in [e["node"] for e in events if e["event"] == "node"]
+    tokens = [e["text"] for e in events if e["event"] == "token"]
+    assert len(tokens) > 10                           # the synthesizer's tokens, not one final chunk
+    assert events[-1]["event"] == "done"
+    assert "".join(tokens).strip() == events[-1]["response"].strip()
+    assert "Drafted in one piece." not in events[-1]["response"]
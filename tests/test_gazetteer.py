@@ -0,0 +1,63 @@
+import pytest
+
+from server.utils.gazetteer import Gazetteer, Place, gazetteer
+
+
+def _place(name, kind, state="Telangana"):
+    return Place(name, kind, state, 0.0, 0.0, "" if kind == "state" else name)
+
+
+TELANGANA = _place("Telangana", "state")
+HYDERABAD_CITY = _place("Hyderabad", "city")
+HYDERABAD_MANDI = _place("Hyderabad", "mandi")
+KARNAL = _place("Karnal", "city", "Haryana")
+KARNATAKA = _place("Karnataka", "state", "Karnataka")
+MUMBAI = _place("Mumbai", "city", "Maharashtra")
+NAVI_MUMBAI = _place("Navi Mumbai", "mandi", "Maharashtra")
+MARKAPUR = _place("Markapur", "city", "Andhra Pradesh")
+
+SMALL = Gazetteer([
+    (TELANGANA, ("ts",)),
+    (HYDERABAD_CITY, ("bhagyanagar",)),
+    (HYDERABAD_MANDI, ()),
+    (KARNAL, ()),
+    (KARNATAKA, ()),
+    (MUMBAI, ("bombay",)),
+    (NAVI_MUMBAI, ()),
+    (MARKAPUR, ()),
+])
+
+
+@pytest.mark.parametrize("name, expected", [
+    (" Bombay ", MUMBAI),                 # alias, case and spacing
+    ("Navi-Mumbai", NAVI_MUMBAI),         # punctuation normalized away
+    ("hyderabad", HYDERABAD_MANDI),       # one alias, several kinds: the most specific wins
+    ("bhagya", HYDERABAD_CITY),           # unique prefix
+    ("hyderbad", HYDERABAD_MANDI),        # close spelling
+    ("karna", None),                      # prefix of Karnal and Karnataka: ambiguous
+    ("karnatka", KARNATAKA),
+    ("hyde", None),                       # too short to guess from
+    ("", None),
+    ("Atlantis", None),
+])
+def test_lookup(name, expected):
+    assert SMALL.lookup(name) == expected
+
+
+def test_find_in_text_prefers_longer_names_and_specific_kinds():
+    places = SMALL.find_in_text("Onion rates at Navi Mumbai vs Telangana and bhagyanagar?")
+
+    assert places == [NAVI_MUMBAI, HYDERABAD_CITY, TELANGANA]   # mandi, city, state; no bare "Mumbai"
+
+
+def test_find_in_text_skips_common_words_and_short_codes():
+    # Two-letter state codes only match when looked up by name.
+    assert SMALL.find_in_text("what is the market price ts today") == []
+    assert SMALL.lookup("ts") == TELANGANA
+    assert SMALL.find_in_text("weather in hyderbad") == [HYDERABAD_MANDI]
+
+
+def test_bundled_data_resolves_common_aliases():
+    assert gazetteer.lookup("Madras").name == "Chennai"
+    assert gazetteer.lookup("bengaluru") == gazetteer.lookup("Bangalore")
+    assert len(gazetteer) > 100
@@ -0,0 +1,82 @@
+import asyncio
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from server.agents import llm_cache
+from server.utils import ttl_cache
+
+
+class CountingModel:
+    def __init__(self, delay=0.01):
+        self.calls = 0
+        self.delay = delay
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return f"answer {self.calls}"
+
+
+def _messages(text):
+    return [SystemMessage(content="Extract intents."), HumanMessage(content=text)]
+
+
+def _stats(prompt):
+    return dict(llm_cache.llm_cache_stats()["prompts"].get(prompt, {}))
+
+
+def test_repeat_prompt_is_served_from_the_cache():
+    model = CountingModel()
+
+    async def main():
+        first = await llm_cache.cached_ainvoke("t-hit", _messages("Wheat price today?"), model)
+        # Case and whitespace do not change the key.
+        second = await llm_cache.cached_ainvoke("t-hit", _messages("  wheat PRICE   today? "), model)
+        other = await llm_cache.cached_ainvoke("t-hit", _messages("Rain tomorrow?"), model)
+        return first, second, other
+
+    first, second, other = asyncio.run(main())
+    assert (first, second, other) == ("answer 1", "answer 1", "answer 2")
+    assert model.calls == 2
+    stats = _stats("t-hit")
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 2, 0.333)
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    now = [1000.0]
+    # The time module is shared with the event loop, so the model must not wait on a timer here.
+    monkeypatch.setattr(ttl_cache.time, "monotonic", lambda: now[0])
+    model = CountingModel(delay=0)
+
+    async def ask():
+        return await llm_cache.cached_ainvoke("t-expiry", _messages("Wheat price today?"), model)
+
+    assert asyncio.run(ask()) == "answer 1"
+    now[0] += llm_cache.LLM_CACHE_TTL - 1
+    assert asyncio.run(ask()) == "answer 1"
+    now[0] += 2
+    assert asyncio.run(ask()) == "answer 2"
+    assert model.calls == 2
+
+
+def test_concurrent_identical_prompts_share_one_call():
+    model = CountingModel()
+
+    async def main():
+        return await asyncio.gather(*(llm_cache.cached_ainvoke("t-flight", _messages("hi"), model) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["answer 1"] * 5
+    assert model.calls == 1
+    assert (_stats("t-flight")["misses"], _stats("t-flight")["coalesced"]) == (1, 4)
+
+
+def test_long_prompts_bypass_the_cache(monkeypatch):
+    monkeypatch.setattr(llm_cache, "LLM_CACHE_MAX_INPUT_CHARS", 20)
+    model = CountingModel()
+
+    async def main():
+        for _ in range(2):
+            await llm_cache.cached_ainvoke("t-long", _messages("a message well over the limit"), model)
+
+    asyncio.run(main())
+    assert model.calls == 2 and _stats("t-long")["uncacheable"] == 2
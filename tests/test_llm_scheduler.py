@@ -0,0 +1,147 @@
+import asyncio
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from server.agents.llm_scheduler import LLMScheduler
+
+
+async def _hold_slot(scheduler: LLMScheduler) -> tuple:
+    """
+    Occupies the scheduler's only slot until the returned event is set.
+    """
+    release = asyncio.Event()
+    holder = asyncio.ensure_future(scheduler.run(release.wait, 1, "response", "holder"))
+    await asyncio.sleep(0)
+    assert scheduler.stats()["active"] == 1
+    return release, holder
+
+
+async def _queue(scheduler: LLMScheduler, calls: list, order: list) -> list:
+    async def call(label: str):
+        order.append(label)
+
+    tasks = []
+    for label, node, user in calls:
+        tasks.append(asyncio.ensure_future(scheduler.run(lambda label=label: call(label), 1, node, user)))
+        await asyncio.sleep(0)
+    return tasks
+
+
+def test_waiting_calls_run_by_priority():
+    async def main():
+        scheduler = LLMScheduler(max_concurrency=1)
+        release, holder = await _hold_slot(scheduler)
+        order: list = []
+        tasks = await _queue(scheduler, [
+            ("summary", "background", "u"),
+            ("analysis", "crop_health", "u"),
+            ("answer", "response", "u"),
+            ("extraction", "farmer_interaction", "u"),
+        ], order)
+        assert scheduler.stats()["waiting"] == 4
+        release.set()
+        await asyncio.gather(holder, *tasks)
+        return order
+
+    assert asyncio.run(main()) == ["answer", "extraction", "analysis", "summary"]
+
+
+def test_users_take_turns_within_a_priority():
+    async def main():
+        scheduler = LLMScheduler(max_concurrency=1)
+        release, holder = await _hold_slot(scheduler)
+        order: list = []
+        calls = [(f"{user}{i}", "crop_health", user) for user, n in (("a", 3), ("b", 2), ("c", 1)) for i in range(n)]
+        tasks = await _queue(scheduler, calls, order)
+        release.set()
+        await asyncio.gather(holder, *tasks)
+        return order
+
+    assert asyncio.run(main()) == ["a0", "b0", "c0", "a1", "b1", "a2"]
+
+
+def test_retry_after_once_queue_is_full():
+    async def main():
+        scheduler = LLMScheduler(max_concurrency=1, max_queue=2)
+        release, holder = await _hold_slot(scheduler)
+        tasks = await _queue(scheduler, [("one", "response", "u")], [])
+        below_limit = scheduler.retry_after()
+        tasks += await _queue(scheduler, [("two", "response", "u")], [])
+        at_limit = scheduler.retry_after()
+        release.set()
+        await asyncio.gather(holder, *tasks)
+        return below_limit, at_limit, scheduler.stats()["rejected"]
+
+    below_limit, at_limit, rejected = asyncio.run(main())
+    assert below_limit == 0
+    assert at_limit >= 1
+    assert rejected == 1
+
+
+def test_chat_returns_503_with_retry_after_when_saturated(monkeypatch):
+    from server.routes import chat
+
+    saturated = LLMScheduler(max_concurrency=1, max_queue=0)
+    monkeypatch.setattr(chat, "llm_scheduler", saturated)
+    app = FastAPI()
+    app.include_router(chat.router)
+
+    resp = TestClient(app).post("/chat", json={"user_id": "u", "session_id": "s", "message": "hi"})
+    assert resp.status_code == 503
+    assert int(resp.headers["Retry-After"]) >= 1
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def main():
+        scheduler = LLMScheduler(max_concurrency=1)
+        release, holder = await _hold_slot(scheduler)
+        order: list = []
+        (waiter,) = await _queue(scheduler, [("cancelled", "response", "u")], order)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        waiting_after_cancel = scheduler.stats()["waiting"]
+        release.set()
+        await holder
+        await asyncio.wait_for(asyncio.gather(*await _queue(scheduler, [("next", "response", "u")], order)), 1)
+        return waiting_after_cancel, order, scheduler.stats()
+
+    waiting_after_cancel, order, stats = asyncio.run(main())
+    assert waiting_after_cancel == 0
+    assert order == ["next"]
+    assert stats["active"] == 0 and stats["waiting"] == 0
+
+
+def test_slot_granted_to_a_cancelled_waiter_is_released():
+    async def main():
+        scheduler = LLMScheduler(max_concurrency=1)
+        release, holder = await _hold_slot(scheduler)
+        order: list = []
+        (waiter,) = await _queue(scheduler, [("cancelled", "response", "u")], order)
+        release.set()
+        await asyncio.sleep(0)     # the holder finishes and hands the slot to the waiter...
+        granted = scheduler.stats()
+        waiter.cancel()            # ...which is cancelled before it resumes
+        await asyncio.gather(holder, waiter, return_exceptions=True)
+        return granted, order, scheduler.stats()
+
+    granted, order, stats = asyncio.run(main())
+    assert granted["active"] == 1 and granted["waiting"] == 0
+    assert order == []
+    assert stats["active"] == 0 and stats["waiting"] == 0
+
+
+def test_token_bucket_delays_calls_over_budget():
+    async def main():
+        scheduler = LLMScheduler(max_concurrency=4, tokens_per_minute=60_000)   # 1000 tokens/s
+        order: list = []
+        first = await _queue(scheduler, [("first", "response", "u")], order)
+        await asyncio.gather(*first)
+        scheduler._tokens = 0.0   # as if the first call had used the whole minute's budget
+        started = time.monotonic()
+        second = asyncio.ensure_future(scheduler.run(lambda: asyncio.sleep(0), 100, "response", "u"))
+        await second
+        return time.monotonic() - started
+
+    assert asyncio.run(main()) >= 0.08
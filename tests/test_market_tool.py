@@ -0,0 +1,113 @@
+import asyncio
+
+import httpx
+
+from server.agents.tools import market_tool
+
+ROW = {"Commodity": "Onion", "Market": "Lasalgaon", "Date": "16 Oct 2026",
+       "Min Price": "1800", "Max Price": "2400", "Modal Price": "2150"}
+
+
+def _fake_upstream(monkeypatch, responses: list) -> list:
+    """
+    Serves `responses` in order (an int is an HTTP error status); returns the list of calls made.
+    """
+    calls = []
+
+    async def hedged_get(url, params=None):
+        calls.append(dict(params))
+        body = responses[min(len(calls), len(responses)) - 1]
+        request = httpx.Request("GET", url)
+        if isinstance(body, int):
+            return httpx.Response(body, json={"detail": "down"}, request=request)
+        return httpx.Response(200, json=body, request=request)
+
+    monkeypatch.setattr(market_tool, "hedged_get", hedged_get)
+    return calls
+
+
+def _price():
+    return market_tool.get_agri_market_price("onion", "Maharashtra", "Lasalgaon")
+
+
+async def _settle():
+    await asyncio.gather(*list(market_tool._revalidations))
+
+
+def test_fresh_price_is_served_from_the_cache(monkeypatch):
+    calls = _fake_upstream(monkeypatch, [[ROW, {**ROW, "Date": "15 Oct 2026"}]])
+
+    async def main():
+        return await _price(), await _price()
+
+    first, second = asyncio.run(main())
+    assert first == second and first.modal_price == "2150" and first.date == "16 Oct 2026"
+    assert not first.stale
+    assert len(calls) == 1
+
+
+def test_stale_price_is_served_while_revalidating(monkeypatch):
+    monkeypatch.setattr(market_tool, "MARKET_FRESH_TTL", 0.0)
+    calls = _fake_upstream(monkeypatch, [[ROW], [{**ROW, "Modal Price": "2300"}]])
+
+    async def main():
+        before = market_tool.market_cache_stats()
+        first = await _price()
+        stale = await _price()          # past its fresh TTL: returned at once, refreshed behind
+        await _settle()
+        after = market_tool.market_cache_stats()
+        stats = {k: after[k] - before[k] for k in ("hits", "misses")}
+        return first, stale, market_tool._price_cache.peek(market_tool._price_key("onion", "Maharashtra", "Lasalgaon")), stats
+
+    first, stale, entry, stats = asyncio.run(main())
+    assert not first.stale
+    assert stale.stale and stale.modal_price == "2150"
+    assert entry["result"].modal_price == "2300" and not entry["result"].stale
+    assert len(calls) == 2
+    assert (stats["hits"], stats["misses"]) == (1, 1)   # the background refresh is not counted
+
+
+def test_upstream_error_keeps_the_last_good_price(monkeypatch):
+    monkeypatch.setattr(market_tool, "MARKET_FRESH_TTL", 0.0)
+    calls = _fake_upstream(monkeypatch, [[ROW], 503])
+
+    async def main():
+        before = market_tool.market_cache_stats()
+        await _price()
+        await _price()
+        await _settle()
+        result = await _price()         # within the error TTL: no new upstream call
+        after = market_tool.market_cache_stats()
+        return result, {k: after[k] - before[k] for k in ("hits", "misses")}
+
+    result, stats = asyncio.run(main())
+    assert result.stale and result.modal_price == "2150" and not result.error
+    assert len(calls) == 2
+    assert stats == {"hits": 2, "misses": 1}   # the failed background refresh is not a lookup
+
+
+def test_errors_are_cached_briefly(monkeypatch):
+    calls = _fake_upstream(monkeypatch, [503])
+
+    async def main():
+        return await _price(), await _price()
+
+    first, second = asyncio.run(main())
+    assert first.error and second.error
+    assert len(calls) == 1
+
+    monkeypatch.setattr(market_tool, "MARKET_ERROR_TTL", 0.0)
+    market_tool._price_cache.clear()
+    asyncio.run(main())
+    assert len(calls) == 3
+
+
+def test_concurrent_misses_share_one_upstream_call(monkeypatch):
+    calls = _fake_upstream(monkeypatch, [[ROW]])
+
+    async def main():
+        return await asyncio.gather(*(_price() for _ in range(5)))
+
+    results = asyncio.run(main())
+    assert len({r.modal_price for r in results}) == 1
+    assert len(calls) == 1
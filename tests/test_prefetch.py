@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from server.services import prefetch
+from server.services.prefetch import Prefetcher
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(prefetch.time, "monotonic", clock)
+    return clock
+
+
+def _prefetcher(**kwargs):
+    options = dict(tick=1, hot_keys=10, min_score=2, half_life=100, ahead=0.5, jitter=0, concurrency=4, retry_s=30)
+    return Prefetcher(**{**options, **kwargs})
+
+
+def _touch(p, key, times, kind="weather"):
+    for _ in range(times):
+        p.touch(kind, key, key)
+
+
+def _hot(p):
+    return [e.key for e in p.hot()]
+
+
+def test_recent_hits_outrank_older_ones_as_they_decay(clock):
+    p = _prefetcher()
+    _touch(p, "old", 4)
+    clock.now += 100                      # one half-life: "old" is worth 2 hits now
+    _touch(p, "new", 3)
+    _touch(p, "once", 1)                  # under min_score, tracked but not kept warm
+
+    assert _hot(p) == ["new", "old"]
+    clock.now += 100
+    assert _hot(p) == []                  # 1.5 and 1 hits left: both cooled below min_score
+    _touch(p, "old", 1)
+    assert _hot(p) == ["old"]             # 1 + 1 hit
+
+
+def test_hot_set_is_capped_hottest_first(clock):
+    p = _prefetcher(hot_keys=2)
+    for key, hits in (("a", 2), ("b", 5), ("c", 3)):
+        _touch(p, key, hits)
+
+    assert _hot(p) == ["b", "c"]
+
+
+def test_weights_count_fractional_hits(clock):
+    p = _prefetcher()
+    for _ in range(3):
+        p.touch("weather", "profile-city", "profile-city", weight=0.5)
+
+    assert _hot(p) == []
+    p.touch("weather", "profile-city", "profile-city", weight=0.5)
+    assert _hot(p) == ["profile-city"]
+
+
+def test_only_due_hot_keys_are_refreshed_and_failures_back_off(clock):
+    refreshed = []
+
+    async def refresh(key):
+        refreshed.append(key)
+        return key != "down"
+
+    async def main():
+        p = _prefetcher(half_life=10_000)            # stays hot across the minute simulated here
+        p.register("weather", refresh, ttl=60)     # refresh every 30 s (ahead=0.5)
+        for key in ("ok", "down"):
+            _touch(p, key, 3)
+        _touch(p, "cold", 1)
+        assert await p.refresh_due() == 0          # just fetched by the caller
+        clock.now += 30
+        assert await p.refresh_due() == 2
+        await asyncio.gather(*list(p._inflight.values()))
+        clock.now += 29
+        started_early = await p.refresh_due()      # "ok" due in 30 s, "down" in retry_s=30
+        clock.now += 1
+        started_due = await p.refresh_due()
+        await asyncio.gather(*list(p._inflight.values()))
+        return p, started_early, started_due
+
+    p, started_early, started_due = asyncio.run(main())
+    assert sorted(refreshed) == ["down", "down", "ok", "ok"] and "cold" not in refreshed
+    assert (started_early, started_due) == (0, 2)
+    assert (p.refreshes, p.failures) == (2, 2)
+
+
+def test_tracking_evicts_the_coldest_keys(clock):
+    p = _prefetcher(max_tracked=10)
+    for i in range(10):
+        _touch(p, f"k{i}", 2 + i)
+    _touch(p, "new", 1)
+
+    assert len(p._tracked) == 10
+    assert ("weather", "k0") not in p._tracked and ("weather", "new") in p._tracked
@@ -0,0 +1,72 @@
+import asyncio
+from typing import List
+
+import pytest
+
+from server.agents import orchestrator
+from server.agents.orchestrator import NODE_DEPENDENCIES, NODE_TIERS, fuse_route, resolve_route
+
+ROUTABLE = [n for tier in NODE_TIERS for n in tier]
+
+
+def _run(monkeypatch, route: List[str]) -> List[str]:
+    """
+    Compiles the real graph with stub nodes and returns the order nodes ran in.
+    """
+    visited: List[str] = []
+
+    def stub(name: str):
+        async def node(state):
+            for dependency in NODE_DEPENDENCIES.get(name, []):
+                if dependency in route:
+                    assert dependency in visited, f"{name} ran before {dependency}"
+            visited.append(name)
+            await asyncio.sleep(0.001 * (len(name) % 3))   # finish out of declaration order
+            return {"route": route} if name == "farmer_interaction" else {}
+        return node
+
+    monkeypatch.setattr(orchestrator, "_NODES", {name: stub(name) for name in orchestrator._NODES})
+    graph = orchestrator._build_graph()
+    asyncio.run(graph.ainvoke(orchestrator._initial_state("u", "s", "hi")))
+    return visited
+
+
+@pytest.mark.parametrize("intents", [
+    [],
+    ["market"],
+    ["weather"],
+    ["status"],
+    ["disease"],
+    ["plan"],
+    ["rain", "price"],
+    ["disease", "plan"],
+    ["health", "disease", "plan", "market", "weather"],
+])
+def test_intents_visit_only_their_nodes(monkeypatch, intents):
+    route = resolve_route(intents)
+    visited = _run(monkeypatch, route)
+
+    assert sorted(n for n in visited if n in ROUTABLE) == sorted(route)
+    assert visited[-1] == "response"
+    assert visited.count("response") == 1              # fan-in once, after every routed node
+    assert visited.index("farmer_interaction") > max(visited.index("chat_history"), visited.index("farmer_profile"))
+
+
+@pytest.mark.parametrize("intents, expected", [
+    (["market"], ["agmarket_price"]),
+    (["status"], ["sensor_data", "crop_health"]),
+    (["disease"], ["sensor_data", "weather", "disease_prediction"]),
+    (["plan"], ["weather", "lifecycle_planning"]),
+    (["advice"], []),
+])
+def test_resolve_route_adds_dependencies_in_tier_order(intents, expected):
+    assert resolve_route(intents) == expected
+
+
+def test_fused_route_waits_for_its_inputs(monkeypatch):
+    route = fuse_route(resolve_route(["health", "disease", "plan"]), ["health", "disease", "plan"])
+    visited = _run(monkeypatch, route)
+
+    assert "fused_analysis" in visited
+    assert visited.index("fused_analysis") > max(visited.index("sensor_data"), visited.index("weather"))
+    assert visited.count("response") == 1
@@ -0,0 +1,60 @@
+from server.services.sensor_store import SENSOR_FIELDS, SensorRingBuffer, SensorStore
+
+
+def _columns(values):
+    return {f: [float(v) for v in values] for f in SENSOR_FIELDS}
+
+
+def _readings(buffer: SensorRingBuffer, now: float):
+    agg = buffer.aggregates(now=now, windows={"all": 10_000})["all"]
+    return agg["_"]["readings"], agg["temperature"]
+
+
+def test_wraps_and_keeps_the_newest_readings_in_order():
+    buffer = SensorRingBuffer(capacity=5)
+    buffer.extend([1, 2, 3], _columns([1, 2, 3]))
+    buffer.extend([4, 5, 6, 7], _columns([4, 5, 6, 7]))
+
+    assert buffer.size == 5
+    assert buffer.latest()["ts"] == 7 and buffer.latest()["temperature"] == 7
+    readings, temperature = _readings(buffer, now=7)
+    assert readings == 5
+    assert (temperature["min"], temperature["max"], temperature["mean"]) == (3, 7, 5)
+    assert temperature["trend"] == 4   # last reading minus first: still in time order after the wrap
+
+
+def test_batch_larger_than_capacity_keeps_its_tail():
+    buffer = SensorRingBuffer(capacity=4)
+    buffer.extend([1], _columns([1]))
+    buffer.extend(list(range(10, 20)), _columns(range(10, 20)))
+
+    assert buffer.size == 4
+    assert buffer.latest()["ts"] == 19
+    readings, temperature = _readings(buffer, now=19)
+    assert readings == 4
+    assert (temperature["min"], temperature["max"]) == (16, 19)
+
+
+def test_windows_count_only_recent_readings_after_wrapping():
+    buffer = SensorRingBuffer(capacity=6)
+    for start in range(0, 20, 4):
+        ts = list(range(start, start + 4))
+        buffer.extend(ts, _columns(ts))
+
+    agg = buffer.aggregates(now=19, windows={"recent": 3})
+    assert agg["recent"]["_"]["readings"] == 4   # ts 16..19
+    assert agg["recent"]["temperature"]["min"] == 16
+
+
+def test_late_batch_is_merged_in_time_order():
+    store = SensorStore(capacity=5)
+    store.ingest("f", [(ts, [float(ts)] * len(SENSOR_FIELDS)) for ts in (10, 20, 30)])
+    store.ingest("f", [(25, [25.0] * len(SENSOR_FIELDS)), (5, [5.0] * len(SENSOR_FIELDS)), (15, [15.0] * len(SENSOR_FIELDS))])
+
+    buffer = store.get("f")
+    assert store.late_batches == 1
+    assert list(buffer._ordered(buffer.ts)) == [10, 15, 20, 25, 30]   # oldest reading dropped past capacity
+    assert buffer.latest()["ts"] == 30
+    agg = buffer.aggregates(now=30, windows={"recent": 12})["recent"]
+    assert agg["_"]["readings"] == 3 and agg["temperature"]["min"] == 20
+    assert agg["temperature"]["trend"] == 10
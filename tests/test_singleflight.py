@@ -0,0 +1,42 @@
+import asyncio
+
+from server.utils.singleflight import SingleFlight
+
+
+def test_concurrent_calls_for_a_key_share_one_fetch():
+    async def main():
+        flight = SingleFlight()
+        fetches = []
+
+        async def fetch(key):
+            fetches.append(key)
+            await asyncio.sleep(0.01)
+            return key.upper()
+
+        results = await asyncio.gather(
+            *(flight.do(key, lambda key=key: fetch(key)) for key in ["wheat", "wheat", "rice", "wheat"])
+        )
+        return results, fetches, flight
+
+    results, fetches, flight = asyncio.run(main())
+    assert results == ["WHEAT", "WHEAT", "RICE", "WHEAT"]
+    assert sorted(fetches) == ["rice", "wheat"]
+    assert (flight.calls, flight.coalesced) == (2, 2)
+    assert not flight.inflight("wheat")
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_fetch():
+    async def main():
+        flight = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.01)
+            return 42
+
+        first = asyncio.ensure_future(flight.do("k", fetch))
+        second = asyncio.ensure_future(flight.do("k", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second, first.cancelled()
+
+    assert asyncio.run(main()) == (42, True)
@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+
+from server.services.storage import MemoryStore, Turn
+from server.services.storage.batcher import WriteBatcher
+from server.services.storage.sqlite_store import SQLiteStore
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        yield MemoryStore()
+        return
+    sqlite = SQLiteStore(str(tmp_path / "chat.db"))
+    yield sqlite
+    asyncio.run(sqlite.close())
+
+
+def test_turns_summaries_and_profiles_round_trip(store):
+    async def main():
+        await store.append_turns([("u:s", Turn("q1", "a1")), ("u:s", Turn("q2", "a2")), ("u:t", Turn("x", "y"))])
+        await store.append_turns([("u:s", Turn("q3", "a3"))])
+        await store.save_summary("u:s", "two turns", 2)
+        await store.save_profile("u", {"location": "Pune", "crops": ["onion"]})
+        return (
+            await store.load_turns("u:s", 2),
+            await store.load_turns_since("u:s", 2),
+            await store.count_turns("u:s"),
+            await store.load_summary("u:s"),
+            await store.get_profile("u"),
+            await store.get_profile("nobody"),
+        )
+
+    last_two, since, count, summary, profile, missing = asyncio.run(main())
+    assert last_two == [Turn("q2", "a2"), Turn("q3", "a3")]
+    assert since == [Turn("q3", "a3")]
+    assert count == 3
+    assert summary == ("two turns", 2)
+    assert profile == {"location": "Pune", "crops": ["onion"]}
+    assert missing is None
+
+
+def test_sqlite_uses_wal(tmp_path):
+    store = SQLiteStore(str(tmp_path / "chat.db"))
+    try:
+        assert store._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    finally:
+        asyncio.run(store.close())
+
+
+def test_batcher_retries_with_backoff_and_caps_the_queue():
+    class FlakyStore(MemoryStore):
+        down = True
+        attempts = 0
+
+        async def append_turns(self, batch):
+            self.attempts += 1
+            if self.down:
+                raise ConnectionError("store down")
+            await super().append_turns(batch)
+
+    async def main():
+        store = FlakyStore()
+        batcher = WriteBatcher(store, max_batch=10, interval=0.01, max_queue=20, max_backoff=0.1)
+        accepted = [batcher.submit("u:s", Turn(f"q{i}", "a")) for i in range(25)]
+        await asyncio.sleep(0.3)
+        attempts_while_down = store.attempts
+        pending_while_down = len(batcher.pending("u:s"))
+        store.down = False
+        await asyncio.sleep(0.3)
+        await batcher.close()
+        return accepted, attempts_while_down, pending_while_down, batcher, await store.count_turns("u:s")
+
+    accepted, attempts, pending, batcher, stored = asyncio.run(main())
+    assert accepted.count(False) == 5 and batcher.dropped == 5
+    assert pending == 20                  # queued turns stay readable while the store is down
+    assert attempts <= 8                  # backed off, not one retry per 10 ms interval
+    assert stored == 20 and batcher.pending("u:s") == []
+
+
+def test_memory_store_keeps_recently_used_profiles(monkeypatch):
+    monkeypatch.setattr("server.services.storage.memory.HISTORY_MAX_PROFILES", 2)
+
+    async def main():
+        store = MemoryStore()
+        await store.save_profile("a", {"location": "Pune"})
+        await store.save_profile("b", {"location": "Nashik"})
+        await store.get_profile("a")                  # a is now the most recently used
+        await store.save_profile("c", {"location": "Indore"})
+        return [await store.get_profile(u) for u in ("a", "b", "c")], store.stats()["profiles"]
+
+    profiles, count = asyncio.run(main())
+    assert profiles == [{"location": "Pune"}, None, {"location": "Indore"}]
+    assert count == 2
+
+
+def test_older_summary_does_not_replace_a_newer_one(store):
+    async def main():
+        await store.append_turns([("u:s", Turn(f"q{i}", "a")) for i in range(4)])
+        await store.save_summary("u:s", "four turns", 4)
+        await store.save_summary("u:s", "two turns", 2)   # a slower, older summarization finishing last
+        return await store.load_summary("u:s")
+
+    assert asyncio.run(main()) == ("four turns", 4)
+
+
+def test_history_read_during_a_flush_returns_each_turn_once(monkeypatch):
+    from server.agents.tools import history_tool
+
+    class SlowAckStore(MemoryStore):
+        buffered = True
+
+        async def append_turns(self, batch):
+            await super().append_turns(batch)
+            await asyncio.sleep(0.05)     # written, but the batcher has not heard back yet
+
+    async def main():
+        store = SlowAckStore()
+        batcher = WriteBatcher(store, interval=0.01)
+        monkeypatch.setattr(history_tool, "get_store", lambda: store)
+        monkeypatch.setattr(history_tool, "_batcher", batcher)
+        await store.append_turns([("u:s", Turn("q0", "a0"))])
+        batcher.submit("u:s", Turn("q1", "a1"))
+        batcher.submit("u:s", Turn("q2", "a2"))
+        queued = await history_tool.get_chat_history("u", "s")
+        await asyncio.sleep(0.03)         # flush under way: turns are in the store and still pending
+        in_flight = await history_tool.get_chat_history("u", "s")
+        await batcher.close()
+        return queued, in_flight, await history_tool.get_chat_history("u", "s")
+
+    expected = [Turn("q0", "a0"), Turn("q1", "a1"), Turn("q2", "a2")]
+    queued, in_flight, written = asyncio.run(main())
+    assert queued == in_flight == written == expected
@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+from server.utils.response_cleaner import StreamingResponseCleaner, clean_response
+
+ANSWERS = [
+    "**Weather:** Light rain expected tomorrow.\n- Keep irrigation light\n- Check leaves for spots\nAction: spray copper fungicide",
+    "Prices are stable at ₹2,150/quintal.\n\n* Modal price: 2100\n* Trend: up\n",
+    "Your wheat looks healthy. Reaction: none needed.\nMore text",
+    "• bullet one\n• bullet two *bold* end\n   \nFinal line with trailing spaces   ",
+    "Irrigate lightly; action is needed soon. ACTION: do it\nnext line",
+    "a\nb\nc - d -- e\n--f\n***g***",
+    "Act now to protect the crop. Acting fast helps. Actionable tips follow",
+]
+
+
+def _stream(text: str, rng: random.Random) -> str:
+    cleaner = StreamingResponseCleaner()
+    out, i = [], 0
+    while i < len(text):
+        size = rng.randint(1, 8)
+        out.append(cleaner.feed(text[i:i + size]))
+        i += size
+    out.append(cleaner.flush())
+    return "".join(out)
+
+
+@pytest.mark.parametrize("text", ANSWERS)
+def test_streamed_output_matches_clean_response(text):
+    rng = random.Random(text)
+    expected = clean_response(text)
+    for _ in range(300):
+        assert _stream(text, rng) == expected
+
+
+@pytest.mark.parametrize("text", ANSWERS)
+def test_one_character_at_a_time(text):
+    cleaner = StreamingResponseCleaner()
+    streamed = "".join(cleaner.feed(ch) for ch in text) + cleaner.flush()
+    assert streamed == clean_response(text)
+
+
+def test_action_tail_is_never_emitted():
+    cleaner = StreamingResponseCleaner()
+    emitted = "".join(cleaner.feed(ch) for ch in "Water in the evening. Act")
+    emitted += "".join(cleaner.feed(ch) for ch in "ion: spray now")
+    assert "Act" not in emitted
+    assert emitted + cleaner.flush() == "Water in the evening."
+
+
+def test_flush_with_final_text_completes_the_stream():
+    cleaner = StreamingResponseCleaner()
+    emitted = cleaner.feed("Rain likely ") + cleaner.feed("tomorrow")
+    assert emitted + cleaner.flush("Rain likely tomorrow. Keep drains open.") == "Rain likely tomorrow. Keep drains open."
@@ -0,0 +1,48 @@
+import pytest
+
+from server.models.tool_records import LocalWeather, MarketPrice, WeatherNow
+from server.utils.response_cleaner import format_market_price, format_weather
+
+ROWS = [
+    {"Commodity": "Wheat", "Market": "Chennai", "Date": "16 Oct 2026", "Min Price": "2300",
+     "Max Price": "2500", "Modal Price": "2400", "Variety": "Other", "Grade": "FAQ"},
+    {"Commodity": "Wheat", "Market": "Chennai", "Date": "15 Oct 2026", "Min Price": "2200",
+     "Max Price": "2400", "Modal Price": "2300"},
+]
+
+
+def test_from_agmarket_keeps_only_the_latest_row():
+    price = MarketPrice.from_agmarket("wheat", "Tamil Nadu", "chennai", ROWS)
+
+    assert price == MarketPrice("Wheat", "Tamil Nadu", "Chennai", "16 Oct 2026", "2300", "2500", "2400")
+    assert not hasattr(price, "__dict__")            # a plain tuple: no raw payload carried along
+
+
+@pytest.mark.parametrize("rows", [[], {"error": "bad request"}, ["not a row"], None])
+def test_from_agmarket_without_rows_has_no_date(rows):
+    price = MarketPrice.from_agmarket("wheat", "Tamil Nadu", "Chennai", rows)
+
+    assert price == MarketPrice("wheat", "Tamil Nadu", "Chennai")
+    assert format_market_price(price) == "Market price data not available."
+
+
+def test_stale_copy_is_labelled_and_leaves_the_original_alone():
+    fresh = MarketPrice.from_agmarket("wheat", "Tamil Nadu", "Chennai", ROWS)
+    stale = fresh._replace(stale=True)
+
+    assert fresh.stale is False and stale[:7] == fresh[:7]
+    assert format_market_price(fresh).startswith("Latest market price for Wheat in Chennai (16 Oct 2026)")
+    assert format_market_price(stale).startswith("Last known market price for Wheat")
+    assert format_market_price(fresh._replace(error="timeout")) == "Market price data not available."
+
+
+def test_weather_records_render_what_is_there():
+    now = WeatherNow(temp_c=31.0, humidity=70, rain_mm=0.5, description="haze")
+
+    assert format_weather(LocalWeather("Chennai", now)) == (
+        "Current weather in Chennai: 31.0°C, Humidity: 70%, Rain (last hour): 0.5 mm, haze"
+    )
+    assert format_weather(LocalWeather("Chennai", WeatherNow(error="timeout"), forecast_error="timeout")) == (
+        "Forecast error: timeout"
+    )
+    assert format_weather(LocalWeather()) == "" and format_weather(None) == ""
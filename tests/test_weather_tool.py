@@ -0,0 +1,49 @@
+import asyncio
+
+import httpx
+
+from server.agents.tools import weather_tool
+
+CURRENT = {"main": {"temp": 31.0, "humidity": 70}, "weather": [{"description": "haze"}]}
+FORECAST = {"list": [
+    {"dt_txt": "2026-10-17 09:00:00", "main": {"temp": 30.0, "humidity": 75}, "weather": [{"description": "clouds"}]},
+    {"dt_txt": "2026-10-17 12:00:00", "main": {"temp": 32.0, "humidity": 65}, "rain": {"3h": 1.5}, "weather": [{"description": "light rain"}]},
+]}
+
+
+def _fake_upstream(monkeypatch) -> list:
+    calls = []
+
+    async def hedged_get(url, params=None):
+        calls.append((url, dict(params)))
+        await asyncio.sleep(0.01)
+        body = FORECAST if url == weather_tool.OPENWEATHER_FORECAST_API else CURRENT
+        return httpx.Response(200, json=body, request=httpx.Request("GET", url))
+
+    monkeypatch.setattr(weather_tool, "hedged_get", hedged_get)
+    return calls
+
+
+def test_aliases_share_one_cache_entry_and_one_fetch(monkeypatch):
+    calls = _fake_upstream(monkeypatch)
+
+    async def main():
+        return await asyncio.gather(*(weather_tool.get_local_weather(name) for name in ("Chennai", " chennai ", "Madras")))
+
+    results = asyncio.run(main())
+    assert [w.location for w in results] == ["Chennai"] * 3
+    assert len(calls) == 2                                   # one current + one forecast, coalesced
+    assert all("lat" in params and "q" not in params for _, params in calls)
+    assert weather_tool.weather_cache_stats()["size"] == 2   # ("now", coords) and ("forecast", coords)
+
+    asyncio.run(weather_tool.get_local_weather("MADRAS"))
+    assert len(calls) == 2                                   # served from the cache
+
+
+def test_unknown_place_is_fetched_by_name(monkeypatch):
+    calls = _fake_upstream(monkeypatch)
+    weather = asyncio.run(weather_tool.get_local_weather("Kottur Village"))
+
+    assert weather.location == "Kottur Village"
+    assert weather.now.temp_c == 31.0 and weather.digest["days"][0]["rain_mm"] == 1.5
+    assert {params["q"] for _, params in calls} == {"Kottur Village"}